@@ -17,7 +17,7 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
-from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
+from fastapi.responses import JSONResponse, HTMLResponse, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
@@ -25,10 +25,8 @@ from dotenv import load_dotenv
 
 # Use LangGraph-based agent instead of traditional orchestrator
 try:
-    from extraction_agent import ExtractionAgent as ExtractionOrchestrator
+    from extraction_agent import ExtractionAgent as ExtractionOrchestrator, get_orchestrator
     print("[STARTUP] Using LangGraph-based ExtractionAgent")
-    # For LangGraph agent, we'll still create instances as needed
-    get_orchestrator = None
 except ImportError:
     # Fallback to traditional orchestrator if LangGraph not available
     from extraction_orchestrator import ExtractionOrchestrator, get_orchestrator
@@ -39,7 +37,18 @@ from document_chat import get_chatbot
 from cache_manager import get_cache_manager
 from po_extractor import POExtractor, get_po_extractor
 from po_matcher import get_po_matcher, match_invoice
+from po_join_index import InvoicePOIndex
+from duplicate_index import DuplicateIndex
+from store_index import DirtyTrackingStore
+from near_duplicate_index import NearDuplicateIndex, minhash_signature
+from document_parser import DocumentParser
+from folder_processor import reference_document
+from extraction_queue import (
+    PRIORITY_BACKGROUND, PRIORITY_BATCH, PRIORITY_INTERACTIVE, QueueFullError, get_extraction_queue,
+)
+from vendor_index import vendor_names_match
 import extraction_status_manager
+import serializer
 
 # Fixed session id for pre-loaded "all documents" chat (invoices + POs + GRN)
 ALL_DOCUMENTS_SESSION_ID = "all_documents"
@@ -56,6 +65,7 @@ def _build_all_documents_lists() -> Tuple[List[Dict[str, Any]], List[Dict[str, A
         if not extracted_data:
             continue
         extractions_list.append({
+            "extraction_id": extraction_id,
             "file_name": extraction.get("file_name", "document.pdf"),
             "extracted_data": extracted_data,
             "metadata": extraction.get("metadata", {}),
@@ -69,6 +79,7 @@ def _build_all_documents_lists() -> Tuple[List[Dict[str, Any]], List[Dict[str, A
                     if not item.get("extracted_data"):
                         continue
                     extractions_list.append({
+                        "extraction_id": item.get("extraction_id"),
                         "file_name": item.get("file_name", "document.pdf"),
                         "extracted_data": item.get("extracted_data", {}),
                         "metadata": item.get("metadata", {}),
@@ -166,25 +177,33 @@ for _dir in (DOCUMENTS_REPO, DOCUMENTS_REPO_PO, DOCUMENTS_REPO_INVOICE, DOCUMENT
 print(f"[STARTUP] Documents repo: {DOCUMENTS_REPO.absolute()} (PO, Invoice, GRN)")
 
 # In-memory storage for extractions and dashboard data
-extractions_store: Dict[str, Dict[str, Any]] = {}
+extractions_store: DirtyTrackingStore = DirtyTrackingStore()
+# Invoice PO references for the three-way match status (synced from extractions_store)
+invoice_po_index = InvoicePOIndex()
+# Invoice ids and file names for the duplicate checks (synced from extractions_store)
+duplicate_index = DuplicateIndex()
+# MinHash/LSH signatures of invoice texts for the near-duplicate check (synced from extractions_store)
+near_duplicate_index = NearDuplicateIndex()
 
 # ────────────── Notifications Store ──────────────
 notifications_store: List[Dict[str, Any]] = []
 _notification_counter = 0
+_notification_lock = threading.Lock()
 
 def _add_notification(ntype: str, title: str, detail: str, extraction_id: str = ""):
-    """Append a notification to the in-memory store."""
+    """Append a notification to the in-memory store (also called from worker threads)."""
     global _notification_counter
-    _notification_counter += 1
-    notifications_store.append({
-        "id": _notification_counter,
-        "type": ntype,
-        "title": title,
-        "detail": detail,
-        "extraction_id": extraction_id,
-        "timestamp": datetime.now().isoformat(),
-        "read": False,
-    })
+    with _notification_lock:
+        _notification_counter += 1
+        notifications_store.append({
+            "id": _notification_counter,
+            "type": ntype,
+            "title": title,
+            "detail": detail,
+            "extraction_id": extraction_id,
+            "timestamp": datetime.now().isoformat(),
+            "read": False,
+        })
 
 # Status tracking for progress updates - use shared module
 extraction_status = extraction_status_manager.extraction_status
@@ -225,8 +244,7 @@ def recalculate_dashboard_from_extractions():
     # Get GRN count from cache
     try:
         cache_manager = get_cache_manager()
-        grn_index = cache_manager.get_all_grns()
-        dashboard_data["total_grn"] = len(grn_index) if isinstance(grn_index, dict) else 0
+        dashboard_data["total_grn"] = cache_manager.get_grn_count()
     except Exception as e:
         print(f"[DASHBOARD] Error getting GRN count: {e}")
         dashboard_data["total_grn"] = 0
@@ -321,6 +339,18 @@ def recalculate_dashboard_from_extractions():
     print(f"[DASHBOARD] Updated: {dashboard_data['total_invoices']} invoices, {dashboard_data['total_pos']} POs, {dashboard_data['matched_invoices']} three-way matched, {dashboard_data['unmatched_invoices']} unmatched")
 
 
+def _invoice_json_entry(extraction_id: str, extraction: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build the all_invoices.json entry for an extraction, or None if it does not belong there."""
+    if extraction.get("status") not in ("completed", "po_not_found") or not extraction.get("extracted_data"):
+        return None
+    return {
+        "extraction_id": extraction_id,
+        "file_name": extraction.get("file_name", "document.pdf"),
+        "extracted_data": extraction.get("extracted_data", {}),
+        "metadata": extraction.get("metadata", {}),
+    }
+
+
 def load_extractions_from_file():
     """Load extractions from GCS (if available) or JSON file on server startup."""
     global extractions_store
@@ -332,38 +362,39 @@ def load_extractions_from_file():
         if gcs_data:
             # GCS data is a list of extractions, convert to dict
             if isinstance(gcs_data, list):
-                extractions_store = {}
+                extractions_store = DirtyTrackingStore()
                 for i, item in enumerate(gcs_data):
                     ext_id = item.get("extraction_id", str(i))
                     extractions_store[ext_id] = item
                     print(f"   - Loaded: {item.get('file_name', 'Unknown')} (ID: {ext_id}, Status: {item.get('status', 'unknown')})")
             elif isinstance(gcs_data, dict) and "extractions" in gcs_data:
-                extractions_store = gcs_data.get("extractions", {})
+                extractions_store = DirtyTrackingStore(gcs_data.get("extractions", {}))
                 for ext_id, item in extractions_store.items():
                     print(f"   - Loaded: {item.get('file_name', 'Unknown')} (ID: {ext_id}, Status: {item.get('status', 'unknown')})")
             else:
-                extractions_store = gcs_data if isinstance(gcs_data, dict) else {}
+                extractions_store = DirtyTrackingStore(gcs_data if isinstance(gcs_data, dict) else {})
             print(f"[STARTUP] Loaded {len(extractions_store)} extractions from cache (GCS/local)")
             recalculate_dashboard_from_extractions()
         if not gcs_data:
             # Fallback to local file
             if EXTRACTIONS_JSON_FILE.exists():
-                with open(EXTRACTIONS_JSON_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    extractions_store = data.get("extractions", {})
-                    print(f"[STARTUP] Loaded {len(extractions_store)} extractions from {EXTRACTIONS_JSON_FILE.name}")
-                    # Recalculate dashboard from loaded extractions
-                    recalculate_dashboard_from_extractions()
+                data = serializer.load_file(EXTRACTIONS_JSON_FILE)
+                extractions_store = DirtyTrackingStore(data.get("extractions", {}))
+                print(f"[STARTUP] Loaded {len(extractions_store)} extractions from {EXTRACTIONS_JSON_FILE.name}")
+                # Recalculate dashboard from loaded extractions
+                recalculate_dashboard_from_extractions()
             else:
                 print(f"[STARTUP] No existing extractions file found. Starting fresh.")
-                extractions_store = {}
+                extractions_store = DirtyTrackingStore()
+        # Records just loaded are already persisted
+        extractions_store.take_dirty()
         # Rebuild single JSON files for chatbot (all_invoices.json, all_purchase_orders.json)
         try:
             cm = get_cache_manager()
             invoices_list = [
-                {"file_name": ext.get("file_name", "document.pdf"), "extracted_data": ext.get("extracted_data", {}), "metadata": ext.get("metadata", {})}
-                for ext in extractions_store.values()
-                if ext.get("status") in ("completed", "po_not_found") and ext.get("extracted_data")
+                entry for entry in (
+                    _invoice_json_entry(ext_id, ext) for ext_id, ext in extractions_store.items()
+                ) if entry
             ]
             cm.save_all_invoices_json(invoices_list)
             cm.save_all_purchase_orders_json(cm.get_all_pos_full())
@@ -372,50 +403,63 @@ def load_extractions_from_file():
             print(f"[STARTUP] Note: data JSONs update: {ex}")
     except Exception as e:
         print(f"[STARTUP] Error loading extractions: {e}")
-        extractions_store = {}
+        extractions_store = DirtyTrackingStore()
+
+
+def save_extractions_to_file(*extraction_ids: str):
+    """
+    Persist changed extractions to GCS (if available) and local storage.
+
+    Only the given extraction ids, plus any ids the store marked dirty since the
+    last save, are written as individual records; all_invoices.json is patched for
+    those ids only. Ids no longer in extractions_store are dropped from all_invoices.json
+    (their record files are removed by the delete paths).
+
+    Args:
+        extraction_ids: Ids whose records were modified in place.
+    """
+    extractions_store.mark_dirty(*extraction_ids)
+    touched = extractions_store.take_dirty()
+    if not touched:
+        return
+    try:
+        cache_manager = get_cache_manager()
+        invoice_updates: Dict[str, Optional[Dict[str, Any]]] = {}
+        for extraction_id in touched:
+            extraction_data = extractions_store.get(extraction_id)
+            if extraction_data is None:
+                invoice_updates[extraction_id] = None
+                continue
+            cache_manager.save_extraction_record(extraction_id, extraction_data)
+            invoice_updates[extraction_id] = _invoice_json_entry(extraction_id, extraction_data)
+        # Update single JSON file for chatbot (all_invoices.json)
+        cache_manager.update_all_invoices_json(invoice_updates)
+        print(f"[SAVE] Persisted {len(touched)} changed extraction(s)")
+    except Exception as e:
+        # Keep the ids dirty so the next save retries them
+        extractions_store.mark_dirty(*touched)
+        print(f"[ERROR] Failed to save extractions: {e}")
 
 
-def save_extractions_to_file():
-    """Save extractions to GCS (if available) and JSON file for persistence."""
+def save_extractions_snapshot():
+    """Write the full store to the legacy extractions_data.json (local only, backward compatibility)."""
     try:
         data = {
             "last_updated": datetime.now().isoformat(),
             "total_extractions": len(extractions_store),
             "extractions": extractions_store
         }
-        
-        # Save to local file (legacy format for backward compatibility)
         with open(EXTRACTIONS_JSON_FILE, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, default=str)
-        print(f"[SAVE] Extractions saved to {EXTRACTIONS_JSON_FILE.name}")
-        
-        # Save each extraction as individual file (new approach)
-        try:
-            cache_manager = get_cache_manager()
-            for extraction_id, extraction_data in extractions_store.items():
-                cache_manager.save_extraction_record(extraction_id, extraction_data)
-            # Update single JSON file for chatbot (all_invoices.json)
-            invoices_list = [
-                {
-                    "file_name": ext.get("file_name", "document.pdf"),
-                    "extracted_data": ext.get("extracted_data", {}),
-                    "metadata": ext.get("metadata", {}),
-                }
-                for ext in extractions_store.values()
-                if ext.get("status") in ("completed", "po_not_found") and ext.get("extracted_data")
-            ]
-            cache_manager.save_all_invoices_json(invoices_list)
-        except Exception as gcs_error:
-            print(f"[SAVE] Note: Individual file save skipped or failed: {gcs_error}")
-            
+        print(f"[SAVE] Extractions snapshot saved to {EXTRACTIONS_JSON_FILE.name}")
     except Exception as e:
-        print(f"[ERROR] Failed to save extractions: {e}")
+        print(f"[ERROR] Failed to save extractions snapshot: {e}")
 
 
 # Alias for compatibility
-def save_extractions_to_json():
+def save_extractions_to_json(*extraction_ids: str):
     """Alias for save_extractions_to_file()."""
-    save_extractions_to_file()
+    save_extractions_to_file(*extraction_ids)
 
 
 def remove_unmatched_invoices_on_shutdown():
@@ -432,7 +476,7 @@ def remove_unmatched_invoices_on_shutdown():
         for extraction_id in to_remove:
             cache_manager.delete_extraction_record(extraction_id)
             extractions_store.pop(extraction_id, None)
-        save_extractions_to_file()
+        save_extractions_to_file(*to_remove)
         print(f"[SHUTDOWN] Removed {len(to_remove)} unmatched invoice(s) (PO/GRN not found): {to_remove}")
     except Exception as e:
         print(f"[SHUTDOWN] Error removing unmatched invoices: {e}")
@@ -464,8 +508,11 @@ _thread.start()
 
 @app.on_event("shutdown")
 def on_shutdown():
-    """On application shutdown: remove invoices that did not match PO/GRN (po_not_found)."""
+    """On application shutdown: remove invoices that did not match PO/GRN (po_not_found), snapshot the store, then flush queued GCS uploads."""
     remove_unmatched_invoices_on_shutdown()
+    save_extractions_snapshot()
+    if not get_cache_manager().flush_gcs_writes():
+        print("[SHUTDOWN] Some GCS uploads were still pending at shutdown")
 
 
 class TextExtractionRequest(BaseModel):
@@ -551,6 +598,7 @@ async def health_check():
         "api_key_configured": bool(api_key),
         "gcs_enabled": gcs_status["gcs_enabled"],
         "storage_mode": gcs_status["storage_mode"],
+        "extraction_queue": get_extraction_queue().stats(),
     }
 
 
@@ -569,9 +617,12 @@ async def sync_documents_repo():
     """
     Scan documents_repo/PO, Invoice, GRN folders and process any new files (extract and index).
     """
-    try:
-        from folder_processor import scan_and_process_documents
-        result = scan_and_process_documents(
+    from folder_processor import scan_and_process_documents
+    
+    async def run_sync():
+        # The folder scan is synchronous: one queue slot, on a worker thread
+        result = await asyncio.to_thread(
+            scan_and_process_documents,
             process_po=True,
             process_invoice=True,
             process_grn=True,
@@ -579,6 +630,23 @@ async def sync_documents_repo():
             extraction_status_ref=extraction_status,
             save_extractions_cb=save_extractions_to_file,
         )
+        result = dict(result)
+        # Re-match invoices parked while the new POs / GRNs were missing (same queue slot)
+        result["rematch"] = await _arematch_pending_invoices(result.pop("references", []))
+        return result
+    
+    try:
+        # Behind interactive uploads on the extraction queue
+        job = get_extraction_queue().submit(
+            "documents-repo-sync", run_sync, priority=PRIORITY_BACKGROUND, track_status=False
+        )
+    except QueueFullError as e:
+        return _queue_full_response(e)
+    
+    try:
+        result = await _await_job(job)
+        if result is None:
+            return {"success": False, "error": "Documents repo sync cancelled"}
         return {"success": True, "result": result}
     except Exception as e:
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
@@ -591,6 +659,19 @@ async def upload_file(file: UploadFile = File(...)):
     Returns an extraction_id for tracking.
     Rejects upload if an extraction with the same file name already exists (avoids duplicate entries).
     """
+    return await _register_upload(file)
+
+
+async def _register_upload(file: UploadFile) -> Dict[str, Any]:
+    """
+    Validate and store one uploaded file as a new extraction (status "uploaded").
+    
+    Returns:
+        {extraction_id, file_name, status, vector_store}
+        
+    Raises:
+        HTTPException: 400 for unsupported types or a duplicate file name, 500 on errors
+    """
     # Validate file extension
     file_ext = Path(file.filename).suffix.lower()
     if file_ext not in ['.pdf', '.docx', '.doc', '.txt']:
@@ -600,15 +681,12 @@ async def upload_file(file: UploadFile = File(...)):
         )
     
     # Reject if we already have an extraction with the same original file name (avoid duplicate entries in File Manager)
-    name_normalized = (file.filename or "").strip().lower()
-    if name_normalized:
-        for _eid, ext in extractions_store.items():
-            existing_name = (ext.get("file_name") or "").strip().lower()
-            if existing_name and existing_name == name_normalized:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"A document named '{file.filename}' is already in the system. Delete it from File & Cache Manager first, or use the existing extraction."
-                )
+    duplicate_index.sync(extractions_store)
+    if duplicate_index.find_file_name(file.filename):
+        raise HTTPException(
+            status_code=400,
+            detail=f"A document named '{file.filename}' is already in the system. Delete it from File & Cache Manager first, or use the existing extraction."
+        )
     
     try:
         # Generate extraction ID
@@ -674,10 +752,40 @@ async def upload_file(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _queue_full_response(error: QueueFullError) -> JSONResponse:
+    """429 answer when the extraction queue is at capacity."""
+    print(f"[QUEUE] Rejected: {error}")
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": "30"},
+        content={
+            "status": "queue_full",
+            "success": False,
+            "message": "The server is busy processing other documents. Please retry in a moment.",
+            "queue": get_extraction_queue().stats(),
+        },
+    )
+
+
+async def _await_job(job) -> Any:
+    """
+    Wait for a queued job's result. A disconnecting client does not cancel the job; a job
+    cancelled through the API yields None.
+    """
+    try:
+        return await asyncio.shield(job.future)
+    except asyncio.CancelledError:
+        if job.state == "cancelled":
+            return None
+        raise
+
+
 @app.post("/api/extract/{extraction_id}")
 async def extract_document(extraction_id: str):
     """
     Extract information from an uploaded document.
+    The extraction runs as a job on the bounded extraction queue (answers 429 when it is full;
+    a second request for the same document waits for the same job).
     """
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key:
@@ -691,6 +799,184 @@ async def extract_document(extraction_id: str):
     if extraction["status"] == "completed" and extraction["results"]:
         return {"results": extraction["results"]}
     
+    try:
+        job = get_extraction_queue().submit(
+            extraction_id, lambda: _run_extraction(extraction_id), priority=PRIORITY_INTERACTIVE
+        )
+    except QueueFullError as e:
+        return _queue_full_response(e)
+    
+    result = await _await_job(job)
+    if result is None:
+        return {
+            "status": "cancelled",
+            "success": False,
+            "message": "Extraction cancelled",
+        }
+    return result
+
+
+@app.post("/api/extract/{extraction_id}/cancel")
+async def cancel_extraction(extraction_id: str):
+    """Cancel a queued or running extraction job."""
+    if not get_extraction_queue().cancel(extraction_id):
+        raise HTTPException(status_code=404, detail="No queued or running extraction for this ID")
+    return {"success": True, "extraction_id": extraction_id, "status": "cancelled"}
+
+
+@app.post("/api/extract-batch")
+async def extract_batch(
+    files: List[UploadFile] = File(...),
+    stream_format: str = Form("ndjson"),
+    parallelism: int = Form(0),
+):
+    """
+    Upload and extract many documents in one request, streaming each result as it finishes.
+    
+    Every file goes through the /api/upload checks and the full /api/extract pipeline (cache,
+    near-duplicate check, PO matching, duplicate invoice check, persistence). Items run as
+    PRIORITY_BATCH jobs on the extraction queue, at most `parallelism` at a time (default
+    EXTRACTION_BATCH_PARALLELISM, else the number of queue workers); a full queue delays the
+    next item instead of failing it.
+    
+    Args:
+        files: Documents to extract (.pdf, .docx, .doc, .txt)
+        stream_format: "ndjson" (one JSON object per line) or "sse" (Server-Sent Events)
+        parallelism: Maximum items in flight (0 = default)
+        
+    Returns:
+        Streamed events: batch_started, one result per file (in completion order), summary
+    """
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    stream_format = (stream_format or "ndjson").strip().lower()
+    if stream_format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="stream_format must be 'ndjson' or 'sse'")
+    if parallelism <= 0:
+        parallelism = int(os.environ.get("EXTRACTION_BATCH_PARALLELISM", "0")) or get_extraction_queue().workers
+    
+    batch_id = str(uuid.uuid4())
+    started = time.perf_counter()
+    print(f"\n[BATCH] Batch {batch_id}: {len(files)} file(s), parallelism {parallelism}")
+    
+    # Register uploads up front: request files are only readable while the request is open
+    items = []
+    rejected = []
+    for index, file in enumerate(files):
+        try:
+            upload = await _register_upload(file)
+            items.append((index, file.filename, upload["extraction_id"]))
+        except HTTPException as e:
+            rejected.append({
+                "type": "result",
+                "index": index,
+                "file_name": file.filename,
+                "extraction_id": None,
+                "status": "rejected",
+                "error": e.detail,
+            })
+    
+    def encode(event: Dict[str, Any]) -> str:
+        data = json.dumps(event, default=str)
+        if stream_format == "sse":
+            return f"event: {event['type']}\ndata: {data}\n\n"
+        return data + "\n"
+    
+    async def events():
+        counts: Dict[str, int] = {}
+        yield encode({"type": "batch_started", "batch_id": batch_id, "total": len(files)})
+        for event in rejected:
+            counts["rejected"] = counts.get("rejected", 0) + 1
+            yield encode(event)
+        
+        pending = set()
+        queued_items = iter(items)
+        try:
+            while True:
+                while len(pending) < parallelism:
+                    item = next(queued_items, None)
+                    if item is None:
+                        break
+                    pending.add(asyncio.ensure_future(_run_batch_item(*item)))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    event = task.result()
+                    counts[event["status"]] = counts.get(event["status"], 0) + 1
+                    yield encode(event)
+        finally:
+            # Client went away: stop waiting; jobs already on the queue still finish and are saved
+            for task in pending:
+                task.cancel()
+        
+        elapsed = time.perf_counter() - started
+        summary = {
+            "type": "summary",
+            "batch_id": batch_id,
+            "total": len(files),
+            "counts": counts,
+            "elapsed_seconds": round(elapsed, 3),
+            "documents_per_minute": round(len(files) * 60 / elapsed, 2) if elapsed > 0 else None,
+        }
+        print(f"[BATCH] Batch {batch_id} finished in {elapsed:.1f}s: {counts}")
+        yield encode(summary)
+    
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+async def _run_batch_item(index: int, file_name: str, extraction_id: str) -> Dict[str, Any]:
+    """
+    Run one batch item on the extraction queue (waiting while the queue is full) and
+    describe its outcome as a batch result event.
+    """
+    started = time.perf_counter()
+    queue = get_extraction_queue()
+    event = {"type": "result", "index": index, "file_name": file_name, "extraction_id": extraction_id}
+    while True:
+        try:
+            job = queue.submit(extraction_id, lambda: _run_extraction(extraction_id), priority=PRIORITY_BATCH)
+            break
+        except QueueFullError:
+            await asyncio.sleep(1)
+    try:
+        result = await _await_job(job)
+    except HTTPException as e:
+        result = None
+        event.update({"status": "failed", "error": e.detail})
+    except Exception as e:
+        result = None
+        event.update({"status": "failed", "error": str(e)})
+    else:
+        if result is None:
+            event["status"] = "cancelled"
+        elif isinstance(result, dict) and "results" in result:
+            event["status"] = "completed"
+        else:
+            # duplicate_invoice / po_not_found warnings
+            event["status"] = result.get("status", "failed") if isinstance(result, dict) else "failed"
+    if result is not None:
+        event["response"] = result
+    event["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return event
+
+
+def _extraction_cache_options() -> Dict[str, Any]:
+    """Extractor settings that are part of the extraction cache key (model name, single-pass mode)."""
+    default_single_pass = getattr(ExtractionOrchestrator, "default_single_pass", None)
+    return {
+        "model": getattr(ExtractionOrchestrator, "model_name", ""),
+        "single_pass": bool(default_single_pass()) if default_single_pass else False,
+    }
+
+
+async def _run_extraction(extraction_id: str):
+    """Extraction pipeline for one uploaded document (runs on an extraction queue worker)."""
+    api_key = os.getenv('OPENAI_API_KEY')
+    extraction = extractions_store[extraction_id]
+    
     try:
         # Initialize status tracking (but don't set extraction_started yet - wait for cache check)
         extraction["status"] = "processing"
@@ -705,71 +991,109 @@ async def extract_document(extraction_id: str):
         file_hash = extraction.get("file_hash")
         file_ext = Path(file_path).suffix.lower()
         
-        # Proceed with extraction (cache disabled; past data is in extractions store only)
-        # NOW set extraction_started status (after confirming it's not cache/duplicate)
-        extraction_status[extraction_id] = {
-            "current_step": "extraction_started",
-            "step_description": "EXTRACTION PROCESS STARTED",
-            "progress_percent": 15,
-            "skip_progress": False,  # Explicitly show progress bar
-            "is_complete": False
-        }
-        time.sleep(0.5)  # Give frontend time to capture this status (matches 500ms polling interval)
+        # Identical content extracted by the same pipeline version/model: reuse the result
+        cache_manager = get_cache_manager()
+        cache_options = _extraction_cache_options()
+        cached = await asyncio.to_thread(cache_manager.load_extraction_cache, file_hash, **cache_options) if file_hash else None
+        
+        if cached is not None:
+            print(f"\n[CACHE] Reusing extraction result for identical content (cached {cached.get('cached_at', '')})")
+            extracted_data = cached["extracted_data"]
+            metadata = {
+                **cached.get("metadata", {}),
+                "file_path": file_path,
+                "file_name": Path(file_path).name,
+                "cache_hit": True,
+            }
+        else:
+            # NOW set extraction_started status (after confirming it's not cached)
+            extraction_status[extraction_id] = {
+                "current_step": "extraction_started",
+                "step_description": "EXTRACTION PROCESS STARTED",
+                "progress_percent": 15,
+                "skip_progress": False,  # Explicitly show progress bar
+                "is_complete": False
+            }
         
-        # Convert DOCX to PDF with page numbers if needed
-        if should_convert_to_pdf(file_path):
-            print(f"\n[STEP 1] Converting DOCX to PDF with page numbers...")
-            print(f"   - Source: {Path(file_path).name}")
+            # Convert DOCX to PDF with page numbers if needed
+            if should_convert_to_pdf(file_path):
+                print(f"\n[STEP 1] Converting DOCX to PDF with page numbers...")
+                print(f"   - Source: {Path(file_path).name}")
             
-            pdf_path = convert_docx_to_pdf(file_path)
+                pdf_path = await asyncio.to_thread(convert_docx_to_pdf, file_path)
             
-            # Update file path to PDF if conversion succeeded
-            if pdf_path != file_path and os.path.exists(pdf_path):
-                # Clean up original DOCX
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                file_path = pdf_path
-                extraction["file_path"] = pdf_path
-                print(f"   [OK] Conversion successful: {Path(pdf_path).name}")
-        else:
-            print(f"\n[STEP 1] Document is already in {file_ext.upper()} format, no conversion needed")
+                # Update file path to PDF if conversion succeeded
+                if pdf_path != file_path and os.path.exists(pdf_path):
+                    # Clean up original DOCX
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                    file_path = pdf_path
+                    extraction["file_path"] = pdf_path
+                    print(f"   [OK] Conversion successful: {Path(pdf_path).name}")
+            else:
+                print(f"\n[STEP 1] Document is already in {file_ext.upper()} format, no conversion needed")
         
-        # Initialize orchestrator (reuse singleton instance to avoid creating multiple OpenAI clients)
-        print(f"\n[STEP 2] Initializing Extraction Orchestrator...")
-        print(f"   - OpenAI API: Configured")
-        print(f"   - GCS Vision: Enabled")
-        print(f"   - Semantic Search: Enabled")
+            # Parse once up front so a re-upload of a stored invoice is caught before any LLM call;
+            # the agent reuses this text instead of parsing again
+            document_text, page_map = None, None
+            if near_duplicate_index.enabled:
+                print(f"\n[STEP 1.5] Checking for near-identical stored invoice...")
+                try:
+                    parser = DocumentParser(use_gcs_vision=True)
+                    document_text, page_map = await asyncio.to_thread(parser.parse_with_pages, file_path, use_ocr=False)
+                    near_duplicate = await asyncio.to_thread(
+                        check_near_duplicate_invoice, minhash_signature(document_text), extraction_id)
+                except Exception as e:
+                    near_duplicate = None
+                    print(f"   [WARNING] Could not parse document for near-duplicate check: {e}")
+                if near_duplicate and near_duplicate["similarity"] >= near_duplicate_index.reject_threshold:
+                    return _near_duplicate_response(extraction_id, extraction, near_duplicate, file_path)
+                print(f"   [OK] No near-identical invoice found")
+        
+            # Initialize orchestrator (reuse singleton instance to avoid creating multiple OpenAI clients)
+            print(f"\n[STEP 2] Initializing Extraction Orchestrator...")
+            print(f"   - OpenAI API: Configured")
+            print(f"   - GCS Vision: Enabled")
+            print(f"   - Semantic Search: Enabled")
         
-        if get_orchestrator:
-            # Use singleton pattern to reuse orchestrator instance
-            orchestrator = get_orchestrator(
-                api_key=api_key,
-                use_gcs_vision=True,  # Vision API enabled for OCR on image-based PDFs
-                use_semantic_search=True
+            if get_orchestrator:
+                # Use singleton pattern to reuse orchestrator instance
+                orchestrator = get_orchestrator(
+                    api_key=api_key,
+                    use_gcs_vision=True,  # Vision API enabled for OCR on image-based PDFs
+                    use_semantic_search=True
+                )
+            else:
+                # Fallback for LangGraph agent
+                orchestrator = ExtractionOrchestrator(
+                    api_key=api_key,
+                    use_gcs_vision=True,
+                    use_semantic_search=True
+                )
+            print(f"   [OK] Orchestrator initialized (reusing instance)")
+        
+            print(f"\n[STEP 3] Extracting data from document...")
+            # Async graph run: LLM calls are awaited, so status polling and other documents
+            # proceed on the event loop without holding a thread per extraction
+            extracted_data, metadata = await orchestrator.aextract_from_file(
+                file_path, 
+                use_ocr=False, 
+                extraction_id=extraction_id,
+                document_text=document_text,
+                page_map=page_map
             )
-        else:
-            # Fallback for LangGraph agent
-            orchestrator = ExtractionOrchestrator(
-                api_key=api_key,
-                use_gcs_vision=True,
-                use_semantic_search=True
+            
+            await asyncio.to_thread(
+                cache_manager.save_extraction_cache,
+                file_hash, extracted_data, metadata, metadata.get("document_text", ""), **cache_options
             )
-        print(f"   [OK] Orchestrator initialized (reusing instance)")
-        
-        print(f"\n[STEP 3] Extracting data from document...")
-        # Run extraction in a thread so server can respond to status polling requests
-        extracted_data, metadata = await asyncio.to_thread(
-            orchestrator.extract_from_file, 
-            file_path, 
-            use_ocr=False, 
-            extraction_id=extraction_id
-        )
         
         # Check if OCR was actually used (from metadata)
         if metadata.get("extraction_method") == "vision_api" or metadata.get("used_ocr"):
             print(f"   [OCR] Document processed with OCR (scanned PDF detected)")
         
         doc_type = extracted_data.get("document_type", "UNKNOWN")
+        text_signature = minhash_signature(metadata.get("document_text", ""))
         print(f"   [OK] Extraction completed!")
         print(f"   - Document Type: {doc_type}")
         print(f"   - Fields Extracted: {len(extracted_data)} fields")
@@ -784,7 +1108,8 @@ async def extract_document(extraction_id: str):
                 print(f"\n[STEP 3.5] Checking for duplicate invoice ID: {invoice_id}")
                 
                 # Check if this invoice ID already exists
-                duplicate = check_duplicate_invoice_id(invoice_id, extraction_id)
+                vendor = (extracted_data.get("party_names") or {}).get("vendor", "")
+                duplicate = await asyncio.to_thread(check_duplicate_invoice_id, invoice_id, extraction_id, vendor=vendor)
                 
                 if duplicate:
                     # Duplicate found! Don't save, return warning
@@ -843,55 +1168,32 @@ async def extract_document(extraction_id: str):
                     print(f"   [OK] Invoice ID is unique, proceeding with save")
             else:
                 print(f"   [WARNING] No invoice ID found in extracted data, skipping duplicate check")
+            
+            # Similar text to a stored invoice (re-scan, or a recurring invoice on the same template):
+            # flagged for review only, the invoice ID check above decides rejection. Near-identical
+            # uploads were already stopped before extraction (STEP 1.5)
+            near_duplicate = await asyncio.to_thread(check_near_duplicate_invoice, text_signature, extraction_id)
+            if near_duplicate:
+                _flag_near_duplicate(extraction_id, extracted_data, near_duplicate)
         # ============== END DUPLICATE CHECK ==============
         
         # ============== PO / GRN / VENDOR MATCHING (INVOICES ONLY) ==============
         if doc_type == "INVOICE":
             print(f"\n[STEP 3.6] Checking PO / GRN / vendor matching for invoice...")
 
-            po_matched, po_data, po_message, match_notifications = match_invoice(extracted_data)
+            po_matched, po_data, po_message, match_notifications = await asyncio.to_thread(match_invoice, extracted_data)
 
             if not po_matched:
                 print(f"   [NOT MATCHED] {po_message}")
                 print(f"   [ACTION] Storing extraction for dashboard (NOT saving to Excel)")
 
-                grn_matched = False
-                item_issues = []
-                if po_data and isinstance(po_data, dict):
-                    grn_matched = po_data.get("_grn_matched", False)
-                    item_issues = po_data.get("_item_issues", [])
-
-                # Determine specific failure reason for frontend
-                failure_reason = "po_not_found"
-                if match_notifications:
-                    last_error = [n for n in match_notifications if n["type"] == "error"]
-                    last_warn = [n for n in match_notifications if n["type"] == "warning"]
-                    if last_error:
-                        t = last_error[-1]["title"].lower()
-                        if "vendor" in t:
-                            failure_reason = "vendor_mismatch"
-                        elif "po not found" in t:
-                            failure_reason = "po_not_found"
-                    elif last_warn:
-                        t = last_warn[-1]["title"].lower()
-                        if "quantity" in t or "mismatch" in t:
-                            failure_reason = "item_mismatch"
-                        elif "grn not found" in t:
-                            failure_reason = "grn_not_found"
-
-                extracted_data["_po_match"] = {
-                    "matched": False,
-                    "po_number": po_data.get("po_number", "") if po_data else "",
-                    "po_filename": po_data.get("filename", "") if po_data else "",
-                    "grn_matched": grn_matched,
-                    "grn_filename": (po_data.get("_grn_data") or {}).get("filename", "") if po_data else "",
-                    "match_message": po_message,
-                    "item_issues": item_issues,
-                    "failure_reason": failure_reason,
-                }
+                extracted_data["_po_match"] = _po_match_info(po_matched, po_data, po_message, match_notifications)
+                failure_reason = extracted_data["_po_match"]["failure_reason"]
+                item_issues = extracted_data["_po_match"]["item_issues"]
 
                 extraction["extracted_data"] = extracted_data
                 extraction["metadata"] = metadata
+                extraction["text_minhash"] = text_signature
                 extraction["status"] = "po_not_found"
                 extraction["payment_status"] = "unpaid"
 
@@ -910,7 +1212,7 @@ async def extract_document(extraction_id: str):
                 }
 
                 update_dashboard(results, po_matched=False)
-                save_extractions_to_file()
+                await asyncio.to_thread(save_extractions_to_file, extraction_id)
 
                 if os.path.exists(file_path):
                     os.remove(file_path)
@@ -939,15 +1241,7 @@ async def extract_document(extraction_id: str):
                 }
             else:
                 print(f"   [OK] Match succeeded: {po_message}")
-                grn_data = (po_data.get("_grn_data") or {}) if po_data else {}
-                extracted_data["_po_match"] = {
-                    "matched": True,
-                    "po_number": po_data.get("po_number", "") if po_data else "",
-                    "po_filename": po_data.get("filename", "") if po_data else "",
-                    "grn_matched": True,
-                    "grn_filename": grn_data.get("filename", "") if isinstance(grn_data, dict) else "",
-                    "match_message": po_message,
-                }
+                extracted_data["_po_match"] = _po_match_info(po_matched, po_data, po_message, match_notifications)
                 for n in match_notifications:
                     _add_notification(n["type"], n["title"], n["detail"], extraction_id=extraction_id)
         # ============== END PO / GRN / VENDOR MATCHING ==============
@@ -955,6 +1249,7 @@ async def extract_document(extraction_id: str):
         # Store extracted data with metadata for selected factors page
         extraction["extracted_data"] = extracted_data
         extraction["metadata"] = metadata
+        extraction["text_minhash"] = text_signature
         
         print(f"\n[STEP 5] Transforming data for frontend...")
         results = transform_to_frontend_format(extracted_data, metadata)
@@ -986,7 +1281,7 @@ async def extract_document(extraction_id: str):
                 fn = extraction.get("file_name", "invoice.pdf")
                 if fp and os.path.isfile(fp):
                     dest = DOCUMENTS_REPO_INVOICE / fn
-                    shutil.copy2(fp, dest)
+                    await asyncio.to_thread(shutil.copy2, fp, dest)
                     print(f"   [OK] Copied to documents_repo/Invoice/{fn}")
             except Exception as ex:
                 print(f"   [NOTE] documents_repo Invoice copy: {ex}")
@@ -1003,7 +1298,8 @@ async def extract_document(extraction_id: str):
             print(f"   - File: {excel_path.name}")
             print(f"   - Document: {extraction['file_name']}")
             
-            success = update_contract_excel(
+            success = await asyncio.to_thread(
+                update_contract_excel,
                 extracted_data=extracted_data,
                 file_name=extraction["file_name"],
                 excel_file_path=str(excel_path)
@@ -1022,7 +1318,7 @@ async def extract_document(extraction_id: str):
             print(f"   [OK] Temporary files removed")
         
         # Save extractions to JSON file for persistence
-        save_extractions_to_file()
+        await asyncio.to_thread(save_extractions_to_file, extraction_id)
         
         print(f"\n" + "="*80)
         print(f"[SUCCESS] EXTRACTION COMPLETED SUCCESSFULLY!")
@@ -1036,8 +1332,19 @@ async def extract_document(extraction_id: str):
         
         return {"results": results}
         
+    except asyncio.CancelledError:
+        extraction["status"] = "cancelled"
+        print(f"\n[EXTRACT] Extraction cancelled: {extraction_id}")
+        raise
     except Exception as e:
         extraction["status"] = "failed"
+        extraction_status[extraction_id] = {
+            "current_step": "failed",
+            "step_description": f"Extraction failed: {e}",
+            "progress_percent": 100,
+            "skip_progress": True,
+            "is_complete": True,
+        }
         print(f"\n" + "="*80)
         print(f"[ERROR] EXTRACTION FAILED!")
         print("="*80)
@@ -1062,8 +1369,7 @@ async def get_dashboard():
         print(f"[DASHBOARD] Error getting PO count: {e}")
     try:
         cache_manager = get_cache_manager()
-        grn_index = cache_manager.get_all_grns()
-        dashboard_data["total_grn"] = len(grn_index) if isinstance(grn_index, dict) else 0
+        dashboard_data["total_grn"] = cache_manager.get_grn_count()
     except Exception as e:
         print(f"[DASHBOARD] Error getting GRN count: {e}")
     return dashboard_data
@@ -1202,6 +1508,55 @@ async def get_extraction_by_id(extraction_id: str):
 @app.get("/api/extraction-status/{extraction_id}")
 async def get_extraction_status(extraction_id: str):
     """Get current processing status for an extraction."""
+    return _extraction_status_response(extraction_id)
+
+
+# Extraction store statuses after which no further progress is reported
+FINAL_EXTRACTION_STATUSES = ("completed", "po_not_found", "duplicate", "failed", "cancelled")
+
+
+@app.get("/api/extraction-status/{extraction_id}/stream")
+async def stream_extraction_status(extraction_id: str, request: Request):
+    """
+    Server-Sent Events stream of an extraction's progress (replaces polling
+    /api/extraction-status).
+    
+    Sends the current status right away, then one "status" event per status update as the
+    pipeline publishes it, and an "end" event once the extraction has finished (completed,
+    po_not_found, duplicate, failed or cancelled). A comment line every 15 s keeps idle
+    connections open.
+    """
+    async def events():
+        queue = extraction_status_manager.subscribe(extraction_id)
+        try:
+            while True:
+                response = _extraction_status_response(extraction_id)
+                yield f"event: status\ndata: {json.dumps(response, default=str)}\n\n"
+                if response["status"] in FINAL_EXTRACTION_STATUSES or response["is_complete"]:
+                    yield "event: end\ndata: {}\n\n"
+                    return
+                try:
+                    await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                # Coalesce a burst of updates into one event with the latest status
+                while not queue.empty():
+                    queue.get_nowait()
+        finally:
+            extraction_status_manager.unsubscribe(extraction_id, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _extraction_status_response(extraction_id: str) -> Dict[str, Any]:
+    """Status payload shared by /api/extraction-status and its event stream."""
     # Check if extraction exists
     if extraction_id not in extractions_store:
         # Return default status if not found (might be polling before upload completes)
@@ -1239,14 +1594,18 @@ async def get_extraction_status(extraction_id: str):
             "progress_percent": 0
         }
     
-    return {
+    response = {
         "extraction_id": extraction_id,
         "status": extraction.get("status", "unknown"),
         "current_step": status_info.get("current_step", ""),
         "step_description": status_info.get("step_description", ""),
         "progress_percent": status_info.get("progress_percent", 0),
-        "is_complete": extraction.get("status") == "completed"
+        "is_complete": extraction.get("status") == "completed" or bool(status_info.get("is_complete"))
     }
+    for key in ("queue_position", "skip_progress", "from_cache"):
+        if key in status_info:
+            response[key] = status_info[key]
+    return response
 
 
 @app.get("/api/excel-data")
@@ -1327,7 +1686,19 @@ async def extract_from_file(
         cache_manager = get_cache_manager()
         file_hash = cache_manager.compute_content_hash(content)
         
-        # Save to temp file and process (cache disabled)
+        cache_options = _extraction_cache_options()
+        cached = cache_manager.load_extraction_cache(file_hash, use_ocr=use_ocr, **cache_options)
+        if cached is not None:
+            metadata = {k: v for k, v in cached.get("metadata", {}).items() if k not in ("document_text", "page_map")}
+            metadata.update(file_name=file.filename, cache_hit=True)
+            return ExtractionResponse(
+                success=True,
+                extracted_data=cached["extracted_data"],
+                metadata=metadata,
+                message=f"Successfully extracted data from {file.filename} (cached)"
+            )
+        
+        # Save to temp file and process
         with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
             temp_file.write(content)
             temp_path = temp_file.name
@@ -1347,7 +1718,11 @@ async def extract_from_file(
                     use_semantic_search=use_semantic_search
                 )
             
-            extracted_data, metadata = orchestrator.extract_from_file(temp_path, use_ocr=use_ocr, extraction_id=None)
+            extracted_data, metadata = await orchestrator.aextract_from_file(temp_path, use_ocr=use_ocr, extraction_id=None)
+            cache_manager.save_extraction_cache(
+                file_hash, extracted_data, metadata, metadata.get("document_text", ""),
+                use_ocr=use_ocr, **cache_options
+            )
             
             if "document_text" in metadata:
                 del metadata["document_text"]
@@ -1396,7 +1771,7 @@ async def extract_from_text(request: TextExtractionRequest):
                 use_semantic_search=request.use_semantic_search
             )
         
-        extracted_data, metadata = orchestrator.extract_from_text(request.text)
+        extracted_data, metadata = await orchestrator.aextract_from_text(request.text)
         
         if "document_text" in metadata:
             del metadata["document_text"]
@@ -1416,13 +1791,69 @@ async def extract_from_text(request: TextExtractionRequest):
 
 # ============== Helper Functions ==============
 
-def check_duplicate_invoice_id(invoice_id: str, current_extraction_id: str = None) -> Optional[Dict[str, Any]]:
+def _po_match_info(po_matched: bool, po_data: Optional[Dict[str, Any]], po_message: str,
+                   match_notifications: List[Dict[str, str]]) -> Dict[str, Any]:
     """
-    Check if an invoice ID already exists in the database.
+    The _po_match record stored on an invoice's extracted_data from a match_invoice() result.
+    Unmatched invoices also get their item issues and a failure_reason for the frontend
+    (po_not_found, vendor_mismatch, item_mismatch or grn_not_found).
+    """
+    if po_matched:
+        grn_data = (po_data.get("_grn_data") or {}) if po_data else {}
+        return {
+            "matched": True,
+            "po_number": po_data.get("po_number", "") if po_data else "",
+            "po_filename": po_data.get("filename", "") if po_data else "",
+            "grn_matched": True,
+            "grn_filename": grn_data.get("filename", "") if isinstance(grn_data, dict) else "",
+            "match_message": po_message,
+        }
+
+    grn_matched = False
+    item_issues = []
+    if po_data and isinstance(po_data, dict):
+        grn_matched = po_data.get("_grn_matched", False)
+        item_issues = po_data.get("_item_issues", [])
+
+    # Determine specific failure reason for frontend
+    failure_reason = "po_not_found"
+    if match_notifications:
+        last_error = [n for n in match_notifications if n["type"] == "error"]
+        last_warn = [n for n in match_notifications if n["type"] == "warning"]
+        if last_error:
+            t = last_error[-1]["title"].lower()
+            if "vendor" in t:
+                failure_reason = "vendor_mismatch"
+            elif "po not found" in t:
+                failure_reason = "po_not_found"
+        elif last_warn:
+            t = last_warn[-1]["title"].lower()
+            if "quantity" in t or "mismatch" in t:
+                failure_reason = "item_mismatch"
+            elif "grn not found" in t:
+                failure_reason = "grn_not_found"
+
+    return {
+        "matched": False,
+        "po_number": po_data.get("po_number", "") if po_data else "",
+        "po_filename": po_data.get("filename", "") if po_data else "",
+        "grn_matched": grn_matched,
+        "grn_filename": (po_data.get("_grn_data") or {}).get("filename", "") if po_data else "",
+        "match_message": po_message,
+        "item_issues": item_issues,
+        "failure_reason": failure_reason,
+    }
+
+
+def check_duplicate_invoice_id(invoice_id: str, current_extraction_id: str = None,
+                               vendor: str = "") -> Optional[Dict[str, Any]]:
+    """
+    Check if an invoice ID already exists in the database for the same vendor.
     
     Args:
         invoice_id: The invoice ID to check
         current_extraction_id: Current extraction ID to exclude from check (for updates)
+        vendor: Vendor of the invoice being checked ("" = match any vendor)
         
     Returns:
         Dictionary with existing extraction info if duplicate found, None otherwise
@@ -1430,47 +1861,123 @@ def check_duplicate_invoice_id(invoice_id: str, current_extraction_id: str = Non
     if not invoice_id or not invoice_id.strip():
         return None
     
-    # Normalize invoice ID for comparison (case-insensitive, trim whitespace)
-    normalized_id = invoice_id.strip().lower()
+    # Hash lookup on the normalized invoice id (case-insensitive, trimmed), scoped by vendor
+    duplicate_index.sync(extractions_store)
+    extraction_id = duplicate_index.find_invoice(invoice_id, vendor=vendor, exclude_id=current_extraction_id)
+    if extraction_id is None:
+        return None
+    extraction = extractions_store.get(extraction_id) or {}
+    extracted_data = extraction.get("extracted_data", {})
+    doc_ids = extracted_data.get("document_ids", {})
+    return {
+        "extraction_id": extraction_id,
+        "invoice_id": doc_ids.get("invoice_id") or doc_ids.get("invoice_number") or "",
+        "file_name": extraction.get("file_name", "Unknown"),
+        "extracted_at": extraction.get("extracted_at", ""),
+        "vendor": extracted_data.get("party_names", {}).get("vendor", ""),
+        "amount": extracted_data.get("amount", ""),
+        "currency": extracted_data.get("currency", "")
+    }
+
+
+def check_near_duplicate_invoice(text_signature: Optional[List[int]],
+                                 current_extraction_id: str = None) -> Optional[Dict[str, Any]]:
+    """
+    Find a stored invoice whose document text is nearly identical (MinHash/LSH estimate at or
+    above NEAR_DUPLICATE_THRESHOLD), e.g. a re-scan whose invoice ID was read differently.
     
-    # Check in-memory store first (fast)
-    for extraction_id, extraction in extractions_store.items():
-        # Skip current extraction if provided
-        if current_extraction_id and extraction_id == current_extraction_id:
-            continue
+    Args:
+        text_signature: minhash_signature() of the new document's text
+        current_extraction_id: Current extraction ID to exclude from check
         
-        # Only check completed extractions
-        if extraction.get("status") == "completed":
-            extracted_data = extraction.get("extracted_data", {})
-            
-            # Only check INVOICE documents
-            if extracted_data.get("document_type") == "INVOICE":
-                doc_ids = extracted_data.get("document_ids", {})
-                
-                # Check both invoice_id and invoice_number fields
-                existing_invoice_id = (
-                    doc_ids.get("invoice_id") or 
-                    doc_ids.get("invoice_number") or
-                    ""
-                )
-                
-                # Normalize existing ID for comparison
-                if existing_invoice_id:
-                    normalized_existing = existing_invoice_id.strip().lower()
-                    
-                    if normalized_existing == normalized_id:
-                        # Found duplicate!
-                        return {
-                            "extraction_id": extraction_id,
-                            "invoice_id": existing_invoice_id,
-                            "file_name": extraction.get("file_name", "Unknown"),
-                            "extracted_at": extraction.get("extracted_at", ""),
-                            "vendor": extracted_data.get("party_names", {}).get("vendor", ""),
-                            "amount": extracted_data.get("amount", ""),
-                            "currency": extracted_data.get("currency", "")
-                        }
-    
-    return None
+    Returns:
+        Same fields as check_duplicate_invoice_id plus "similarity", or None
+    """
+    if not text_signature:
+        return None
+    near_duplicate_index.sync(extractions_store)
+    found = near_duplicate_index.find(text_signature, exclude_id=current_extraction_id)
+    if found is None:
+        return None
+    extraction_id, similarity = found
+    extraction = extractions_store.get(extraction_id) or {}
+    extracted_data = extraction.get("extracted_data", {})
+    doc_ids = extracted_data.get("document_ids", {})
+    return {
+        "extraction_id": extraction_id,
+        "invoice_id": doc_ids.get("invoice_id") or doc_ids.get("invoice_number") or "",
+        "file_name": extraction.get("file_name", "Unknown"),
+        "extracted_at": extraction.get("extracted_at", ""),
+        "vendor": extracted_data.get("party_names", {}).get("vendor", ""),
+        "amount": extracted_data.get("amount", ""),
+        "currency": extracted_data.get("currency", ""),
+        "similarity": round(similarity, 3),
+    }
+
+
+def _flag_near_duplicate(extraction_id: str, extracted_data: Dict[str, Any], duplicate: Dict[str, Any]):
+    """Record that an invoice is a near-duplicate of a stored one (on the record and as a notification)."""
+    similarity_pct = int(duplicate["similarity"] * 100)
+    print(f"   [NEAR-DUPLICATE] {similarity_pct}% similar to {duplicate['file_name']} "
+          f"(invoice ID '{duplicate['invoice_id']}', processed {duplicate['extracted_at']}) - flagged for review")
+    extracted_data["_near_duplicate"] = {
+        "extraction_id": duplicate["extraction_id"],
+        "invoice_id": duplicate["invoice_id"],
+        "existing_document": duplicate["file_name"],
+        "processed_date": duplicate["extracted_at"],
+        "similarity": duplicate["similarity"],
+    }
+    _add_notification(
+        "warning",
+        "Possible duplicate invoice",
+        f"Document text is {similarity_pct}% identical to '{duplicate['file_name']}' "
+        f"(invoice ID '{duplicate['invoice_id'] or 'N/A'}'). Verify this is not a re-scan of an invoice already processed.",
+        extraction_id=extraction_id,
+    )
+
+
+def _near_duplicate_response(extraction_id: str, extraction: Dict[str, Any],
+                             duplicate: Dict[str, Any], file_path: str) -> Dict[str, Any]:
+    """Stop an upload whose text is near-identical to a stored invoice; same response shape as the invoice ID check."""
+    similarity_pct = int(duplicate["similarity"] * 100)
+    print(f"   [NEAR-DUPLICATE FOUND] {similarity_pct}% identical to {duplicate['file_name']} "
+          f"(invoice ID '{duplicate['invoice_id']}', processed {duplicate['extracted_at']})")
+    print(f"   [ACTION] Skipping extraction - returning warning to user")
+    extraction["status"] = "duplicate"
+    extraction_status[extraction_id] = {
+        "current_step": "duplicate",
+        "step_description": "Duplicate invoice detected",
+        "progress_percent": 100,
+        "skip_progress": True,
+        "is_duplicate": True,
+        "is_complete": True,
+        "duplicate_info": {
+            "invoice_id": duplicate["invoice_id"],
+            "existing_file": duplicate["file_name"],
+            "processed_date": duplicate["extracted_at"],
+            "similarity": duplicate["similarity"],
+        }
+    }
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    return {
+        "status": "duplicate_invoice",
+        "success": False,
+        "warning": True,
+        "message": f"⚠️ This document is {similarity_pct}% identical to '{duplicate['file_name']}' already in the system.",
+        "details": {
+            "invoice_id": duplicate["invoice_id"],
+            "existing_document": duplicate["file_name"],
+            "processed_date": duplicate["extracted_at"],
+            "extraction_id": duplicate["extraction_id"],
+            "vendor": duplicate.get("vendor", ""),
+            "amount": duplicate.get("amount", ""),
+            "currency": duplicate.get("currency", ""),
+            "match_type": "near_duplicate",
+            "similarity": duplicate["similarity"],
+        },
+        "suggestion": "This looks like a re-upload of a previously processed invoice. Please verify if you uploaded the correct document."
+    }
 
 
 def _is_bank_address(address: str) -> bool:
@@ -2220,6 +2727,8 @@ async def upload_purchase_order(file: UploadFile = File(...)):
                 cache_manager.save_all_purchase_orders_json(cache_manager.get_all_pos_full())
             except Exception as ex:
                 print(f"   [NOTE] all_purchase_orders.json update: {ex}")
+            # Re-match invoices parked while this PO was missing
+            rematch = await _arematch_pending_invoices([reference_document("po", extracted_data)])
             
             # Store in memory for quick access
             po_extractions_store[extraction_id] = {
@@ -2257,6 +2766,7 @@ async def upload_purchase_order(file: UploadFile = File(...)):
                 "results": results,  # For dashboard display
                 "po_number": po_number,
                 "gcs_uri": gcs_uri,
+                "rematched_invoices": rematch["matched"],
                 "message": f"PO extracted successfully: {po_number}"
             }
             
@@ -2306,6 +2816,8 @@ async def upload_grn(file: UploadFile = File(...)):
             cache_manager.save_all_grns_json(cache_manager.get_all_grns_full())
             dest = DOCUMENTS_REPO_GRN / file.filename
             shutil.copy2(temp_path, dest)
+            # Re-match invoices parked while this GRN was missing
+            rematch = await _arematch_pending_invoices([reference_document("grn", extracted_data)])
             doc_ids = extracted_data.get("document_ids", {})
             po_number = doc_ids.get("po_number", "") or doc_ids.get("order_number", "") or "N/A"
             return {
@@ -2314,6 +2826,7 @@ async def upload_grn(file: UploadFile = File(...)):
                 "file_hash": file_hash,
                 "extracted_data": extracted_data,
                 "po_number": po_number,
+                "rematched_invoices": rematch["matched"],
                 "message": f"GRN extracted and saved. PO reference: {po_number}",
             }
         finally:
@@ -2331,43 +2844,16 @@ async def get_match_status():
     """
     try:
         cache_manager = get_cache_manager()
-        po_index = cache_manager.get_all_pos()
-        grn_index = cache_manager.get_all_grns()
-        if not isinstance(po_index, dict):
-            po_index = {}
-        if not isinstance(grn_index, dict):
-            grn_index = {}
-        # Build map: normalized po_number (lower) -> GRN entry
-        grn_by_po: Dict[str, Dict] = {}
-        for _h, entry in grn_index.items():
-            if not isinstance(entry, dict):
-                continue
-            pno = (entry.get("po_number") or "").strip().lower()
-            if pno:
-                grn_by_po[pno] = entry
+        invoice_po_index.sync(extractions_store)
         ready = []
         pending = []
-        for file_hash, po_entry in po_index.items():
-            if not isinstance(po_entry, dict):
-                continue
+        for _file_hash, po_entry, grn_entry in cache_manager.get_po_grn_join():
             po_number = (po_entry.get("po_number") or "").strip()
             if not po_number:
                 pending.append({"po_number": "N/A", "filename": po_entry.get("filename"), "reason": "No PO number"})
                 continue
-            grn_entry = grn_by_po.get(po_number.lower())
-            # Find invoice with this PO number
-            invoice_match = None
-            for _eid, ext in extractions_store.items():
-                if ext.get("status") not in ("completed", "po_not_found"):
-                    continue
-                ed = ext.get("extracted_data") or {}
-                if (ed.get("document_type") or "").upper() != "INVOICE":
-                    continue
-                doc_ids = ed.get("document_ids") or {}
-                inv_po = (doc_ids.get("po_number") or doc_ids.get("order_number") or "").strip()
-                if inv_po and (inv_po.lower() == po_number.lower() or po_number.lower() in inv_po.lower() or inv_po.lower() in po_number.lower()):
-                    invoice_match = ext
-                    break
+            # Invoice whose PO reference equals / contains / is contained in this PO number
+            invoice_match = invoice_po_index.find_invoice(po_number)
             if grn_entry and invoice_match:
                 ready.append({
                     "po_number": po_number,
@@ -2396,6 +2882,119 @@ async def get_match_status():
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
 
 
+async def _arematch_pending_invoices(references: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Run rematch_pending_invoices on a worker thread (index loads, PO matching, Excel writes and
+    uploads block), then move the re-matched invoices to "matched" in the dashboard counts here
+    on the event loop, where the other dashboard updates happen.
+    """
+    summary = await asyncio.to_thread(rematch_pending_invoices, references)
+    matched = len(summary["matched"])
+    if matched:
+        dashboard_data["matched_invoices"] += matched
+        dashboard_data["unmatched_invoices"] = max(0, dashboard_data["unmatched_invoices"] - matched)
+    return summary
+
+
+# One re-match at a time: concurrent runs would match (and count) the same parked invoice twice
+_rematch_lock = threading.Lock()
+
+
+def rematch_pending_invoices(references: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Re-run PO / GRN matching for parked invoices (status po_not_found) after POs or GRNs
+    were saved. Only invoices the new documents can affect are re-matched: found through the
+    invoice PO-number index, plus invoices without a PO number whose vendor fits a new PO
+    (those are matched by vendor/customer/amount). No rescan of the store, no re-extraction;
+    changed records are saved in one batch. Blocking: call it through _arematch_pending_invoices,
+    which also updates the dashboard counts.
+
+    Args:
+        references: [{"kind": "po" | "grn", "po_number": ..., "vendor": ...}] of the saved documents
+
+    Returns:
+        {"checked": n, "matched": [extraction_id, ...], "still_pending": n}
+    """
+    summary = {"checked": 0, "matched": [], "still_pending": 0}
+    if not references:
+        return summary
+    with _rematch_lock:
+        return _rematch_pending_invoices_locked(references, summary)
+
+
+def _rematch_pending_invoices_locked(references: List[Dict[str, str]], summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Body of rematch_pending_invoices (caller holds _rematch_lock)."""
+    candidates: List[str] = []
+    seen = set()
+    try:
+        invoice_po_index.sync(extractions_store)
+        without_po = None
+        for ref in references:
+            extraction_ids = invoice_po_index.pending_invoices(ref.get("po_number", ""))
+            if ref.get("kind") == "po":
+                if without_po is None:
+                    without_po = invoice_po_index.pending_without_po()
+                for extraction_id in without_po:
+                    party_names = ((extractions_store.get(extraction_id) or {}).get("extracted_data") or {}).get("party_names") or {}
+                    invoice_vendor = party_names.get("vendor", "") or party_names.get("party_1", "") or ""
+                    if vendor_names_match(invoice_vendor, ref.get("vendor", "")):
+                        extraction_ids.append(extraction_id)
+            for extraction_id in extraction_ids:
+                if extraction_id not in seen:
+                    seen.add(extraction_id)
+                    candidates.append(extraction_id)
+    except Exception as e:
+        print(f"[REMATCH] Error finding parked invoices: {e}")
+        return summary
+    if not candidates:
+        return summary
+
+    print(f"[REMATCH] {len(candidates)} parked invoice(s) affected by {len(references)} new PO/GRN document(s)")
+    po_matcher = get_po_matcher()
+    changed = []
+    for extraction_id in candidates:
+        extraction = extractions_store.get(extraction_id)
+        if not extraction or extraction.get("status") != "po_not_found":
+            continue
+        extracted_data = extraction.get("extracted_data") or {}
+        summary["checked"] += 1
+        try:
+            po_matched, po_data, po_message, match_notifications = po_matcher.match_invoice_with_po(extracted_data)
+        except Exception as e:
+            print(f"[REMATCH] Error matching {extraction.get('file_name', extraction_id)}: {e}")
+            continue
+        extracted_data["_po_match"] = _po_match_info(po_matched, po_data, po_message, match_notifications)
+        extraction["extracted_data"] = extracted_data
+        changed.append(extraction_id)
+        if not po_matched:
+            summary["still_pending"] += 1
+            continue
+
+        print(f"[REMATCH] {extraction.get('file_name', extraction_id)}: {po_message}")
+        extraction["results"] = transform_to_frontend_format(extracted_data, extraction.get("metadata") or {})
+        extraction["payment_status"] = "ready_for_payment"
+        extraction["rematched_at"] = datetime.now().isoformat()
+        # Status last: readers on the event loop never see "completed" without results
+        extraction["status"] = "completed"
+        summary["matched"].append(extraction_id)
+        for n in match_notifications:
+            _add_notification(n["type"], n["title"], n["detail"], extraction_id=extraction_id)
+        try:
+            excel_path = Path(__file__).parent / "contract_extractions.xlsx"
+            update_contract_excel(
+                extracted_data=extracted_data,
+                file_name=extraction.get("file_name", "invoice.pdf"),
+                excel_file_path=str(excel_path)
+            )
+        except Exception as e:
+            print(f"[REMATCH] Excel export failed - {e}")
+
+    if changed:
+        save_extractions_to_file(*changed)
+    print(f"[REMATCH] Checked {summary['checked']}, matched {len(summary['matched'])}, still pending {summary['still_pending']}")
+    return summary
+
+
 # ============================================================================
 # BILLING TABLE APIs
 # ============================================================================
@@ -2566,7 +3165,7 @@ async def update_billing(extraction_id: str, request: Request):
         billing["tax_amount"] = tax_amount
 
         extraction["_billing"] = billing
-        save_extractions_to_file()
+        save_extractions_to_file(extraction_id)
 
         return {
             "success": True,
@@ -2750,7 +3349,7 @@ async def update_payment_status(extraction_id: str, request: Request):
             if value and value in ("paid", "unpaid", "ready_for_payment", "partial_payment"):
                 extraction["payment_status"] = value
                 out["payment_status"] = value
-        save_extractions_to_file()
+        save_extractions_to_file(extraction_id)
         return out
     except Exception as e:
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
@@ -3111,6 +3710,7 @@ async def delete_files(request: Request):
         
         # Recalculate dashboard data after deletions
         if extraction_ids:
+            save_extractions_to_file(*extraction_ids)
             recalculate_dashboard_from_extractions()
         
         return JSONResponse(content={"success": True, "results": results})
@@ -3160,6 +3760,7 @@ async def clear_all_cache(request: Request):
         if clear_in_memory and clear_extractions_data:
             global extractions_store
             extractions_store.clear()
+            save_extractions_to_file()
             results["in_memory_cleared"] = True
             # Recalculate dashboard (will reset to 0 since store is empty)
             recalculate_dashboard_from_extractions()
@@ -3210,7 +3811,8 @@ async def delete_extraction_complete(extraction_id: str):
             results["deleted"].extend(hash_result.get("deleted", []))
             results["failed"].extend(hash_result.get("failed", []))
         
-        # Recalculate dashboard data after deletion
+        # Drop it from all_invoices.json and recalculate dashboard data after deletion
+        save_extractions_to_file(extraction_id)
         recalculate_dashboard_from_extractions()
         
         return JSONResponse(content={"success": True, "results": results})
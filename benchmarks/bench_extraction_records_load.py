@@ -0,0 +1,115 @@
+"""
+Startup time of _load_all_extraction_records on GCS, against an in-memory bucket with a
+fixed latency per request (tests/fake_gcs.py) and real PO record bodies from data/.
+
+Compares the original serial load (list extractions/, download every blob one by one) with
+the manifest + thread pool path: the first start (no manifest yet), a new instance with the
+manifest but no local copies, and a restart of that instance with warm local copies.
+
+Run from the repository root:
+    python -m benchmarks.bench_extraction_records_load [--sizes 1000 10000] [--latency 0.005]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import cache_manager
+import serializer
+from tests.fake_gcs import FakeGCSClient
+
+GCS_BUCKET = "gs://bench-bucket/cache/"
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def sample_records(count: int) -> list:
+    """count extraction records built from the repo's PO records (ids and file names made unique)."""
+    purchase_orders = json.loads((DATA_DIR / "all_purchase_orders.json").read_text(encoding="utf-8"))
+    records = []
+    for number in range(count):
+        po = purchase_orders[number % len(purchase_orders)]
+        records.append({
+            "extraction_id": f"{number:08x}-bench",
+            "file_name": f"{number}-{po.get('filename', 'po.pdf')}",
+            "file_hash": f"{number:064x}",
+            "status": "completed",
+            "uploaded_at": "2024-01-01T00:00:00",
+            "extracted_at": f"2024-01-01T00:00:{number % 60:02d}",
+            "results": po.get("full_data", po),
+        })
+    return records
+
+
+def fill_bucket(client: FakeGCSClient, records: list):
+    parsed = urlparse(GCS_BUCKET)
+    bucket = client.bucket(parsed.netloc)
+    prefix = parsed.path.lstrip("/") + "extractions/"
+    for record in records:
+        bucket.blob(f"{prefix}{record['extraction_id']}.json").upload_from_string(serializer.get_serializer().dumps(record))
+
+
+def serial_load(client: FakeGCSClient) -> list:
+    """The load before the manifest: one listing, then one download per record, in sequence."""
+    parsed = urlparse(GCS_BUCKET)
+    bucket = client.bucket(parsed.netloc)
+    records = []
+    for blob in bucket.list_blobs(prefix=parsed.path.lstrip("/") + "extractions/"):
+        if blob.name.endswith(".json"):
+            data = serializer.loads(blob.download_as_bytes())
+            data["extraction_id"] = blob.name.split("/")[-1][:-len(".json")]
+            records.append(data)
+    return records
+
+
+def timed(client: FakeGCSClient, load) -> tuple:
+    requests = client.requests
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        records = load()
+    return time.perf_counter() - start, client.requests - requests, len(records)
+
+
+def run(size: int, latency: float, base: Path):
+    client = FakeGCSClient()
+    fill_bucket(client, sample_records(size))
+    client.latency = latency
+    cache_manager.get_gcs_client = lambda: client
+
+    def instance(name: str) -> cache_manager.CacheManager:
+        directory = base / f"{size}-{name}"
+        directory.mkdir(exist_ok=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return cache_manager.CacheManager(directory)
+
+    rows = [("baseline serial", timed(client, lambda: serial_load(client)))]
+    rows.append(("first start (no manifest)", timed(client, instance("first")._load_all_extraction_records)))
+    rows.append(("manifest, cold local dir", timed(client, instance("second")._load_all_extraction_records)))
+    rows.append(("manifest, warm local copies", timed(client, instance("second")._load_all_extraction_records)))
+
+    print(f"{size} records, {latency * 1000:g} ms per request")
+    for label, (seconds, requests, loaded) in rows:
+        print(f"  {label:<28} {seconds:7.2f}s  {requests:6d} requests  {loaded} records")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds per fake GCS request")
+    args = parser.parse_args()
+
+    os.environ.update({"GCS_CACHE_BUCKET": GCS_BUCKET, "GCS_WRITE_BEHIND": "0", "CACHE_BACKEND": "json"})
+    os.environ.pop("GCP_CREDENTIALS_JSON", None)
+    cache_manager.GCS_AVAILABLE = True
+    with tempfile.TemporaryDirectory() as base:
+        for size in args.sizes:
+            run(size, args.latency, Path(base))
+
+
+if __name__ == "__main__":
+    main()
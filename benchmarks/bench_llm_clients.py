@@ -0,0 +1,135 @@
+"""
+Per-document LLM client and tool construction, before and after get_llm() /
+get_extraction_tools(), against a local OpenAI-compatible stub server.
+
+Each document makes two LLM calls (classify_document, then extract_invoice_data) through the
+extraction tools. "before" rebuilds the tool list per document and a ChatOpenAI per call, as
+the nodes did before the shared clients; "after" uses the process-wide ones. The stub
+answers every chat completion after --latency seconds and counts the TCP connections the
+clients open. The LLM response cache is disabled so every call reaches the stub.
+
+Needs the app's requirements (langchain-openai, langgraph). Run from the repository root:
+    python -m benchmarks.bench_llm_clients [--documents 30] [--latency 0.02]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_CONTENT = json.dumps({
+    "document_type": "INVOICE",
+    "confidence": "HIGH",
+    "reasoning": "benchmark stub",
+    "invoice_id": "INV-1",
+    "vendor": "Acme Corp",
+    "total_amount": 100.0,
+})
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers POST .../chat/completions with STUB_CONTENT, keeping connections alive."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.server.latency)
+        body = json.dumps({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": STUB_CONTENT}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(latency: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.connections = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_documents(extraction_agent, documents: int, build_tools) -> tuple:
+    """(seconds building tools/clients, total seconds) for documents x (classify + extract)."""
+    text = "INVOICE INV-1\nAcme Corp\nSteel bolt M8  10 x 10.00\nTotal 100.00"
+    construction = 0.0
+    start = time.perf_counter()
+    for _ in range(documents):
+        built = time.perf_counter()
+        tools = {tool.name: tool for tool in build_tools()}
+        construction += time.perf_counter() - built
+        tools["classify_document"].invoke({"document_text": text})
+        tools["extract_invoice_data"].invoke({"document_text": text})
+    return construction, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per stub completion")
+    args = parser.parse_args()
+
+    server = start_stub(args.latency)
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{server.server_address[1]}/v1",
+        "LLM_CACHE": "0",
+    })
+    try:
+        import extraction_agent
+    except ImportError as e:
+        raise SystemExit(f"extraction_agent needs the app's requirements ({e}); pip install -r requirements.txt")
+
+    shared_get_llm = extraction_agent.get_llm
+
+    def new_llm(api_key=None):
+        # Before the shared clients: one ChatOpenAI (and OpenAI/httpx client) per call
+        return extraction_agent.ChatOpenAI(model=extraction_agent.EXTRACTION_MODEL, temperature=0.1,
+                                           api_key=api_key or os.environ["OPENAI_API_KEY"])
+
+    results = []
+    extraction_agent.get_llm = new_llm
+    try:
+        before = server.connections
+        timings = run_documents(extraction_agent, args.documents,
+                                lambda: extraction_agent.create_extraction_tools("sk-bench"))
+        results.append(("before", timings, server.connections - before))
+    finally:
+        extraction_agent.get_llm = shared_get_llm
+
+    before = server.connections
+    timings = run_documents(extraction_agent, args.documents,
+                            lambda: extraction_agent.get_extraction_tools("sk-bench"))
+    results.append(("after", timings, server.connections - before))
+    server.shutdown()
+
+    print(f"{args.documents} documents, 2 LLM calls each, {args.latency * 1000:g} ms per stub completion")
+    for label, (construction, total), connections in results:
+        print(f"  {label:<7} construction {construction / args.documents * 1000:6.2f} ms/doc   "
+              f"end to end {total / args.documents * 1000:6.1f} ms/doc   {connections} connection(s)")
+
+
+if __name__ == "__main__":
+    main()
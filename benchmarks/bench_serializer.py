@@ -0,0 +1,108 @@
+"""
+Size and speed of the cache serializer settings on the repo's real records (data/all_*.json):
+average payload size, encode and decode time, and time per save_extraction_record on the
+local backend.
+
+"json indent=2" is the format before serializer.py (stdlib json.dumps(indent=2) / json.loads).
+Rows needing orjson or zstandard are skipped when the package is not installed.
+
+Run from the repository root:
+    python -m benchmarks.bench_serializer [--repeat 200]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import cache_manager
+import serializer
+from serializer import JsonSerializer
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# label, JsonSerializer(style, compression), use orjson
+SETTINGS = [
+    ("json indent=2 (before)", "pretty", "none", False),
+    ("json compact", "compact", "none", False),
+    ("orjson compact", "compact", "none", True),
+    ("orjson + gzip", "compact", "gzip", True),
+    ("orjson + zstd", "compact", "zstd", True),
+]
+
+
+def sample_records() -> list:
+    records = []
+    for name in ("all_invoices.json", "all_purchase_orders.json", "all_grns.json"):
+        path = DATA_DIR / name
+        if path.exists():
+            records.extend(serializer.load_file(path))
+    return records
+
+
+def per_call(function, records: list, repeat: int) -> float:
+    """Average seconds per record."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for record in records:
+            function(record)
+    return (time.perf_counter() - start) / (repeat * len(records))
+
+
+def bench(records: list, json_serializer: JsonSerializer, before: bool, repeat: int, base: Path) -> tuple:
+    if before:
+        encode = lambda record: json.dumps(record, indent=2, default=str).encode("utf-8")
+        decode = json.loads
+    else:
+        encode, decode = json_serializer.dumps, serializer.loads
+    payloads = [encode(record) for record in records]
+    size = sum(len(payload) for payload in payloads) / len(payloads)
+    encode_time = per_call(encode, records, repeat)
+    decode_time = per_call(decode, payloads, repeat)
+
+    base.mkdir()
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager = cache_manager.CacheManager(base)
+        manager.serializer = json_serializer
+        numbered = [(f"bench-{number}", dict(record)) for number, record in enumerate(records)]
+        save_time = per_call(lambda item: manager.save_extraction_record(*item), numbered, max(1, repeat // 10))
+    return size, encode_time, decode_time, save_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the records per timing")
+    args = parser.parse_args()
+
+    for name in ("GCS_CACHE_BUCKET", "GCP_CREDENTIALS_JSON"):
+        os.environ.pop(name, None)
+    os.environ["CACHE_BACKEND"] = "json"
+    cache_manager.GCS_AVAILABLE = False
+
+    records = sample_records()
+    orjson_available = serializer.ORJSON_AVAILABLE
+    print(f"{len(records)} records from {DATA_DIR}")
+    print(f"  {'setting':<24} {'size':>9} {'encode':>9} {'decode':>9} {'save':>9}")
+    with tempfile.TemporaryDirectory() as base:
+        for number, (label, style, compression, use_orjson) in enumerate(SETTINGS):
+            if (use_orjson and not orjson_available) or (compression == "zstd" and not serializer.ZSTD_AVAILABLE):
+                print(f"  {label:<24} skipped (package not installed)")
+                continue
+            serializer.ORJSON_AVAILABLE = use_orjson
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    json_serializer = JsonSerializer(style=style, compression=compression)
+                size, encode_time, decode_time, save_time = bench(
+                    records, json_serializer, number == 0, args.repeat, Path(base) / str(number))
+            finally:
+                serializer.ORJSON_AVAILABLE = orjson_available
+            print(f"  {label:<24} {size / 1024:5.1f} KiB {encode_time * 1e6:6.0f} us "
+                  f"{decode_time * 1e6:6.0f} us {save_time * 1e3:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,11 +9,60 @@ GCS is used automatically in cloud deployments (Cloud Run) to persist cache acro
 
 import os
 import json
+import copy
+import base64
 import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple, List
 from datetime import datetime
 
+from sqlite_store import SQLiteStore
+import serializer
+from serializer import get_serializer
+from write_behind import WriteBehindQueue
+from llm_cache import get_llm_cache
+from po_number_index import PONumberIndex, index_order, normalize_po_number, po_core, score_po_number
+from vendor_index import PartyQuery, VendorIndex, name_tokens, parse_amount, party_fields, score_party_match, word_overlap
+
+# PO/GRN index entries are spread over one JSON object per leading hex digit of the file hash
+INDEX_SHARDS = "0123456789abcdef"
+# Sharded indexes: PO, GRN, and (on GCS) the extractions manifest, keyed by extraction id
+INDEX_KINDS = ("po", "grn", "extractions")
+# Attempts at a conditional (if_generation_match) shard write before giving up
+INDEX_WRITE_RETRIES = 8
+
+# Modules whose source (prompts, schemas, model names, parsing) determines extraction output.
+# Their content hash is part of the extraction cache key, so editing a prompt invalidates entries.
+EXTRACTION_PIPELINE_MODULES = (
+    "extraction_agent.py", "extraction_orchestrator.py", "document_type_classifier.py",
+    "contract_extractor_specific.py", "lease_extractor.py", "nda_extractor.py",
+    "po_extractor.py", "grn_extractor.py", "account_heads_taxonomy.py",
+    "document_parser.py", "vision_gcp.py",
+)
+_extraction_pipeline_version: Optional[str] = None
+
+
+def get_extraction_pipeline_version() -> str:
+    """
+    Version of the extraction pipeline: a hash of EXTRACTION_PIPELINE_MODULES' source plus
+    EXTRACTION_CACHE_VERSION (manual bump). Computed once per process.
+    """
+    global _extraction_pipeline_version
+    if _extraction_pipeline_version is None:
+        digest = hashlib.sha256(os.environ.get("EXTRACTION_CACHE_VERSION", "").encode("utf-8"))
+        base_dir = Path(__file__).parent
+        for name in EXTRACTION_PIPELINE_MODULES:
+            path = base_dir / name
+            if path.exists():
+                digest.update(name.encode("utf-8"))
+                digest.update(path.read_bytes())
+        _extraction_pipeline_version = digest.hexdigest()[:16]
+    return _extraction_pipeline_version
+
 # GCS support flag
 GCS_AVAILABLE = False
 try:
@@ -32,6 +81,10 @@ class CacheManager:
     
     Set GCS_CACHE_BUCKET environment variable to enable GCS storage.
     Example: GCS_CACHE_BUCKET=gs://your-bucket/cache/
+    
+    Set CACHE_BACKEND=sqlite to keep extraction records and the PO/GRN indexes in a
+    local SQLite database (CACHE_SQLITE_PATH, default cache.db). Reads then come from
+    SQLite; GCS is written as a snapshot/backup and used to hydrate an empty database.
     """
     
     def __init__(self, cache_base_dir: Optional[Path] = None):
@@ -64,6 +117,34 @@ class CacheManager:
             print(f"[CACHE] GCS_CACHE_BUCKET not set; defaulting to GCP storage: {self.gcs_cache_bucket}")
         self.use_gcs = bool(self.gcs_cache_bucket and GCS_AVAILABLE)
         
+        # Encoding of cache blobs, local and GCS (CACHE_JSON_STYLE / CACHE_COMPRESSION); reads accept any
+        self.serializer = get_serializer()
+        
+        # Local manifest of extraction records (loaded lazily, see _load_extractions_manifest).
+        # On GCS the manifest is kept as the sharded "extractions" index instead
+        self._extractions_manifest: Optional[Dict[str, Dict[str, Any]]] = None
+        self._manifest_lock = threading.Lock()
+        self.gcs_load_workers = max(1, int(os.environ.get("GCS_LOAD_WORKERS", "16")))
+        
+        # In-process cache of the sharded PO/GRN indexes (and the GCS extractions manifest): kind -> {shards: {shard: {data, generation}},
+        # checked_at}. Entries younger than the TTL are served as-is; older ones are revalidated with
+        # one listing of the shard generations (or local mtime/size) and only changed shards reloaded.
+        self.index_cache_ttl = float(os.environ.get("INDEX_CACHE_TTL_SECONDS", "5"))
+        self._index_cache: Dict[str, Dict[str, Any]] = {}
+        self._index_cache_lock = threading.Lock()
+        self.index_cache_stats = {kind: {"hits": 0, "revalidated": 0, "misses": 0, "invalidations": 0,
+                                         "write_conflicts": 0}
+                                  for kind in INDEX_KINDS}
+        # Shard writes are read-modify-write: serialized per shard in-process, and guarded
+        # across instances by GCS if_generation_match preconditions
+        self._index_shard_locks = {(kind, shard): threading.Lock()
+                                   for kind in INDEX_KINDS for shard in INDEX_SHARDS}
+        self._sharded_index_kinds = set()
+        # Inverted PO-number indexes over the cached shards (resynced per changed shard on lookup)
+        self._po_number_indexes = {kind: PONumberIndex() for kind in ("po", "grn")}
+        # Vendor/customer token index over the PO index, for fallback matching without a PO number
+        self._po_vendor_index = VendorIndex()
+        
         if self.use_gcs:
             # Ensure bucket path ends with /
             if not self.gcs_cache_bucket.endswith("/"):
@@ -85,6 +166,48 @@ class CacheManager:
                 print(f"[CACHE] Note: GCS not available (gcs_utils import failed)")
             elif not self.gcs_cache_bucket:
                 print(f"[CACHE] Note: Set GCS_CACHE_BUCKET env var to enable GCS persistent cache")
+        
+        # Extraction result cache keyed by (file_hash, pipeline version, model, options):
+        # in-memory LRU in front of extraction_cache/<file_hash>_extraction.json (size-capped, LRU
+        # by mtime) mirrored to GCS. EXTRACTION_CACHE=0 disables it.
+        self.extraction_cache_enabled = os.environ.get("EXTRACTION_CACHE", "1").strip() != "0"
+        self.extraction_cache_memory_items = max(0, int(os.environ.get("EXTRACTION_CACHE_MEMORY_ITEMS", "32")))
+        self.extraction_cache_max_bytes = int(float(os.environ.get("EXTRACTION_CACHE_MAX_MB", "512")) * 1024 * 1024)
+        self._extraction_memory_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._extraction_disk_sizes: Optional[Dict[str, int]] = None
+        self._extraction_cache_lock = threading.Lock()
+        self.extraction_cache_stats = {"memory_hits": 0, "disk_hits": 0, "gcs_hits": 0, "misses": 0,
+                                       "stale": 0, "saves": 0, "evictions": 0}
+        
+        # all_invoices.json held in memory (extraction_id -> entry); patches are applied under the
+        # lock and written once per burst, ALL_INVOICES_FLUSH_SECONDS after the first (0 = at once)
+        self._all_invoices: Optional["OrderedDict[str, Dict[str, Any]]"] = None
+        self._all_invoices_dirty = False
+        self._all_invoices_lock = threading.Lock()
+        self._all_invoices_write_lock = threading.Lock()
+        self._all_invoices_timer: Optional[threading.Timer] = None
+        self.all_invoices_flush_delay = float(os.environ.get("ALL_INVOICES_FLUSH_SECONDS", "1"))
+        
+        # Background mirroring of cache blobs to GCS (local copy is written first, see _mirror_to_gcs)
+        self.gcs_writer: Optional[WriteBehindQueue] = None
+        if self.use_gcs and os.environ.get("GCS_WRITE_BEHIND", "1").strip() != "0":
+            self.gcs_writer = WriteBehindQueue(
+                lambda gcs_path, payload: self._upload_json_blob_to_gcs(gcs_path, payload) is not None,
+                batch_size=int(os.environ.get("GCS_WRITE_BATCH_SIZE", "16")),
+                max_retries=int(os.environ.get("GCS_WRITE_MAX_RETRIES", "8")),
+            )
+        
+        # Primary store for extraction records and PO/GRN indexes: "json" files (default) or "sqlite"
+        self.backend = os.environ.get("CACHE_BACKEND", "json").strip().lower() or "json"
+        self.sqlite_store: Optional[SQLiteStore] = None
+        if self.backend == "sqlite":
+            db_path = os.environ.get("CACHE_SQLITE_PATH", "").strip() or str(cache_base_dir / "cache.db")
+            try:
+                self.sqlite_store = SQLiteStore(Path(db_path))
+                print(f"[CACHE] Using SQLite backend: {db_path}")
+            except Exception as e:
+                print(f"[CACHE] SQLite backend unavailable, using JSON files: {e}")
+                self.backend = "json"
     
     def get_gcs_status(self) -> Dict[str, Any]:
         """
@@ -100,6 +223,11 @@ class CacheManager:
             "gcs_enabled": self.use_gcs,
             "gcs_bucket": self.gcs_cache_bucket if self.use_gcs else "",
             "storage_mode": "gcs" if self.use_gcs else "local",
+            "storage_backend": self.backend,
+            "index_cache": self.get_index_cache_stats(),
+            "write_queue": self.gcs_writer.get_metrics() if self.gcs_writer is not None else None,
+            "extraction_cache": self.get_extraction_cache_stats(),
+            "llm_cache": get_llm_cache().stats(),
             "message": "Memory (extractions, PO index, Excel) is persisted to GCP" if self.use_gcs
             else "Memory is local only. Set GCP_CREDENTIALS_JSON and GCS_CACHE_BUCKET (or use default) for GCP.",
         }
@@ -161,6 +289,14 @@ class CacheManager:
         """Get local cache file path for PO data."""
         return self.po_cache_dir / f"{file_hash}_po.json"
     
+    def get_grn_cache_path(self, file_hash: str) -> Path:
+        """Get local cache file path for GRN data."""
+        return self.grn_cache_dir / f"{file_hash}_grn.json"
+    
+    def _get_gcs_grn_cache_path(self, file_hash: str) -> str:
+        """Get GCS path for GRN data."""
+        return f"{self.gcs_cache_bucket}grn_cache/{file_hash}_grn.json"
+    
     def _get_gcs_po_cache_path(self, file_hash: str) -> str:
         """Get GCS path for PO cache."""
         return f"{self.gcs_cache_bucket}po_cache/{file_hash}_po.json"
@@ -181,6 +317,50 @@ class CacheManager:
         """Save JSON data to GCS."""
         if not self.use_gcs:
             return False
+        return self._mirror_to_gcs(gcs_path, self.serializer.dumps(data))
+    
+    def _mirror_to_gcs(self, gcs_path: str, payload) -> bool:
+        """
+        Copy an already locally persisted blob to GCS: queued on the write-behind queue
+        (returns True once queued), or uploaded synchronously when GCS_WRITE_BEHIND=0.
+        """
+        if not self.use_gcs:
+            return False
+        if self.gcs_writer is not None:
+            if isinstance(payload, str):
+                payload = payload.encode("utf-8")
+            self.gcs_writer.enqueue(gcs_path, payload)
+            return True
+        return self._upload_json_text_to_gcs(gcs_path, payload)
+    
+    def flush_gcs_writes(self, timeout: Optional[float] = 30.0) -> bool:
+        """Wait until queued GCS uploads are done (e.g. on shutdown). Returns True if drained."""
+        self.flush_all_invoices_json()
+        if self.gcs_writer is None:
+            return True
+        return self.gcs_writer.flush(timeout)
+    
+    def _upload_json_text_to_gcs(self, gcs_path: str, json_content) -> bool:
+        """Upload already-serialized JSON (str, or serializer bytes) to GCS."""
+        return self._upload_json_blob_to_gcs(gcs_path, json_content) is not None
+    
+    @staticmethod
+    def _upload_payload(blob, payload, **kwargs):
+        """Upload a serialized payload, tagging gzip/zstd payloads with their Content-Encoding."""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        blob.content_encoding = serializer.content_encoding_of(payload)
+        blob.upload_from_string(payload, content_type='application/json', **kwargs)
+    
+    @staticmethod
+    def _download_payload(blob) -> Any:
+        """Download and decode a blob as stored (raw, so compressed payloads are decoded here)."""
+        return serializer.loads(blob.download_as_bytes(raw_download=True))
+    
+    def _upload_json_blob_to_gcs(self, gcs_path: str, json_content):
+        """Upload already-serialized JSON to GCS. Returns the uploaded blob (with its generation) or None."""
+        if not self.use_gcs:
+            return None
         
         try:
             from urllib.parse import urlparse
@@ -196,20 +376,24 @@ class CacheManager:
             blob = bucket.blob(blob_name)
             
             # Upload JSON content
-            json_content = json.dumps(data, indent=2, ensure_ascii=False, default=str)
-            blob.upload_from_string(json_content, content_type='application/json')
+            self._upload_payload(blob, json_content)
             
             print(f"[CACHE] Saved to GCS: {blob_name}")
-            return True
+            return blob
         except Exception as e:
             print(f"[CACHE] Error saving to GCS: {e}")
-            return False
+            return None
     
     def _load_from_gcs(self, gcs_path: str) -> Optional[Dict[str, Any]]:
         """Load JSON data from GCS."""
         if not self.use_gcs:
             return None
         
+        # A write still on the write-behind queue is newer than what GCS has
+        pending = self.gcs_writer.get_pending(gcs_path) if self.gcs_writer is not None else None
+        if pending is not None:
+            return serializer.loads(pending)
+        
         try:
             from urllib.parse import urlparse
             
@@ -227,8 +411,7 @@ class CacheManager:
                 return None
             
             # Download and parse JSON
-            json_content = blob.download_as_text()
-            data = json.loads(json_content)
+            data = self._download_payload(blob)
             
             print(f"[CACHE] Loaded from GCS: {blob_name}")
             return data
@@ -236,17 +419,159 @@ class CacheManager:
             print(f"[CACHE] Error loading from GCS: {e}")
             return None
     
-    def load_extraction_cache(self, file_hash: str) -> Optional[Dict[str, Any]]:
-        """Cache disabled: always returns None (past data is in extractions store only)."""
-        return None
+    def _extraction_cache_key(self, file_hash: str, model: str, use_ocr: bool,
+                              single_pass: bool = False) -> Dict[str, Any]:
+        """Everything besides the file content that determines an extraction result."""
+        return {"file_hash": file_hash, "pipeline_version": get_extraction_pipeline_version(),
+                "model": model or "", "use_ocr": bool(use_ocr), "single_pass": bool(single_pass)}
+    
+    def load_extraction_cache(self, file_hash: str, model: str = "", use_ocr: bool = False,
+                              single_pass: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached extraction result for identical file content.
+        
+        Looks in memory, then the local extraction_cache/ file, then GCS. An entry written by
+        another pipeline version, model, OCR or single-pass setting is a miss.
+        
+        Args:
+            file_hash: SHA256 of the uploaded file
+            model: LLM model name used by the extractor
+            use_ocr: OCR option passed to the extractor
+            single_pass: Whether the extractor classifies and extracts in one LLM call
+            
+        Returns:
+            {"extracted_data", "metadata", "document_text", "cached_at"} or None
+        """
+        if not self.extraction_cache_enabled or not file_hash:
+            return None
+        key = self._extraction_cache_key(file_hash, model, use_ocr, single_pass)
+        with self._extraction_cache_lock:
+            entry = self._extraction_memory_cache.get(file_hash)
+            if entry is not None and entry.get("key") == key:
+                self._extraction_memory_cache.move_to_end(file_hash)
+                self.extraction_cache_stats["memory_hits"] += 1
+                # Callers annotate the result (_po_match, ...); never hand out the cached object
+                return copy.deepcopy(entry)
+        
+        local_path = self.get_extraction_cache_path(file_hash)
+        entry, source = None, "disk_hits"
+        if local_path.exists():
+            try:
+                entry = serializer.load_file(local_path)
+                os.utime(local_path)  # LRU: eviction removes the least recently used files first
+            except Exception as e:
+                print(f"[CACHE] Error reading extraction cache {file_hash[:16]}: {e}")
+        if entry is None and self.use_gcs:
+            entry, source = self._load_from_gcs(self._get_gcs_extraction_path(file_hash)), "gcs_hits"
+            if isinstance(entry, dict) and entry.get("key") == key:
+                self._store_extraction_cache_file(file_hash, self.serializer.dumps(entry))
+        
+        with self._extraction_cache_lock:
+            if not isinstance(entry, dict):
+                self.extraction_cache_stats["misses"] += 1
+                return None
+            if entry.get("key") != key:
+                self.extraction_cache_stats["stale"] += 1
+                return None
+            self.extraction_cache_stats[source] += 1
+            self._remember_extraction(file_hash, copy.deepcopy(entry))
+        print(f"[CACHE] Extraction cache hit ({source.replace('_hits', '')}): {file_hash[:16]}...")
+        return entry
     
     def save_extraction_cache(self, file_hash: str, extracted_data: Dict[str, Any],
-                              metadata: Dict[str, Any], document_text: str):
+                              metadata: Dict[str, Any], document_text: str,
+                              model: str = "", use_ocr: bool = False, single_pass: bool = False):
         """
-        Save extraction results to cache.
-        Cache management disabled: no-op (past data is stored in extractions store only).
+        Save an extraction result under (file_hash, pipeline version, model, use_ocr, single_pass).
+        
+        Args:
+            file_hash: SHA256 of the uploaded file
+            extracted_data: Extractor output
+            metadata: Extractor metadata (document_text/page_map included)
+            document_text: Parsed document text
+            model: LLM model name used by the extractor
+            use_ocr: OCR option passed to the extractor
+            single_pass: Whether the extractor classifies and extracts in one LLM call
         """
-        pass
+        if not self.extraction_cache_enabled or not file_hash:
+            return
+        if not extracted_data or (metadata or {}).get("error"):
+            # Failed extractions are retried next time rather than replayed from cache
+            return
+        try:
+            entry = {
+                "key": self._extraction_cache_key(file_hash, model, use_ocr, single_pass),
+                "cached_at": datetime.now().isoformat(),
+                "extracted_data": extracted_data,
+                "metadata": metadata or {},
+                "document_text": document_text or "",
+            }
+            payload = self.serializer.dumps(entry)
+            self._store_extraction_cache_file(file_hash, payload)
+            self._mirror_to_gcs(self._get_gcs_extraction_path(file_hash), payload)
+            with self._extraction_cache_lock:
+                self._remember_extraction(file_hash, copy.deepcopy(entry))
+                self.extraction_cache_stats["saves"] += 1
+        except Exception as e:
+            print(f"[CACHE] Error saving extraction cache {file_hash[:16]}: {e}")
+    
+    def _remember_extraction(self, file_hash: str, entry: Dict[str, Any]):
+        """Put an entry in the in-memory LRU (caller holds _extraction_cache_lock)."""
+        if self.extraction_cache_memory_items <= 0:
+            return
+        self._extraction_memory_cache[file_hash] = entry
+        self._extraction_memory_cache.move_to_end(file_hash)
+        while len(self._extraction_memory_cache) > self.extraction_cache_memory_items:
+            self._extraction_memory_cache.popitem(last=False)
+    
+    def _store_extraction_cache_file(self, file_hash: str, payload: bytes):
+        """Write the local cache file, then evict least recently used files beyond EXTRACTION_CACHE_MAX_MB."""
+        local_path = self.get_extraction_cache_path(file_hash)
+        with open(local_path, "wb") as f:
+            f.write(payload)
+        with self._extraction_cache_lock:
+            if self._extraction_disk_sizes is None:
+                self._extraction_disk_sizes = {}
+                for cache_file in self.extraction_cache_dir.glob("*_extraction.json"):
+                    try:
+                        self._extraction_disk_sizes[cache_file.name] = cache_file.stat().st_size
+                    except OSError:
+                        continue
+            self._extraction_disk_sizes[local_path.name] = len(payload)
+            total = sum(self._extraction_disk_sizes.values())
+            if total <= self.extraction_cache_max_bytes:
+                return
+            by_age = []
+            for name in self._extraction_disk_sizes:
+                try:
+                    by_age.append(((self.extraction_cache_dir / name).stat().st_mtime, name))
+                except OSError:
+                    by_age.append((0.0, name))
+            for _mtime, name in sorted(by_age):
+                if total <= self.extraction_cache_max_bytes or name == local_path.name:
+                    continue
+                try:
+                    (self.extraction_cache_dir / name).unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"[CACHE] Could not evict {name}: {e}")
+                    continue
+                total -= self._extraction_disk_sizes.pop(name)
+                self._extraction_memory_cache.pop(name[:-len("_extraction.json")], None)
+                self.extraction_cache_stats["evictions"] += 1
+    
+    def get_extraction_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the extraction result cache."""
+        with self._extraction_cache_lock:
+            return {
+                "enabled": self.extraction_cache_enabled,
+                "pipeline_version": get_extraction_pipeline_version(),
+                "memory_entries": len(self._extraction_memory_cache),
+                "disk_bytes": sum(self._extraction_disk_sizes.values()) if self._extraction_disk_sizes is not None else None,
+                "max_bytes": self.extraction_cache_max_bytes,
+                **self.extraction_cache_stats,
+            }
 
     def load_chatbot_cache(self, file_hash: str) -> Optional[Dict[str, Any]]:
         """Cache disabled: always returns None."""
@@ -262,38 +587,89 @@ class CacheManager:
     # PURCHASE ORDER CACHE MANAGEMENT
     # ========================================================================
     
-    def load_po_cache(self, file_hash: str) -> Optional[Dict[str, Any]]:
+    def _get_payload_paths(self, kind: str, file_hash: str) -> Tuple[str, Path]:
+        """GCS URI and local path of the full PO ("po") or GRN ("grn") record for a file hash."""
+        if kind == "po":
+            return self._get_gcs_po_cache_path(file_hash), self.get_po_cache_path(file_hash)
+        return self._get_gcs_grn_cache_path(file_hash), self.get_grn_cache_path(file_hash)
+    
+    def _save_index_payload(self, kind: str, file_hash: str, full_data: Dict[str, Any]):
+        """Write the full PO/GRN record (extracted_data, document_text, ...) to its per-hash blob."""
+        gcs_path, local_path = self._get_payload_paths(kind, file_hash)
+        payload = self.serializer.dump_file(local_path, full_data)
+        self._mirror_to_gcs(gcs_path, payload)
+    
+    def _load_index_payload(self, kind: str, file_hash: str) -> Optional[Dict[str, Any]]:
         """
-        Get PO data by file hash from the PO index (past data, not cache).
-        Returns full_data stored in index when PO was added.
-        If index entry has no full_data, falls back to legacy po_cache/<file_hash>_po.json file.
+        Load the full PO/GRN record from its per-hash blob: local copy first, then GCS
+        (a GCS hit is kept locally for next time).
         """
-        po_index = self._load_po_index()
-        entry = po_index.get(file_hash) if isinstance(po_index, dict) else None
-        if entry and isinstance(entry, dict) and "full_data" in entry:
-            return entry["full_data"]
-        # Fallback: try GCS first (when GCP is used), then legacy local file
-        if self.use_gcs:
-            gcs_path = self._get_gcs_po_cache_path(file_hash)
-            gcs_data = self._load_from_gcs(gcs_path)
-            if gcs_data and isinstance(gcs_data, dict) and (gcs_data.get("extracted_data") or gcs_data.get("document_text")):
-                return gcs_data
-        cache_path = self.get_po_cache_path(file_hash)
-        if cache_path.exists():
+        gcs_path, local_path = self._get_payload_paths(kind, file_hash)
+        if local_path.exists():
             try:
-                with open(cache_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                data = serializer.load_file(local_path)
                 # File format is the full record (extracted_data, document_text, metadata, filename)
                 if isinstance(data, dict) and (data.get("extracted_data") or data.get("document_text")):
                     return data
             except Exception as e:
-                print(f"[CACHE] Error reading legacy PO cache {file_hash[:16]}: {e}")
+                print(f"[CACHE] Error reading {kind.upper()} record {file_hash[:16]}: {e}")
+        if self.use_gcs:
+            gcs_data = self._load_from_gcs(gcs_path)
+            if gcs_data and isinstance(gcs_data, dict) and (gcs_data.get("extracted_data") or gcs_data.get("document_text")):
+                try:
+                    self.serializer.dump_file(local_path, gcs_data)
+                except Exception as e:
+                    print(f"[CACHE] Could not keep local copy of {kind.upper()} record {file_hash[:16]}: {e}")
+                return gcs_data
         return None
+    
+    def _load_index_payloads(self, kind: str, index: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Index entries with full_data attached (loaded concurrently); entries without a record are skipped."""
+        items = [(file_hash, entry) for file_hash, entry in index.items() if isinstance(entry, dict)]
+        
+        def load(item):
+            file_hash, entry = item
+            return entry, entry.get("full_data") or self._load_index_payload(kind, file_hash)
+        
+        with ThreadPoolExecutor(max_workers=self.gcs_load_workers) as pool:
+            return [{**entry, "full_data": full_data} for entry, full_data in pool.map(load, items) if full_data]
+    
+    def _migrate_index_payloads(self, kind: str, index: Dict[str, Any]) -> bool:
+        """
+        Move legacy full_data out of index entries into per-hash blobs, in place.
+        Returns True if the index changed and must be saved.
+        """
+        changed = 0
+        for file_hash, entry in list(index.items()):
+            if not isinstance(entry, dict) or "full_data" not in entry:
+                continue
+            full_data = entry.get("full_data")
+            if full_data:
+                self._save_index_payload(kind, file_hash, full_data)
+            index[file_hash] = {k: v for k, v in entry.items() if k != "full_data"}
+            changed += 1
+        if changed:
+            print(f"[CACHE] Moved full_data of {changed} {kind.upper()} index entries to per-hash files")
+        return bool(changed)
+    
+    def load_po_cache(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Get full PO data by file hash (past data, not cache).
+        The index holds only match keys; the full record lives in po_cache/<file_hash>_po.json.
+        """
+        entry = self._get_index_entry("po", file_hash)
+        if entry and isinstance(entry, dict) and entry.get("full_data"):
+            return entry["full_data"]
+        return self._load_index_payload("po", file_hash)
+    
+    def load_grn_cache(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Get full GRN data by file hash (grn_cache/<file_hash>_grn.json)."""
+        return self._load_index_payload("grn", file_hash)
 
     def save_po_cache(self, file_hash: str, extracted_data: Dict[str, Any],
                       metadata: Dict[str, Any], document_text: str, filename: str):
         """
-        Store PO in index only (past data). No per-file cache; full data kept in index.
+        Store PO (past data): match keys in the PO index, full record in its per-hash file.
         """
         try:
             self._update_po_index(file_hash, extracted_data, metadata, document_text, filename)
@@ -303,10 +679,9 @@ class CacheManager:
     def _update_po_index(self, file_hash: str, extracted_data: Dict[str, Any],
                          metadata: Dict[str, Any], document_text: str, filename: str):
         """
-        Update PO index with summary and full_data for lookup (past data storage).
+        Update PO index with the match keys; the full record goes to po_cache/<file_hash>_po.json.
         """
         try:
-            po_index = self._load_po_index()
             doc_ids = extracted_data.get("document_ids", {})
             party_names = extracted_data.get("party_names", {})
             po_number = doc_ids.get("po_number", "") or doc_ids.get("order_number", "") or ""
@@ -335,89 +710,466 @@ class CacheManager:
                 "item_descriptions": item_descriptions,
                 "total_amount": total_amount,
                 "indexed_at": datetime.now().isoformat(),
-                "full_data": full_data,
             }
-            po_index[file_hash] = index_entry
-            self._save_po_index(po_index)
-            # Also store PO blob to GCS so POs are persisted in GCP (not just local index)
-            if self.use_gcs:
-                gcs_path = self._get_gcs_po_cache_path(file_hash)
-                self._save_to_gcs(gcs_path, full_data)
+            # Payload first, so an index entry never points at a missing record
+            self._save_index_payload("po", file_hash, full_data)
+            self._put_index_entry("po", file_hash, index_entry)
             print(f"[CACHE] Updated PO index: PO#{po_number or 'N/A'}, Vendor: {vendor[:30] if vendor else 'N/A'}...")
         except Exception as e:
             print(f"[CACHE] Error updating PO index: {e}")
     
-    def _load_po_index(self) -> Dict[str, Any]:
-        """Load PO index from GCS or local storage."""
+    def _get_index_paths(self, kind: str) -> Tuple[str, Path]:
+        """GCS URI and local path of the legacy single-file PO ("po"), GRN ("grn") or extractions manifest index."""
+        if kind == "po":
+            return self._get_gcs_po_index_path(), self.po_cache_dir / "po_index.json"
+        if kind == "extractions":
+            return self._get_gcs_extractions_manifest_path(), self._get_local_extractions_manifest_path()
+        return f"{self.gcs_cache_bucket}grn_cache/grn_index.json", self.grn_cache_dir / "grn_index.json"
+    
+    def _read_index_snapshot(self, kind: str) -> Dict[str, Any]:
+        """Read the legacy single-file PO/GRN index JSON from GCS or local storage (no caching)."""
+        gcs_path, local_path = self._get_index_paths(kind)
+        data = {}
         # Try GCS first if enabled
         if self.use_gcs:
-            gcs_path = self._get_gcs_po_index_path()
             gcs_data = self._load_from_gcs(gcs_path)
-            if gcs_data:
-                return gcs_data
+            if gcs_data and isinstance(gcs_data, dict):
+                data = gcs_data
         
         # Fall back to local
-        local_path = self.po_cache_dir / "po_index.json"
-        if local_path.exists():
+        if not data and local_path.exists():
             try:
-                with open(local_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                data = serializer.load_file(local_path)
             except Exception as e:
-                print(f"[CACHE] Error loading PO index: {e}")
-        
-        return {}
+                print(f"[CACHE] Error loading {kind.upper()} index: {e}")
+        
+        if kind == "extractions":
+            # extractions_manifest.json wraps its rows: {"version", "updated_at", "records"}
+            records = data.get("records") if isinstance(data, dict) else None
+            return records if isinstance(records, dict) else {}
+        return data
+    
+    def _get_index_shard_paths(self, kind: str, shard: str) -> Tuple[str, Path]:
+        """GCS URI and local path of one shard of the PO/GRN index (<kind>_index/<shard>.json)."""
+        gcs_path, local_path = self._get_index_paths(kind)
+        return (f"{gcs_path.rsplit('/', 1)[0]}/{kind}_index/{shard}.json",
+                local_path.parent / f"{kind}_index" / f"{shard}.json")
+    
+    @staticmethod
+    def _index_shard(file_hash: str) -> str:
+        """Shard of an index entry: the leading hex digit of its file hash."""
+        shard = str(file_hash)[:1].lower()
+        if shard and shard in INDEX_SHARDS:
+            return shard
+        return hashlib.sha256(str(file_hash).encode("utf-8")).hexdigest()[0]
+    
+    def _get_index_shard_generations(self, kind: str) -> Optional[Dict[str, Tuple]]:
+        """
+        Version stamps of the stored index shards, {shard: generation}: GCS object generations
+        (one listing request), else local file mtime/size. Empty if the index is not sharded yet;
+        None if it cannot be determined.
+        """
+        if self.use_gcs:
+            try:
+                from urllib.parse import urlparse
+                parsed = urlparse(self._get_index_shard_paths(kind, "0")[0])
+                prefix = parsed.path.lstrip('/').rsplit('/', 1)[0] + "/"
+                generations = {}
+                for blob in get_gcs_client().bucket(parsed.netloc).list_blobs(prefix=prefix):
+                    shard = blob.name[len(prefix):].replace(".json", "")
+                    if shard in INDEX_SHARDS and blob.name.endswith(".json") and len(shard) == 1:
+                        generations[shard] = ("gcs", blob.generation)
+                if generations:
+                    return generations
+            except Exception as e:
+                print(f"[CACHE] Could not list {kind.upper()} index shards: {e}")
+                return None
+        generations = {}
+        for shard in INDEX_SHARDS:
+            try:
+                stat = self._get_index_shard_paths(kind, shard)[1].stat()
+                generations[shard] = ("local", stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                continue
+        return generations
     
-    def _save_po_index(self, po_index: Dict[str, Any]):
-        """Save PO index to GCS and local storage."""
+    def _read_index_shard(self, kind: str, shard: str, source: str) -> Dict[str, Any]:
+        """Read one index shard from GCS ("gcs") or local storage ("local")."""
+        gcs_path, local_path = self._get_index_shard_paths(kind, shard)
+        if source == "gcs":
+            data = self._load_from_gcs(gcs_path)
+            return data if isinstance(data, dict) else {}
         try:
-            # Save to GCS if enabled
-            if self.use_gcs:
-                gcs_path = self._get_gcs_po_index_path()
-                self._save_to_gcs(gcs_path, po_index)
-            
-            # Also save locally
-            local_path = self.po_cache_dir / "po_index.json"
-            with open(local_path, 'w', encoding='utf-8') as f:
-                json.dump(po_index, f, indent=2, ensure_ascii=False, default=str)
-                
+            data = serializer.load_file(local_path)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
         except Exception as e:
-            print(f"[CACHE] Error saving PO index: {e}")
+            print(f"[CACHE] Error loading {kind.upper()} index shard {shard}: {e}")
+            return {}
+    
+    def _write_index_shard_local(self, kind: str, shard: str, data: Dict[str, Any]) -> Tuple:
+        """Atomically write the local copy of one index shard. Returns its local generation."""
+        local_path = self._get_index_shard_paths(kind, shard)[1]
+        local_path.parent.mkdir(exist_ok=True)
+        tmp_path = local_path.with_suffix(f".{threading.get_ident()}.tmp")
+        self.serializer.dump_file(tmp_path, data)
+        os.replace(tmp_path, local_path)
+        stat = local_path.stat()
+        return ("local", stat.st_mtime_ns, stat.st_size)
+    
+    def _merge_index_shards(self, shards: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine cached shards into one {file_hash: entry} index, in index order (index_order)."""
+        items = [item for shard in shards.values() for item in shard["data"].items()]
+        items.sort(key=lambda item: index_order(*item))
+        return dict(items)
+    
+    def _load_index_snapshot(self, kind: str) -> Dict[str, Any]:
+        """Load the sharded PO/GRN index through the in-process cache, migrating a legacy single-file index."""
+        return self._merge_index_shards(self._load_index_shards(kind))
+    
+    def _load_index_shards(self, kind: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Current shards of the PO/GRN index as {shard: {"data": {file_hash: entry}, ...}}.
+        A shard's data dict is replaced (never edited in place) whenever the shard changes.
+        """
+        now = time.monotonic()
+        with self._index_cache_lock:
+            cached = self._index_cache.get(kind)
+            if cached and now - cached["checked_at"] < self.index_cache_ttl:
+                self.index_cache_stats[kind]["hits"] += 1
+                return cached["shards"]
+        
+        generations = self._get_index_shard_generations(kind)
+        if generations == {}:
+            # Not sharded yet: read po_index.json / grn_index.json and split it up
+            self._count_index_cache(kind, "misses")
+            data = self._read_index_snapshot(kind)
+            if not isinstance(data, dict):
+                data = {}
+            self._migrate_index_payloads(kind, data)
+            # The single-file index was ordered by insertion; keep that order as index_seq
+            for position, entry in enumerate(data.values()):
+                if kind != "extractions" and isinstance(entry, dict) and not isinstance(entry.get("index_seq"), int):
+                    entry["index_seq"] = position
+            print(f"[CACHE] Splitting {kind.upper()} index ({len(data)} entries) into shards")
+            # create_only: another instance may be migrating (or already writing entries) concurrently
+            shard_data = self._save_index_snapshot(kind, data, create_only=True)
+            return {shard: {"data": shard_data[shard]} for shard in INDEX_SHARDS}
+        
+        # Generations unknown (listing failed): read local shards and do not cache the result
+        known = generations or {}
+        source = next(iter(known.values()))[0] if known else "local"
+        cached_shards = cached["shards"] if cached else {}
+        if generations is None:
+            stale = list(INDEX_SHARDS)
+        else:
+            stale = [shard for shard, generation in known.items()
+                     if cached_shards.get(shard, {}).get("generation") != generation]
+        self._count_index_cache(kind, "misses" if stale else "revalidated")
+        
+        def read(shard):
+            return shard, self._read_index_shard(kind, shard, source)
+        
+        shards = {shard: cached_shards[shard] for shard in known if shard not in stale}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.gcs_load_workers, len(stale) or 1))) as pool:
+            for shard, data in pool.map(read, stale):
+                shards[shard] = {"data": data, "generation": known.get(shard)}
+        
+        migrated = False
+        for shard, entry in shards.items():
+            if any(isinstance(e, dict) and "full_data" in e for e in entry["data"].values()):
+                entry["data"] = dict(entry["data"])
+                migrated = self._migrate_index_payloads(kind, entry["data"]) or migrated
+        if migrated or (self.use_gcs and generations is not None and source == "local"
+                        and any(entry["data"] for entry in shards.values())):
+            # Migrated payloads, or GCS has no shards yet and the local copy seeds it.
+            # Writes all shards and refreshes the cache with their new generations
+            shard_data = self._save_index_snapshot(kind, self._merge_index_shards(shards))
+            return {shard: {"data": shard_data[shard]} for shard in INDEX_SHARDS}
+        if generations is not None:
+            with self._index_cache_lock:
+                self._index_cache[kind] = {"shards": shards, "checked_at": now}
+        self._sharded_index_kinds.add(kind)
+        return shards
+    
+    def _write_index_shards(self, kind: str, shard_data: Dict[str, Dict[str, Any]],
+                            create_only: bool = False) -> Dict[str, Optional[Tuple]]:
+        """
+        Write the given shards (GCS and local). Used for whole-index replaces; single-entry
+        updates go through _update_index_shard. With create_only, shards that already exist
+        are left alone (generation None). Returns {shard: new generation}.
+        """
+        def write(item):
+            shard, data = item
+            gcs_path, local_path = self._get_index_shard_paths(kind, shard)
+            payload = self.serializer.dumps(data)
+            generation = None
+            try:
+                if self.use_gcs and create_only:
+                    from urllib.parse import urlparse
+                    parsed = urlparse(gcs_path)
+                    blob = get_gcs_client().bucket(parsed.netloc).blob(parsed.path.lstrip('/'))
+                    try:
+                        self._upload_payload(blob, payload, if_generation_match=0)
+                    except Exception as e:
+                        if getattr(e, "code", None) != 412:
+                            raise
+                        return shard, None
+                    generation = ("gcs", blob.generation)
+                elif self.use_gcs:
+                    blob = self._upload_json_blob_to_gcs(gcs_path, payload)
+                    if blob is not None and getattr(blob, "generation", None) is not None:
+                        generation = ("gcs", blob.generation)
+                elif create_only and local_path.exists():
+                    return shard, None
+                local_generation = self._write_index_shard_local(kind, shard, data)
+                if not self.use_gcs:
+                    generation = local_generation
+            except Exception as e:
+                print(f"[CACHE] Error saving {kind.upper()} index shard {shard}: {e}")
+            return shard, generation
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(self.gcs_load_workers, len(shard_data) or 1))) as pool:
+            return dict(pool.map(write, shard_data.items()))
+    
+    def _save_index_snapshot(self, kind: str, index: Dict[str, Any],
+                             create_only: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Replace the whole PO/GRN index (all shards, GCS and local), and refresh the in-process cache.
+        Returns the data written, by shard.
+        """
+        shard_data = {shard: {} for shard in INDEX_SHARDS}
+        for file_hash, entry in index.items():
+            shard_data[self._index_shard(file_hash)][file_hash] = entry
+        generations = self._write_index_shards(kind, shard_data, create_only=create_only)
+        self._sharded_index_kinds.add(kind)
+        self._refresh_index_cache(kind, {shard: (shard_data[shard], generations.get(shard)) for shard in shard_data})
+        return shard_data
+    
+    def _refresh_index_cache(self, kind: str, updates: Dict[str, Tuple[Dict[str, Any], Optional[Tuple]]]):
+        """Put freshly written shards into the cache; drop the cached index if a generation is unknown."""
+        with self._index_cache_lock:
+            cached = self._index_cache.get(kind)
+            if any(generation is None for _, generation in updates.values()):
+                if self._index_cache.pop(kind, None) is not None:
+                    self.index_cache_stats[kind]["invalidations"] += 1
+                return
+            if cached is None:
+                if set(updates) != set(INDEX_SHARDS):
+                    return
+                cached = self._index_cache[kind] = {"shards": {}, "checked_at": time.monotonic()}
+            for shard, (data, generation) in updates.items():
+                cached["shards"][shard] = {"data": data, "generation": generation}
+    
+    def _update_index_shard(self, kind: str, file_hash: str, mutate) -> bool:
+        """
+        Read-modify-write the shard holding file_hash. mutate(shard_dict) edits the dict in place
+        and returns True if it changed anything. On GCS the write is conditional on the generation
+        that was read (if_generation_match) and retried on conflict, so concurrent writers on other
+        instances never drop each other's entries. Returns the result of mutate.
+        """
+        if kind not in self._sharded_index_kinds:
+            self._load_index_snapshot(kind)
+        shard = self._index_shard(file_hash)
+        gcs_path, _ = self._get_index_shard_paths(kind, shard)
+        with self._index_shard_locks[(kind, shard)]:
+            if not self.use_gcs:
+                data = self._read_index_shard(kind, shard, "local")
+                if not mutate(data):
+                    return False
+                generation = self._write_index_shard_local(kind, shard, data)
+                self._refresh_index_cache(kind, {shard: (data, generation)})
+                return True
+            
+            from urllib.parse import urlparse
+            parsed = urlparse(gcs_path)
+            bucket = get_gcs_client().bucket(parsed.netloc)
+            blob_name = parsed.path.lstrip('/')
+            with self._index_cache_lock:
+                cached = (self._index_cache.get(kind) or {}).get("shards", {}).get(shard)
+            for attempt in range(INDEX_WRITE_RETRIES):
+                if cached and cached["generation"] and cached["generation"][0] == "gcs":
+                    # Optimistic: assume the cached shard is current; a conflict sends us to a fresh read
+                    data, expected = dict(cached["data"]), cached["generation"][1]
+                else:
+                    current = bucket.get_blob(blob_name)
+                    if current is None:
+                        data, expected = {}, 0
+                    else:
+                        loaded = self._download_payload(current)
+                        data, expected = (loaded if isinstance(loaded, dict) else {}), current.generation
+                cached = None
+                if not mutate(data):
+                    return False
+                blob = bucket.blob(blob_name)
+                try:
+                    self._upload_payload(blob, self.serializer.dumps(data), if_generation_match=expected)
+                except Exception as e:
+                    if getattr(e, "code", None) != 412:
+                        raise
+                    self._count_index_cache(kind, "write_conflicts")
+                    time.sleep(min(0.05 * (2 ** attempt), 1.0))
+                    continue
+                self._write_index_shard_local(kind, shard, data)
+                self._refresh_index_cache(kind, {shard: (data, ("gcs", blob.generation))})
+                return True
+            raise RuntimeError(f"{kind.upper()} index shard {shard} kept changing; gave up after {INDEX_WRITE_RETRIES} attempts")
+    
+    def _count_index_cache(self, kind: str, counter: str):
+        """Increment one index cache counter (under the cache lock; callers run on many threads)."""
+        with self._index_cache_lock:
+            self.index_cache_stats[kind][counter] += 1
+    
+    def get_index_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the PO/GRN index cache."""
+        with self._index_cache_lock:
+            counts = {kind: dict(counts) for kind, counts in self.index_cache_stats.items()}
+        return {"ttl_seconds": self.index_cache_ttl, **counts}
+    
+    def _hydrate_sqlite_index(self, kind: str):
+        """Fill an empty SQLite index from the GCS/local JSON snapshot (once per database)."""
+        if self.sqlite_store.get_meta(f"hydrated:{kind}"):
+            if not self.sqlite_store.get_meta(f"slim:{kind}"):
+                # Database hydrated before payloads moved to per-hash files
+                index = self.sqlite_store.load_index(kind)
+                if self._migrate_index_payloads(kind, index):
+                    self.sqlite_store.replace_index(kind, index)
+                    self._backup_index_to_gcs(kind)
+                self.sqlite_store.set_meta(f"slim:{kind}", datetime.now().isoformat())
+            return
+        index = self._load_index_snapshot(kind)
+        self.sqlite_store.set_meta(f"slim:{kind}", datetime.now().isoformat())
+        self.sqlite_store.replace_index(kind, index if isinstance(index, dict) else {})
+        self.sqlite_store.set_meta(f"hydrated:{kind}", datetime.now().isoformat())
+        print(f"[CACHE] Hydrated SQLite {kind.upper()} index ({len(index)} entries)")
+    
+    def _backup_index_to_gcs(self, kind: str, file_hash: Optional[str] = None):
+        """Write the SQLite index to GCS as shards: all of them, or only the one holding file_hash (SQLite backend only)."""
+        if not self.use_gcs:
+            return
+        if file_hash is not None and str(file_hash)[:1].lower() in INDEX_SHARDS:
+            # One shard: read only its rows (file hashes are hex, so a key range)
+            shard = self._index_shard(file_hash)
+            shard_data = {shard: self.sqlite_store.load_index_shard(kind, shard)}
+        else:
+            shards = [self._index_shard(file_hash)] if file_hash is not None else list(INDEX_SHARDS)
+            shard_data = {shard: {} for shard in shards}
+            for h, entry in self.sqlite_store.load_index(kind).items():
+                shard = self._index_shard(h)
+                if shard in shard_data:
+                    shard_data[shard][h] = entry
+        for shard, data in shard_data.items():
+            self._mirror_to_gcs(self._get_index_shard_paths(kind, shard)[0], self.serializer.dumps(data))
+    
+    def _load_index(self, kind: str) -> Dict[str, Any]:
+        """Load the whole PO/GRN index as {file_hash: entry}."""
+        if self.sqlite_store:
+            self._hydrate_sqlite_index(kind)
+            return self.sqlite_store.load_index(kind)
+        return self._load_index_snapshot(kind)
+    
+    def _save_index(self, kind: str, index: Dict[str, Any]):
+        """Replace the whole PO/GRN index."""
+        if self.sqlite_store:
+            self.sqlite_store.replace_index(kind, index)
+            self.sqlite_store.set_meta(f"hydrated:{kind}", datetime.now().isoformat())
+            self._backup_index_to_gcs(kind)
+            return
+        self._save_index_snapshot(kind, index)
+    
+    def _put_index_entry(self, kind: str, file_hash: str, entry: Dict[str, Any]):
+        """Add or update one PO/GRN index entry."""
+        def stamp(current):
+            # index_seq fixes the entry's place in index order: stamped on first write, kept on updates
+            entry["index_seq"] = index_order(file_hash, current)[0] if isinstance(current, dict) else time.time_ns()
+        
+        if self.sqlite_store:
+            self._hydrate_sqlite_index(kind)
+            stamp(self.sqlite_store.get_index_entry(kind, file_hash))
+            self.sqlite_store.put_index_entry(kind, file_hash, entry)
+            self._backup_index_to_gcs(kind, file_hash)
+            return
+        
+        def put(shard_data):
+            stamp(shard_data.get(file_hash))
+            shard_data[file_hash] = entry
+            return True
+        self._update_index_shard(kind, file_hash, put)
+    
+    def _delete_index_entry(self, kind: str, file_hash: str) -> bool:
+        """Remove one PO/GRN index entry. Returns True if it existed."""
+        if self.sqlite_store:
+            self._hydrate_sqlite_index(kind)
+            if not self.sqlite_store.delete_index_entry(kind, file_hash):
+                return False
+            self._backup_index_to_gcs(kind, file_hash)
+            return True
+        
+        def delete(shard_data):
+            return shard_data.pop(file_hash, None) is not None
+        return self._update_index_shard(kind, file_hash, delete)
+    
+    def _get_index_entry(self, kind: str, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Get one PO/GRN index entry by file hash."""
+        if self.sqlite_store:
+            self._hydrate_sqlite_index(kind)
+            return self.sqlite_store.get_index_entry(kind, file_hash)
+        index = self._load_index(kind)
+        return index.get(file_hash) if isinstance(index, dict) else None
+    
+    def _match_po_number(self, kind: str, normalized_po: str) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """
+        (score, file_hash, entry) for every entry whose PO number matches, in index order.
+        Scores: 100 exact, 90 alphanumeric cores contain one another, 85 raw strings contain one another.
+        With SQLite the overlap filter runs in SQL; otherwise candidates come from the in-memory
+        PONumberIndex over the cached shards.
+        """
+        query_core = po_core(normalized_po)
+        if self.sqlite_store:
+            self._hydrate_sqlite_index(kind)
+            matches = []
+            for file_hash, entry in self.sqlite_store.iter_po_number_candidates(kind, normalized_po):
+                entry_po = normalize_po_number(entry.get("po_number"))
+                score = score_po_number(normalized_po, query_core, entry_po, po_core(entry_po))
+                if entry_po and score:
+                    matches.append((score, file_hash, entry))
+            return matches
+        
+        shards = self._load_index_shards(kind)
+        po_numbers = self._po_number_indexes[kind]
+        po_numbers.sync_shards(shards)
+        matches = []
+        for score, file_hash in po_numbers.match(normalized_po):
+            # Another thread may have synced newer shards in between; use this snapshot's entries
+            entry = shards.get(self._index_shard(file_hash), {}).get("data", {}).get(file_hash)
+            if isinstance(entry, dict):
+                matches.append((score, file_hash, entry))
+        return matches
+    
+    def _load_po_index(self) -> Dict[str, Any]:
+        """Load PO index from SQLite, GCS or local storage."""
+        return self._load_index("po")
+    
+    def _save_po_index(self, po_index: Dict[str, Any]):
+        """Save PO index to SQLite/GCS/local storage."""
+        self._save_index("po", po_index)
     
     # ========================================================================
     # GRN (Goods Received Note) INDEX - for three-way match PO + GRN + Invoice
     # ========================================================================
     
     def _load_grn_index(self) -> Dict[str, Any]:
-        """Load GRN index from GCS or local."""
-        if self.use_gcs:
-            gcs_path = f"{self.gcs_cache_bucket}grn_cache/grn_index.json"
-            data = self._load_from_gcs(gcs_path)
-            if data and isinstance(data, dict):
-                return data
-        local_path = self.grn_cache_dir / "grn_index.json"
-        if local_path.exists():
-            try:
-                with open(local_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"[CACHE] Error loading GRN index: {e}")
-        return {}
+        """Load GRN index from SQLite, GCS or local."""
+        return self._load_index("grn")
     
     def _save_grn_index(self, grn_index: Dict[str, Any]):
-        """Save GRN index to GCS and local."""
-        try:
-            if self.use_gcs:
-                gcs_path = f"{self.gcs_cache_bucket}grn_cache/grn_index.json"
-                self._save_to_gcs(gcs_path, grn_index)
-            local_path = self.grn_cache_dir / "grn_index.json"
-            with open(local_path, "w", encoding="utf-8") as f:
-                json.dump(grn_index, f, indent=2, ensure_ascii=False, default=str)
-        except Exception as e:
-            print(f"[CACHE] Error saving GRN index: {e}")
+        """Save GRN index to SQLite/GCS/local."""
+        self._save_index("grn", grn_index)
     
     def save_grn(self, file_hash: str, extracted_data: Dict[str, Any],
                  metadata: Dict[str, Any], document_text: str, filename: str):
-        """Store GRN in index (same pattern as PO)."""
+        """Store GRN: match keys in the GRN index, full record in grn_cache/<file_hash>_grn.json (same pattern as PO)."""
         try:
             doc_ids = extracted_data.get("document_ids", {})
             party_names = extracted_data.get("party_names", {})
@@ -445,11 +1197,9 @@ class CacheManager:
                 "item_descriptions": item_descriptions,
                 "total_amount": total_amount,
                 "indexed_at": datetime.now().isoformat(),
-                "full_data": full_data,
             }
-            grn_index = self._load_grn_index()
-            grn_index[file_hash] = index_entry
-            self._save_grn_index(grn_index)
+            self._save_index_payload("grn", file_hash, full_data)
+            self._put_index_entry("grn", file_hash, index_entry)
         except Exception as e:
             print(f"[CACHE] Error saving GRN: {e}")
     
@@ -457,14 +1207,19 @@ class CacheManager:
         """Get all GRNs from index."""
         return self._load_grn_index()
     
+    def get_grn_count(self) -> int:
+        """Number of GRNs in the index."""
+        if self.sqlite_store:
+            self._hydrate_sqlite_index("grn")
+            return self.sqlite_store.count_index("grn")
+        return len(self._load_grn_index())
+    
     def get_all_grns_full(self) -> List[Dict[str, Any]]:
         """Get all GRNs with full_data for chatbot/matching."""
         grn_index = self._load_grn_index()
-        return [
-            {**entry, "full_data": entry.get("full_data")}
-            for entry in (grn_index.values() if isinstance(grn_index, dict) else [])
-            if isinstance(entry, dict) and entry.get("full_data")
-        ]
+        if not isinstance(grn_index, dict):
+            return []
+        return self._load_index_payloads("grn", grn_index)
     
     def get_all_grns_json_path(self) -> Path:
         return self._get_data_dir() / "all_grns.json"
@@ -474,8 +1229,7 @@ class CacheManager:
         if not path.exists():
             return []
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = serializer.load_file(path)
             return data if isinstance(data, list) else []
         except Exception as e:
             print(f"[CACHE] Error loading all_grns.json: {e}")
@@ -484,8 +1238,7 @@ class CacheManager:
     def save_all_grns_json(self, grn_list: List[Dict[str, Any]]) -> bool:
         try:
             path = self.get_all_grns_json_path()
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(grn_list, f, indent=2, ensure_ascii=False, default=str)
+            self.serializer.dump_file(path, grn_list)
             if self.use_gcs:
                 self._save_to_gcs(f"{self.gcs_cache_bucket}data/all_grns.json", grn_list)
             return True
@@ -497,16 +1250,52 @@ class CacheManager:
         """Find a GRN by PO number (for three-way match)."""
         if not po_number or not str(po_number).strip():
             return None
-        grn_index = self._load_grn_index()
-        normalized = str(po_number).strip().lower()
-        for entry in (grn_index.values() if isinstance(grn_index, dict) else []):
-            if not isinstance(entry, dict):
-                continue
-            entry_po = (entry.get("po_number") or "").strip().lower()
-            if entry_po and (normalized in entry_po or entry_po in normalized):
+        normalized = normalize_po_number(po_number)
+        for _score, file_hash, entry in self._match_po_number("grn", normalized):
+            entry_po = normalize_po_number(entry.get("po_number"))
+            if normalized in entry_po or entry_po in normalized:
+                full_data = entry.get("full_data") or self._load_index_payload("grn", file_hash)
+                if full_data:
+                    return {**entry, "full_data": full_data}
                 return entry
         return None
-    
+
+    def get_po_grn_join(self) -> List[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Every PO with the GRN recorded for exactly its PO number (three-way match status).
+        The GRN side is read from the PONumberIndex kept in sync with the GRN shards, so no
+        PO x GRN scan; with several GRNs for one PO number the last in index order is used.
+
+        Returns:
+            [(file_hash, po_entry, grn_entry or None)] in PO index order
+        """
+        po_index = self._load_po_index()
+        if self.sqlite_store:
+            grn_by_po = {}
+            for entry in self._load_grn_index().values():
+                if isinstance(entry, dict) and normalize_po_number(entry.get("po_number")):
+                    grn_by_po[normalize_po_number(entry.get("po_number"))] = entry
+            find_grn = grn_by_po.get
+        else:
+            grn_shards = self._load_index_shards("grn")
+            grn_numbers = self._po_number_indexes["grn"]
+            grn_numbers.sync_shards(grn_shards)
+
+            def find_grn(normalized_po: str) -> Optional[Dict[str, Any]]:
+                for file_hash in reversed(grn_numbers.exact(normalized_po)):
+                    entry = grn_shards.get(self._index_shard(file_hash), {}).get("data", {}).get(file_hash)
+                    if isinstance(entry, dict):
+                        return entry
+                return None
+
+        joined = []
+        for file_hash, po_entry in po_index.items():
+            if not isinstance(po_entry, dict):
+                continue
+            normalized = normalize_po_number(po_entry.get("po_number"))
+            joined.append((file_hash, po_entry, find_grn(normalized) if normalized else None))
+        return joined
+
     def get_all_pos(self) -> Dict[str, Any]:
         """
         Get all POs from the index for matching.
@@ -516,23 +1305,23 @@ class CacheManager:
         """
         return self._load_po_index()
     
+    def get_po_count(self) -> int:
+        """Number of POs in the index."""
+        if self.sqlite_store:
+            self._hydrate_sqlite_index("po")
+            return self.sqlite_store.count_index("po")
+        return len(self._load_po_index())
+    
     def get_all_pos_full(self) -> List[Dict[str, Any]]:
         """
-        Get all POs with full_data (for chatbot). Uses index + load_po_cache fallback
-        so legacy po_cache/*.json files are included.
+        Get all POs with full_data (for chatbot). Index entries carry only match keys;
+        full records are loaded from po_cache/<file_hash>_po.json concurrently.
         Returns list of { full_data, file_hash, filename, po_number, ... }.
         """
         po_index = self._load_po_index()
-        result = []
         if not isinstance(po_index, dict):
-            return result
-        for file_hash, entry in po_index.items():
-            full_data = entry.get("full_data") if isinstance(entry, dict) else None
-            if not full_data:
-                full_data = self.load_po_cache(file_hash)
-            if full_data:
-                result.append({**(entry if isinstance(entry, dict) else {}), "full_data": full_data})
-        return result
+            return []
+        return self._load_index_payloads("po", po_index)
     
     def _get_data_dir(self) -> Path:
         """Directory for single JSON files (all_invoices.json, all_purchase_orders.json)."""
@@ -557,8 +1346,7 @@ class CacheManager:
         if not path.exists():
             return []
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = serializer.load_file(path)
             return data if isinstance(data, list) else []
         except Exception as e:
             print(f"[CACHE] Error loading all_purchase_orders.json: {e}")
@@ -568,8 +1356,7 @@ class CacheManager:
         """Save all POs to a single JSON file. Call after adding/updating a PO."""
         try:
             path = self.get_all_purchase_orders_json_path()
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(po_list, f, indent=2, ensure_ascii=False, default=str)
+            self.serializer.dump_file(path, po_list)
             if self.use_gcs:
                 gcs_path = f"{self.gcs_cache_bucket}data/all_purchase_orders.json"
                 self._save_to_gcs(gcs_path, po_list)
@@ -580,6 +1367,12 @@ class CacheManager:
     
     def load_all_invoices_json(self) -> List[Dict[str, Any]]:
         """Load the single JSON file of all invoices/extractions (for chatbot). Tries GCS first if enabled."""
+        with self._all_invoices_lock:
+            if self._all_invoices is not None:
+                return list(self._all_invoices.values())
+        return self._read_all_invoices_json()
+    
+    def _read_all_invoices_json(self) -> List[Dict[str, Any]]:
         if self.use_gcs:
             gcs_path = f"{self.gcs_cache_bucket}data/all_invoices.json"
             data = self._load_from_gcs(gcs_path)
@@ -589,26 +1382,82 @@ class CacheManager:
         if not path.exists():
             return []
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = serializer.load_file(path)
             return data if isinstance(data, list) else []
         except Exception as e:
             print(f"[CACHE] Error loading all_invoices.json: {e}")
             return []
     
+    @staticmethod
+    def _invoice_entries_by_id(invoices_list: List[Dict[str, Any]]) -> "OrderedDict[str, Dict[str, Any]]":
+        entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for i, entry in enumerate(invoices_list):
+            if isinstance(entry, dict):
+                entries[str(entry.get("extraction_id") or f"#{i}")] = entry
+        return entries
+    
     def save_all_invoices_json(self, invoices_list: List[Dict[str, Any]]) -> bool:
         """Save all invoices/extractions to a single JSON file. Call after adding/updating extractions."""
-        try:
-            path = self.get_all_invoices_json_path()
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(invoices_list, f, indent=2, ensure_ascii=False, default=str)
-            if self.use_gcs:
-                gcs_path = f"{self.gcs_cache_bucket}data/all_invoices.json"
-                self._save_to_gcs(gcs_path, invoices_list)
+        with self._all_invoices_lock:
+            self._all_invoices = self._invoice_entries_by_id(invoices_list)
+            self._all_invoices_dirty = True
+        return self.flush_all_invoices_json()
+    
+    def update_all_invoices_json(self, updates: Dict[str, Optional[Dict[str, Any]]]) -> bool:
+        """
+        Patch all_invoices.json for a few extractions instead of rebuilding it. The list is
+        kept in memory by extraction_id, so concurrent patches never drop each other's
+        entries; the file is written once per burst of updates (see flush_all_invoices_json).
+
+        Args:
+            updates: extraction_id -> new entry, or None to drop that extraction's entry
+
+        Returns:
+            True if the update was applied
+        """
+        if not updates:
             return True
-        except Exception as e:
-            print(f"[CACHE] Error saving all_invoices.json: {e}")
-            return False
+        if self._all_invoices is None:
+            loaded = self._invoice_entries_by_id(self._read_all_invoices_json())
+        with self._all_invoices_lock:
+            if self._all_invoices is None:
+                self._all_invoices = loaded
+            for extraction_id, entry in updates.items():
+                if entry:
+                    self._all_invoices[extraction_id] = entry
+                else:
+                    self._all_invoices.pop(extraction_id, None)
+            self._all_invoices_dirty = True
+            if self.all_invoices_flush_delay > 0:
+                if self._all_invoices_timer is None:
+                    self._all_invoices_timer = threading.Timer(self.all_invoices_flush_delay,
+                                                               self.flush_all_invoices_json)
+                    self._all_invoices_timer.daemon = True
+                    self._all_invoices_timer.start()
+                return True
+        return self.flush_all_invoices_json()
+    
+    def flush_all_invoices_json(self) -> bool:
+        """Write the in-memory all_invoices.json (local, then GCS) if it changed since the last write."""
+        with self._all_invoices_write_lock:
+            with self._all_invoices_lock:
+                if self._all_invoices_timer is not None:
+                    self._all_invoices_timer.cancel()
+                    self._all_invoices_timer = None
+                if not self._all_invoices_dirty or self._all_invoices is None:
+                    return True
+                invoices_list = list(self._all_invoices.values())
+                self._all_invoices_dirty = False
+            try:
+                payload = self.serializer.dump_file(self.get_all_invoices_json_path(), invoices_list)
+                if self.use_gcs:
+                    self._mirror_to_gcs(f"{self.gcs_cache_bucket}data/all_invoices.json", payload)
+                return True
+            except Exception as e:
+                with self._all_invoices_lock:
+                    self._all_invoices_dirty = True
+                print(f"[CACHE] Error saving all_invoices.json: {e}")
+                return False
     
     def find_po_by_number(self, po_number: str) -> Optional[Dict[str, Any]]:
         """
@@ -624,55 +1473,26 @@ class CacheManager:
         if not po_number or not po_number.strip():
             return None
         
-        po_index = self._load_po_index()
-        normalized_po = po_number.strip().lower()
-        
-        # Remove common prefixes/suffixes for flexible matching
-        import re
-        # Extract numeric/alphanumeric core from PO number
-        po_core = re.sub(r'[^a-z0-9]', '', normalized_po)
+        normalized_po = normalize_po_number(po_number)
+        # Alphanumeric core of the PO number, for flexible matching of prefixes/separators
+        po_core_str = po_core(normalized_po)
         
-        print(f"[PO_MATCH] Searching for PO number: '{po_number}' (core: '{po_core}')")
+        print(f"[PO_MATCH] Searching for PO number: '{po_number}' (core: '{po_core_str}')")
         
-        best_match = None
-        best_score = 0
+        # Exact match (100) wins; otherwise the first entry with the best partial score:
+        # core contains/is contained (90), raw string contains/is contained (85)
+        best = None
+        for score, file_hash, entry in self._match_po_number("po", normalized_po):
+            if best is None or score > best[0]:
+                best = (score, file_hash, entry)
         
-        for file_hash, entry in po_index.items():
-            entry_po = (entry.get("po_number", "") or "").strip().lower()
-            if not entry_po:
-                continue
-            
-            entry_po_core = re.sub(r'[^a-z0-9]', '', entry_po)
-            
-            # Exact match (100 points)
-            if entry_po == normalized_po:
-                print(f"[PO_MATCH] ✓ Exact match: '{entry_po}'")
-                full_data = entry.get("full_data") or self.load_po_cache(file_hash)
-                if full_data:
-                    return {**entry, "full_data": full_data}
-                return entry
-            
-            # Core match (contains or is contained) - 90 points
-            if po_core and entry_po_core:
-                if po_core in entry_po_core or entry_po_core in po_core:
-                    score = 90
-                    if score > best_score:
-                        best_score = score
-                        best_match = entry
-                        print(f"[PO_MATCH]   Partial match: '{entry_po}' (core: '{entry_po_core}') - Score: {score}")
-            
-            # One contains the other
-            if normalized_po in entry_po or entry_po in normalized_po:
-                score = 85
-                if score > best_score:
-                    best_score = score
-                    best_match = entry
-                    print(f"[PO_MATCH]   Substring match: '{entry_po}' - Score: {score}")
-        
-        # Return best partial match if score is high enough
-        if best_score >= 85 and best_match:
-            print(f"[PO_MATCH] ✓ Best PO number match: '{best_match.get('po_number')}' with score {best_score}")
-            full_data = best_match.get("full_data") or self.load_po_cache(best_match["file_hash"])
+        if best is not None:
+            best_score, file_hash, best_match = best
+            if best_score == 100:
+                print(f"[PO_MATCH] ✓ Exact match: '{best_match.get('po_number')}'")
+            else:
+                print(f"[PO_MATCH] ✓ Best PO number match: '{best_match.get('po_number')}' with score {best_score}")
+            full_data = best_match.get("full_data") or self._load_index_payload("po", file_hash)
             if full_data:
                 return {**best_match, "full_data": full_data}
             return best_match
@@ -695,13 +1515,31 @@ class CacheManager:
         Returns:
             Best matching PO index entry if found, None otherwise
         """
-        po_index = self._load_po_index()
-        
-        if not po_index:
+        if self.sqlite_store:
+            po_index = self._load_po_index()
+            po_count = len(po_index)
+            query = PartyQuery(vendor, customer, amount)
+            scored = []
+            for file_hash, entry in po_index.items():
+                if isinstance(entry, dict):
+                    score, match_details = score_party_match(query, party_fields(entry))
+                    if score:
+                        scored.append((score, file_hash, match_details))
+            entries = po_index
+        else:
+            # Only POs that can be the best match are scored (see vendor_index.VendorIndex.search)
+            shards = self._load_index_shards("po")
+            self._po_vendor_index.sync_shards(shards)
+            po_count = len(self._po_vendor_index)
+            scored = self._po_vendor_index.search(vendor=vendor, customer=customer, amount=amount)
+            entries = {file_hash: shards.get(self._index_shard(file_hash), {}).get("data", {}).get(file_hash)
+                       for _score, file_hash, _details in scored}
+        
+        if not po_count:
             print(f"[PO_MATCH] No PO index found")
             return None
         
-        print(f"[PO_MATCH] Searching {len(po_index)} POs for match...")
+        print(f"[PO_MATCH] Searching {po_count} POs for match...")
         print(f"[PO_MATCH]   Invoice Vendor: '{vendor}'")
         print(f"[PO_MATCH]   Invoice Customer: '{customer}'")
         print(f"[PO_MATCH]   Invoice Amount: '{amount}'")
@@ -709,51 +1547,11 @@ class CacheManager:
         best_match = None
         best_score = 0
         
-        for file_hash, entry in po_index.items():
-            score = 0
-            match_details = []
-            
-            entry_vendor = (entry.get("vendor", "") or "").strip().lower()
-            entry_customer = (entry.get("customer", "") or "").strip().lower()
-            entry_amount = (entry.get("total_amount", "") or "").strip()
-            
-            # Vendor matching (highest weight - 50 points)
-            if vendor and entry_vendor:
-                vendor_lower = vendor.strip().lower()
-                # Check if vendor names match (either contains the other)
-                if vendor_lower in entry_vendor or entry_vendor in vendor_lower:
-                    score += 50
-                    match_details.append(f"Vendor exact: +50")
-                elif self._fuzzy_match(vendor, entry_vendor, threshold=0.5):
-                    score += 40
-                    match_details.append(f"Vendor fuzzy: +40")
-                # Also check if invoice customer matches PO vendor (reversed roles)
-                elif customer and customer.strip().lower() in entry_vendor:
-                    score += 45
-                    match_details.append(f"Customer matches PO Vendor: +45")
-            
-            # Customer matching (40 points)
-            if customer and entry_customer:
-                customer_lower = customer.strip().lower()
-                if customer_lower in entry_customer or entry_customer in customer_lower:
-                    score += 40
-                    match_details.append(f"Customer exact: +40")
-                elif self._fuzzy_match(customer, entry_customer, threshold=0.5):
-                    score += 30
-                    match_details.append(f"Customer fuzzy: +30")
-                # Also check if invoice vendor matches PO customer (reversed roles)
-                elif vendor and vendor.strip().lower() in entry_customer:
-                    score += 35
-                    match_details.append(f"Vendor matches PO Customer: +35")
-            
-            # Amount matching (30 points - important confirmation)
-            if amount and entry_amount:
-                if self._amounts_match(amount, entry_amount):
-                    score += 30
-                    match_details.append(f"Amount match: +30")
-            
-            if score > 0:
-                print(f"[PO_MATCH]   PO '{entry.get('filename', 'unknown')}' - Score: {score} ({', '.join(match_details)})")
+        for score, file_hash, match_details in scored:
+            entry = entries.get(file_hash)
+            if not isinstance(entry, dict):
+                continue
+            print(f"[PO_MATCH]   PO '{entry.get('filename', 'unknown')}' - Score: {score} ({', '.join(match_details)})")
             
             if score > best_score:
                 best_score = score
@@ -763,7 +1561,7 @@ class CacheManager:
         # 40 points = at least a customer or fuzzy vendor match
         if best_score >= 40 and best_match:
             print(f"[PO_MATCH] ✓ Best match: '{best_match.get('filename')}' with score {best_score}")
-            full_data = best_match.get("full_data") or self.load_po_cache(best_match["file_hash"])
+            full_data = best_match.get("full_data") or self._load_index_payload("po", best_match["file_hash"])
             if full_data:
                 return {**best_match, "full_data": full_data, "match_score": best_score}
             return {**best_match, "match_score": best_score}
@@ -773,30 +1571,12 @@ class CacheManager:
     
     def _fuzzy_match(self, str1: str, str2: str, threshold: float = 0.6) -> bool:
         """Simple fuzzy string matching based on common words."""
-        words1 = set(str1.lower().split())
-        words2 = set(str2.lower().split())
-        
-        if not words1 or not words2:
-            return False
-        
-        common = words1 & words2
-        similarity = len(common) / max(len(words1), len(words2))
-        
-        return similarity >= threshold
+        return word_overlap(name_tokens(str1), name_tokens(str2)) >= threshold
     
     def _amounts_match(self, amount1: str, amount2: str) -> bool:
         """Check if two amount strings represent the same value."""
-        try:
-            # Extract numeric values
-            import re
-            num1 = re.sub(r'[^\d.]', '', str(amount1))
-            num2 = re.sub(r'[^\d.]', '', str(amount2))
-            
-            if num1 and num2:
-                return abs(float(num1) - float(num2)) < 0.01
-        except:
-            pass
-        return False
+        num1, num2 = parse_amount(amount1), parse_amount(amount2)
+        return num1 is not None and num2 is not None and abs(num1 - num2) < 0.01
     
     def upload_po_pdf_to_gcs(self, local_file_path: str, filename: str) -> Optional[str]:
         """
@@ -841,6 +1621,143 @@ class CacheManager:
         """Get GCS path for individual extraction record."""
         return f"{self.gcs_cache_bucket}extractions/{extraction_id}.json"
     
+    def _get_gcs_extractions_manifest_path(self) -> str:
+        """Get GCS path for the extraction records manifest (kept outside extractions/ so listings skip it)."""
+        return f"{self.gcs_cache_bucket}extractions_manifest.json"
+    
+    def _get_local_extractions_manifest_path(self) -> Path:
+        """Get local path for the extraction records manifest."""
+        return self.cache_base_dir / "extractions_manifest.json"
+    
+    def _manifest_row(self, body: bytes, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Manifest row for a serialized extraction record (the bytes as stored): content hashes
+        (to reuse local copies and match GCS listings at startup) plus the summary fields
+        shown by list_extraction_records.
+        """
+        results = data.get("results") or {}
+        return {
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "md5": base64.b64encode(hashlib.md5(body).digest()).decode("ascii"),
+            "size": len(body),
+            "saved_at": datetime.now().isoformat(),
+            "file_name": data.get("file_name", "Unknown"),
+            "file_hash": data.get("file_hash", ""),
+            "extracted_at": data.get("extracted_at", ""),
+            "uploaded_at": data.get("uploaded_at", ""),
+            "status": data.get("status", ""),
+            "document_type": results.get("contract_type", "Unknown") if isinstance(results, dict) and results else "Unknown",
+        }
+    
+    def _load_extractions_manifest(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get the manifest {extraction_id: row} of stored extraction records. On GCS this is the
+        sharded "extractions" index, revalidated against the shard generations like the PO/GRN
+        index, so rows written by other instances show up. Locally the manifest file is read once
+        and then maintained in memory; None if none exists yet.
+        """
+        if self.use_gcs:
+            return self._load_index_snapshot("extractions")
+        with self._manifest_lock:
+            if self._extractions_manifest is None:
+                data = None
+                local_path = self._get_local_extractions_manifest_path()
+                if local_path.exists():
+                    try:
+                        data = serializer.load_file(local_path)
+                    except Exception as e:
+                        print(f"[CACHE] Error loading extractions manifest: {e}")
+                if isinstance(data, dict) and isinstance(data.get("records"), dict):
+                    self._extractions_manifest = data["records"]
+            return self._extractions_manifest
+    
+    def _write_extractions_manifest(self, records: Dict[str, Dict[str, Any]],
+                                    removed: Optional[set] = None):
+        """
+        Replace the manifest in storage. On GCS, passing removed (ids known to be gone) applies
+        only the differing rows and the removals, shard by shard with conditional writes, so rows
+        other instances wrote meanwhile are kept; without it every shard is replaced.
+        """
+        if not self.use_gcs:
+            with self._manifest_lock:
+                self._extractions_manifest = dict(records)
+                self._save_extractions_manifest_locked()
+            return
+        if removed is None:
+            self._save_index_snapshot("extractions", records)
+            return
+        current = self._load_index_snapshot("extractions")
+        changes: Dict[str, Dict[str, Optional[Dict[str, Any]]]] = {}
+        for extraction_id, row in records.items():
+            if current.get(extraction_id) != row:
+                changes.setdefault(self._index_shard(extraction_id), {})[extraction_id] = row
+        for extraction_id in removed:
+            if extraction_id in current and extraction_id not in records:
+                changes.setdefault(self._index_shard(extraction_id), {})[extraction_id] = None
+        
+        def apply(shard_changes):
+            def mutate(shard: Dict[str, Any]) -> bool:
+                for extraction_id, row in shard_changes.items():
+                    if row is None:
+                        shard.pop(extraction_id, None)
+                    else:
+                        shard[extraction_id] = row
+                return True
+            try:
+                self._update_index_shard("extractions", next(iter(shard_changes)), mutate)
+            except Exception as e:
+                print(f"[CACHE] Error saving extractions manifest shard: {e}")
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(self.gcs_load_workers, len(changes) or 1))) as pool:
+            list(pool.map(apply, changes.values()))
+    
+    def _manifest_payload(self, records: Dict[str, Dict[str, Any]]) -> bytes:
+        payload = self.serializer.dumps({
+            "version": 1,
+            "updated_at": datetime.now().astimezone().isoformat(),
+            "records": records,
+        })
+        return payload.encode("utf-8") if isinstance(payload, str) else payload
+    
+    def _save_extractions_manifest_locked(self):
+        """Write the local manifest file (local storage only)."""
+        try:
+            with open(self._get_local_extractions_manifest_path(), 'wb') as f:
+                f.write(self._manifest_payload(self._extractions_manifest or {}))
+        except Exception as e:
+            print(f"[CACHE] Error saving local extractions manifest: {e}")
+    
+    def _update_extractions_manifest(self, extraction_id: str, row: Optional[Dict[str, Any]]):
+        """
+        Set (or remove, when row is None) one manifest row. On GCS this rewrites only the
+        manifest shard holding extraction_id, conditional on its generation; locally the
+        manifest file is saved.
+        """
+        if self.use_gcs:
+            def mutate(shard: Dict[str, Any]) -> bool:
+                if row is None:
+                    return shard.pop(extraction_id, None) is not None
+                shard[extraction_id] = row
+                return True
+            try:
+                self._update_index_shard("extractions", extraction_id, mutate)
+            except Exception as e:
+                # The startup load reconciles the manifest with the stored records
+                print(f"[CACHE] Error updating extractions manifest for {extraction_id}: {e}")
+            return
+        
+        self._load_extractions_manifest()
+        with self._manifest_lock:
+            if self._extractions_manifest is None:
+                # No manifest yet: the next startup load builds it from the stored records
+                return
+            if row is None:
+                if self._extractions_manifest.pop(extraction_id, None) is None:
+                    return
+            else:
+                self._extractions_manifest[extraction_id] = row
+            self._save_extractions_manifest_locked()
+    
     def save_extraction_record(self, extraction_id: str, data: Dict[str, Any]) -> bool:
         """
         Save individual extraction record to both local and GCS.
@@ -856,15 +1773,25 @@ class CacheManager:
             # Ensure extraction_id is in the data
             data["extraction_id"] = extraction_id
             
-            # Save to GCS if enabled
+            payload = self.serializer.dumps(data)
+            
+            # Save locally first (SQLite replaces the per-record files when enabled)
+            if self.sqlite_store:
+                self.sqlite_store.put_extraction(extraction_id, data)
+            else:
+                local_path = self._get_extractions_dir() / f"{extraction_id}.json"
+                with open(local_path, 'wb') as f:
+                    f.write(payload)
+            
+            # Then mirror to GCS if enabled (write-behind unless GCS_WRITE_BEHIND=0)
+            saved_to_gcs = False
             if self.use_gcs:
                 gcs_path = self._get_gcs_extraction_record_path(extraction_id)
-                self._save_to_gcs(gcs_path, data)
+                saved_to_gcs = self._mirror_to_gcs(gcs_path, payload)
             
-            # Also save locally
-            local_path = self._get_extractions_dir() / f"{extraction_id}.json"
-            with open(local_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            # Keep the manifest/summary index in step with the primary copy
+            if saved_to_gcs or not self.use_gcs:
+                self._update_extractions_manifest(extraction_id, self._manifest_row(payload, data))
             
             print(f"[CACHE] Saved extraction record: {extraction_id}")
             return True
@@ -882,6 +1809,11 @@ class CacheManager:
         Returns:
             Extraction data or None if not found
         """
+        if self.sqlite_store:
+            data = self.sqlite_store.get_extraction(extraction_id)
+            if data:
+                return data
+        
         # Try GCS first if enabled
         if self.use_gcs:
             gcs_path = self._get_gcs_extraction_record_path(extraction_id)
@@ -893,8 +1825,7 @@ class CacheManager:
         local_path = self._get_extractions_dir() / f"{extraction_id}.json"
         if local_path.exists():
             try:
-                with open(local_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return serializer.load_file(local_path)
             except Exception as e:
                 print(f"[CACHE] Error loading extraction record {extraction_id}: {e}")
         
@@ -917,6 +1848,8 @@ class CacheManager:
         
         # Delete from local
         if delete_local:
+            if self.sqlite_store and self.sqlite_store.delete_extraction(extraction_id):
+                deleted.append("sqlite")
             local_path = self._get_extractions_dir() / f"{extraction_id}.json"
             if local_path.exists():
                 try:
@@ -934,6 +1867,9 @@ class CacheManager:
             else:
                 failed.append(f"gcs: {msg}")
         
+        if (self.use_gcs and delete_gcs) or (not self.use_gcs and delete_local):
+            self._update_extractions_manifest(extraction_id, None)
+        
         if deleted:
             return True, f"Deleted from: {', '.join(deleted)}"
         elif failed:
@@ -948,6 +1884,40 @@ class CacheManager:
         Returns:
             List of extraction records with metadata
         """
+        if self.sqlite_store:
+            if not self.sqlite_store.get_meta("hydrated:extractions"):
+                self._load_all_extraction_records()
+            records = [{**row, "location": "sqlite", "modified": row.get("extracted_at", "")}
+                       for row in self.sqlite_store.list_extraction_summaries()]
+            for record in records:
+                record["file_name"] = record.get("file_name") or "Unknown"
+                record["document_type"] = record.get("document_type") or "Unknown"
+            print(f"[CACHE] Listed {len(records)} extraction records (SQLite)")
+            return records
+        
+        # Summary rows maintained by save_extraction_record / delete_extraction_record_file
+        manifest = self._load_extractions_manifest()
+        if manifest is not None:
+            location = "gcs" if self.use_gcs else "local"
+            records = [
+                {
+                    "extraction_id": extraction_id,
+                    "file_name": row.get("file_name") or "Unknown",
+                    "file_hash": row.get("file_hash", ""),
+                    "extracted_at": row.get("extracted_at", ""),
+                    "uploaded_at": row.get("uploaded_at", ""),
+                    "status": row.get("status", ""),
+                    "document_type": row.get("document_type") or "Unknown",
+                    "location": location,
+                    "size": row.get("size", 0),
+                    "modified": row.get("saved_at", ""),
+                }
+                for extraction_id, row in list(manifest.items())
+            ]
+            records.sort(key=lambda x: x.get("extracted_at", "") or x.get("uploaded_at", ""), reverse=True)
+            print(f"[CACHE] Listed {len(records)} extraction records (manifest)")
+            return records
+        
         records = []
         seen_ids = set()
         
@@ -972,8 +1942,7 @@ class CacheManager:
                             
                             # Try to load the record to get metadata
                             try:
-                                json_content = blob.download_as_text()
-                                data = json.loads(json_content)
+                                data = self._download_payload(blob)
                                 # Get document_type from results
                                 results = data.get("results", {})
                                 document_type = results.get("contract_type", "Unknown") if results else "Unknown"
@@ -989,7 +1958,8 @@ class CacheManager:
                                     "size": blob.size or 0,
                                     "modified": blob.updated.isoformat() if blob.updated else ""
                                 })
-                            except:
+                            except Exception as e:
+                                print(f"[CACHE] Could not read GCS extraction {extraction_id}: {e}")
                                 records.append({
                                     "extraction_id": extraction_id,
                                     "file_name": "Unknown",
@@ -1008,8 +1978,7 @@ class CacheManager:
                 seen_ids.add(extraction_id)
                 try:
                     stat = json_file.stat()
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    data = serializer.load_file(json_file)
                     # Get document_type from results
                     results = data.get("results", {})
                     document_type = results.get("contract_type", "Unknown") if results else "Unknown"
@@ -1054,6 +2023,10 @@ class CacheManager:
         
         # Clear local
         if clear_local:
+            if not self.use_gcs:
+                self._write_extractions_manifest({})
+            if self.sqlite_store:
+                results["local_deleted"] += self.sqlite_store.clear_extractions()
             extractions_dir = self._get_extractions_dir()
             for json_file in extractions_dir.glob("*.json"):
                 try:
@@ -1070,6 +2043,8 @@ class CacheManager:
                 parsed = urlparse(self.gcs_cache_bucket)
                 bucket_name = parsed.netloc
                 prefix = parsed.path.lstrip('/') + "extractions/"
+                if self.gcs_writer is not None:
+                    self.gcs_writer.cancel_prefix(f"{self.gcs_cache_bucket}extractions/")
                 
                 client = get_gcs_client()
                 bucket = client.bucket(bucket_name)
@@ -1082,6 +2057,7 @@ class CacheManager:
                             results["gcs_deleted"] += 1
                         except Exception as e:
                             results["errors"].append(f"gcs:{blob.name}: {e}")
+                self._write_extractions_manifest({})
             except Exception as e:
                 results["errors"].append(f"gcs list: {e}")
         
@@ -1119,8 +2095,7 @@ class CacheManager:
         local_path = self.cache_base_dir / "extractions_data.json"
         if local_path.exists():
             try:
-                with open(local_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = serializer.load_file(local_path)
                 if isinstance(data, list):
                     print(f"[CACHE] Loaded extractions_data from local (legacy) ({len(data)} records)")
                     # Migrate to individual files
@@ -1138,58 +2113,159 @@ class CacheManager:
         Returns:
             List of full extraction records with all data (results, status, etc.)
         """
+        if self.sqlite_store and self.sqlite_store.get_meta("hydrated:extractions"):
+            return self.sqlite_store.all_extractions()
+        
         records = []
         seen_ids = set()
         
         # Load from GCS first if enabled
         if self.use_gcs:
             try:
-                from urllib.parse import urlparse
-                
-                parsed = urlparse(self.gcs_cache_bucket)
-                bucket_name = parsed.netloc
-                prefix = parsed.path.lstrip('/') + "extractions/"
-                
-                client = get_gcs_client()
-                bucket = client.bucket(bucket_name)
-                
-                blobs = bucket.list_blobs(prefix=prefix)
-                for blob in blobs:
-                    if blob.name.endswith('.json') and not blob.name.endswith('/.json'):
-                        extraction_id = blob.name.split('/')[-1].replace('.json', '')
-                        if extraction_id and extraction_id not in seen_ids:
-                            seen_ids.add(extraction_id)
-                            try:
-                                json_content = blob.download_as_text()
-                                data = json.loads(json_content)
-                                # Ensure extraction_id is in the data
-                                data["extraction_id"] = extraction_id
-                                records.append(data)
-                            except Exception as e:
-                                print(f"[CACHE] Error loading GCS extraction {extraction_id}: {e}")
+                for extraction_id, data in self._load_gcs_extraction_records():
+                    if extraction_id not in seen_ids:
+                        seen_ids.add(extraction_id)
+                        records.append(data)
             except Exception as e:
                 print(f"[CACHE] Error listing GCS extraction records: {e}")
         
         # Load from local extractions folder
         extractions_dir = self._get_extractions_dir()
+        local_rows: Dict[str, Dict[str, Any]] = {}
         for json_file in extractions_dir.glob("*.json"):
             extraction_id = json_file.stem
             if extraction_id not in seen_ids:
                 seen_ids.add(extraction_id)
                 try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    body = json_file.read_bytes()
+                    data = serializer.loads(body)
+                    local_rows[extraction_id] = self._manifest_row(body, data)
                     # Ensure extraction_id is in the data
                     data["extraction_id"] = extraction_id
                     records.append(data)
                 except Exception as e:
                     print(f"[CACHE] Error loading local extraction {extraction_id}: {e}")
         
+        # Local-only storage: (re)build the summary manifest if it does not match the files
+        if not self.use_gcs and not self.sqlite_store:
+            manifest = self._load_extractions_manifest()
+            if manifest is None or set(manifest) != set(local_rows) or any("status" not in row for row in manifest.values()):
+                self._write_extractions_manifest(local_rows)
+        
         # Sort by extracted_at (most recent first)
         records.sort(key=lambda x: x.get("extracted_at", "") or x.get("uploaded_at", ""), reverse=True)
         
+        if self.sqlite_store:
+            self.sqlite_store.put_extractions(records)
+            self.sqlite_store.set_meta("hydrated:extractions", datetime.now().isoformat())
+            print(f"[CACHE] Hydrated SQLite extractions ({len(records)} records)")
+        
         return records
     
+    def _load_gcs_extraction_records(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Download all extraction records from GCS concurrently.
+        
+        The extractions/ prefix is listed (metadata only) and reconciled with the manifest:
+        bodies whose local copy matches the listed MD5 are read from disk, manifest rows are
+        reused for unchanged blobs, and only new or changed records are downloaded. Ids in the
+        manifest but not in the listing are dropped. Changed rows are then written to the
+        manifest shards (conditionally, keeping rows other instances wrote meanwhile).
+        
+        Returns:
+            List of (extraction_id, record) tuples
+        """
+        from urllib.parse import urlparse
+        
+        parsed = urlparse(self.gcs_cache_bucket)
+        prefix = parsed.path.lstrip('/') + "extractions/"
+        bucket = get_gcs_client().bucket(parsed.netloc)
+        extractions_dir = self._get_extractions_dir()
+        keep_local_copy = not self.sqlite_store
+        
+        manifest = self._load_extractions_manifest()
+        listed: Dict[str, Any] = {}
+        for blob in bucket.list_blobs(prefix=prefix):
+            if blob.name.endswith('.json') and not blob.name.endswith('/.json'):
+                extraction_id = blob.name.split('/')[-1][:-len('.json')]
+                if extraction_id:
+                    listed[extraction_id] = blob
+        
+        def row_is_current(row: Optional[Dict[str, Any]], blob) -> bool:
+            if not row or "status" not in row:
+                return False
+            if row.get("md5") and blob.md5_hash:
+                return row["md5"] == blob.md5_hash
+            # Row from before the manifest carried MD5s: trust it unless the blob is newer
+            saved_at = self._parse_timestamp(row.get("saved_at", ""))
+            return bool(saved_at and blob.updated and blob.updated <= saved_at)
+        
+        def fetch(extraction_id: str) -> Tuple[str, Optional[bytes], str]:
+            blob = listed[extraction_id]
+            local_path = extractions_dir / f"{extraction_id}.json"
+            if local_path.exists():
+                body = local_path.read_bytes()
+                if blob.md5_hash and base64.b64encode(hashlib.md5(body).digest()).decode("ascii") == blob.md5_hash:
+                    return extraction_id, body, "local"
+            try:
+                body = bucket.blob(blob.name).download_as_bytes(raw_download=True)
+            except Exception as e:
+                print(f"[CACHE] Error loading GCS extraction {extraction_id}: {e}")
+                return extraction_id, None, "missing" if getattr(e, "code", None) == 404 else "error"
+            if keep_local_copy:
+                try:
+                    local_path.write_bytes(body)
+                except Exception as e:
+                    print(f"[CACHE] Could not keep local copy of {extraction_id}: {e}")
+            return extraction_id, body, "gcs"
+        
+        results = []
+        rows: Dict[str, Dict[str, Any]] = {}
+        removed = set(manifest or {}) - set(listed)
+        counts = {"local": 0, "gcs": 0, "missing": 0, "error": 0, "rebuilt": 0}
+        with ThreadPoolExecutor(max_workers=self.gcs_load_workers) as pool:
+            for extraction_id, body, origin in pool.map(fetch, list(listed)):
+                counts[origin] += 1
+                row = (manifest or {}).get(extraction_id)
+                if body is None:
+                    if origin == "error" and row:
+                        rows[extraction_id] = row
+                    elif origin == "missing":
+                        removed.add(extraction_id)
+                    continue
+                try:
+                    data = serializer.loads(body)
+                except Exception as e:
+                    print(f"[CACHE] Error parsing GCS extraction {extraction_id}: {e}")
+                    continue
+                # Ensure extraction_id is in the data
+                data["extraction_id"] = extraction_id
+                results.append((extraction_id, data))
+                if not row_is_current(row, listed[extraction_id]):
+                    # New or changed since the manifest was written, or a row missing summary fields
+                    row = self._manifest_row(body, data)
+                    counts["rebuilt"] += 1
+                rows[extraction_id] = row
+        
+        # Write the manifest on first run, or when records were added, changed or removed
+        if manifest is None or removed or counts["rebuilt"]:
+            self._write_extractions_manifest(rows, removed=removed)
+        print(f"[CACHE] Loaded {len(results)} extraction records ({len(listed)} listed, "
+              f"{counts['rebuilt']} new/changed, {len(removed)} removed; {counts['gcs']} downloaded, "
+              f"{counts['local']} from local copy, {self.gcs_load_workers} workers)")
+        return results
+    
+    @staticmethod
+    def _parse_timestamp(value: str) -> Optional[datetime]:
+        """Parse an ISO timestamp as an aware datetime (naive values are taken as local time)."""
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.astimezone()
+    
     def _migrate_to_individual_files(self, data: list):
         """Migrate legacy extractions_data.json to individual files."""
         print(f"[CACHE] Migrating {len(data)} extractions to individual files...")
@@ -1356,12 +2432,11 @@ class CacheManager:
                 filename = "Unknown"
                 file_hash = cache_file.stem.replace("_extraction", "")
                 try:
-                    with open(cache_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        filename = data.get("metadata", {}).get("file_name", 
-                                   data.get("metadata", {}).get("filename", "Unknown"))
-                except:
-                    pass
+                    data = serializer.load_file(cache_file)
+                    filename = data.get("metadata", {}).get("file_name", 
+                               data.get("metadata", {}).get("filename", "Unknown"))
+                except Exception as e:
+                    print(f"[CACHE] Could not read {cache_file.name}: {e}")
                 
                 result["extraction_cache"].append({
                     "name": cache_file.name,
@@ -1387,12 +2462,11 @@ class CacheManager:
                 po_number = "Unknown"
                 file_hash = cache_file.stem.replace("_po", "")
                 try:
-                    with open(cache_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        filename = data.get("filename", "Unknown")
-                        po_number = data.get("extracted_data", {}).get("document_ids", {}).get("po_number", "")
-                except:
-                    pass
+                    data = serializer.load_file(cache_file)
+                    filename = data.get("filename", "Unknown")
+                    po_number = data.get("extracted_data", {}).get("document_ids", {}).get("po_number", "")
+                except Exception as e:
+                    print(f"[CACHE] Could not read {cache_file.name}: {e}")
                 
                 result["po_cache"].append({
                     "name": cache_file.name,
@@ -1414,11 +2488,10 @@ class CacheManager:
                 filename = "Unknown"
                 file_hash = cache_file.stem.replace("_chatbot", "")
                 try:
-                    with open(cache_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        filename = data.get("filename", "Unknown")
-                except:
-                    pass
+                    data = serializer.load_file(cache_file)
+                    filename = data.get("filename", "Unknown")
+                except Exception as e:
+                    print(f"[CACHE] Could not read {cache_file.name}: {e}")
                 
                 result["chatbot_cache"].append({
                     "name": cache_file.name,
@@ -1440,10 +2513,10 @@ class CacheManager:
         if local_extractions.exists():
             stat = local_extractions.stat()
             try:
-                with open(local_extractions, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    record_count = len(data) if isinstance(data, list) else 0
-            except:
+                data = serializer.load_file(local_extractions)
+                record_count = len(data) if isinstance(data, list) else 0
+            except Exception as e:
+                print(f"[CACHE] Could not read {local_extractions.name}: {e}")
                 record_count = 0
             
             result["extractions_data"].append({
@@ -1560,6 +2633,8 @@ class CacheManager:
                         file_hash = file_name.replace("_po.json", "")
                         # Remove from PO index
                         self._remove_from_po_index(file_hash)
+                    elif file_name.endswith("_grn.json"):
+                        self._delete_index_entry("grn", file_name.replace("_grn.json", ""))
                     
                     path.unlink()
                     print(f"[CACHE] Deleted local file: {file_path}")
@@ -1574,12 +2649,18 @@ class CacheManager:
                 bucket_name = parsed.netloc
                 blob_name = parsed.path.lstrip('/')
                 
+                # Do not let a queued upload re-create the object after the delete
+                if self.gcs_writer is not None:
+                    self.gcs_writer.cancel(file_path)
+                
                 # Check if this is a PO cache file and extract hash for index cleanup
                 file_name = blob_name.split('/')[-1]
                 if file_name.endswith("_po.json"):
                     file_hash = file_name.replace("_po.json", "")
                     # Remove from PO index
                     self._remove_from_po_index(file_hash)
+                elif file_name.endswith("_grn.json"):
+                    self._delete_index_entry("grn", file_name.replace("_grn.json", ""))
                 
                 client = get_gcs_client()
                 bucket = client.bucket(bucket_name)
@@ -1690,21 +2771,27 @@ class CacheManager:
     def _remove_from_po_index(self, file_hash: str):
         """Remove a PO from the index by file hash."""
         try:
-            po_index = self._load_po_index()
-            if file_hash in po_index:
-                del po_index[file_hash]
-                self._save_po_index(po_index)
+            if self._delete_index_entry("po", file_hash):
                 print(f"[CACHE] Removed PO from index: {file_hash[:16]}...")
         except Exception as e:
             print(f"[CACHE] Error removing PO from index: {e}")
 
     def delete_grn_by_file_hash(self, file_hash: str) -> Tuple[bool, str]:
-        """Remove a GRN from the index by file hash. GRN data is index-only (no per-file blob)."""
+        """Remove a GRN from the index by file hash, along with its grn_cache/<file_hash>_grn.json record."""
         try:
-            grn_index = self._load_grn_index()
-            if file_hash in grn_index:
-                del grn_index[file_hash]
-                self._save_grn_index(grn_index)
+            removed = self._delete_index_entry("grn", file_hash)
+            gcs_path, local_path = self._get_payload_paths("grn", file_hash)
+            if local_path.exists():
+                local_path.unlink()
+            if self.use_gcs:
+                from urllib.parse import urlparse
+                if self.gcs_writer is not None:
+                    self.gcs_writer.cancel(gcs_path)
+                parsed = urlparse(gcs_path)
+                blob = get_gcs_client().bucket(parsed.netloc).blob(parsed.path.lstrip('/'))
+                if blob.exists():
+                    blob.delete()
+            if removed:
                 print(f"[CACHE] Removed GRN from index: {file_hash[:16]}...")
                 return True, f"GRN removed: {file_hash[:16]}..."
             return False, f"GRN not found: {file_hash[:16]}..."
@@ -1735,8 +2822,7 @@ class CacheManager:
                 # Local legacy file
                 local_path = self.cache_base_dir / "extractions_data.json"
                 if local_path.exists():
-                    with open(local_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    data = serializer.load_file(local_path)
                     if isinstance(data, list):
                         original_count = len(data)
                         data = [item for item in data if item and isinstance(item, dict) and item.get("extraction_id") != extraction_id]
@@ -1798,6 +2884,9 @@ class CacheManager:
                     results["local_extraction_deleted"] += 1
             except Exception as e:
                 results["errors"].append(f"Local extraction cache: {e}")
+            with self._extraction_cache_lock:
+                self._extraction_memory_cache.clear()
+                self._extraction_disk_sizes = None
             
             try:
                 for cache_file in self.chatbot_cache_dir.glob("*.json"):
@@ -1809,6 +2898,10 @@ class CacheManager:
             # Clear individual extraction record files if requested
             if clear_extractions_data:
                 try:
+                    if not self.use_gcs:
+                        self._write_extractions_manifest({})
+                    if self.sqlite_store:
+                        results["local_extraction_records_deleted"] += self.sqlite_store.clear_extractions()
                     extractions_dir = self._get_extractions_dir()
                     for json_file in extractions_dir.glob("*.json"):
                         json_file.unlink()
@@ -1833,6 +2926,12 @@ class CacheManager:
                 parsed = urlparse(self.gcs_cache_bucket)
                 bucket_name = parsed.netloc
                 prefix = parsed.path.lstrip('/')
+                if self.gcs_writer is not None:
+                    if clear_extractions_data:
+                        self.gcs_writer.cancel_prefix(self.gcs_cache_bucket)
+                    else:
+                        for folder in ("po_cache/", "grn_cache/", "data/", "extraction_cache/", "chatbot_cache/"):
+                            self.gcs_writer.cancel_prefix(f"{self.gcs_cache_bucket}{folder}")
                 
                 client = get_gcs_client()
                 bucket = client.bucket(bucket_name)
@@ -1842,9 +2941,10 @@ class CacheManager:
                 for blob in blobs:
                     blob_name = blob.name
                     
-                    # Skip extractions folder and extractions_data.json unless explicitly requested
+                    # Skip extractions folder, its manifest and extractions_data.json unless explicitly requested
                     if not clear_extractions_data:
-                        if "extractions/" in blob_name or "extractions_data.json" in blob_name:
+                        if ("extractions/" in blob_name or "extractions_data.json" in blob_name
+                                or "extractions_manifest.json" in blob_name):
                             continue
                     
                     # Skip .gitkeep files
@@ -1864,6 +2964,8 @@ class CacheManager:
                     except Exception as e:
                         results["errors"].append(f"GCS delete {blob_name}: {e}")
                         
+                if clear_extractions_data:
+                    self._write_extractions_manifest({})
             except Exception as e:
                 results["errors"].append(f"GCS clear: {e}")
         
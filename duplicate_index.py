@@ -0,0 +1,135 @@
+"""
+Hash indexes over extractions_store for the duplicate checks.
+
+- Invoice ids: completed invoices keyed by normalized invoice id (invoice_id or
+  invoice_number, stripped and lowercased). A new invoice is a duplicate of one with the
+  same id from the same vendor (vendor_names_match; a blank vendor on either side matches),
+  so equal invoice numbers from different vendors no longer block each other.
+- File names: every extraction keyed by stripped, lowercased file name (/api/upload rejects
+  a second document with the same name).
+
+Both checks are dict lookups instead of a walk over the store. The indexes follow the store
+incrementally (store_index.ExtractionStoreIndex); hits are re-checked against the live record.
+"""
+
+from typing import Any, Dict, Optional, Set
+
+from store_index import ExtractionStoreIndex
+from vendor_index import vendor_names_match
+
+
+def normalize_invoice_id(invoice_id: Any) -> str:
+    """Invoice id as compared by the duplicate check: stripped and lowercased."""
+    return str(invoice_id or "").strip().lower()
+
+
+def normalize_file_name(file_name: Any) -> str:
+    """File name as compared by the upload check: stripped and lowercased."""
+    return str(file_name or "").strip().lower()
+
+
+def invoice_key(extraction: Optional[Dict[str, Any]]) -> str:
+    """Normalized invoice id of a completed invoice extraction, "" if it is not one."""
+    if not isinstance(extraction, dict) or extraction.get("status") != "completed":
+        return ""
+    extracted_data = extraction.get("extracted_data") or {}
+    if extracted_data.get("document_type") != "INVOICE":
+        return ""
+    doc_ids = extracted_data.get("document_ids") or {}
+    return normalize_invoice_id(doc_ids.get("invoice_id") or doc_ids.get("invoice_number"))
+
+
+def invoice_vendor(extraction: Dict[str, Any]) -> str:
+    """Vendor name on an extraction's invoice data."""
+    return ((extraction.get("extracted_data") or {}).get("party_names") or {}).get("vendor", "") or ""
+
+
+class DuplicateIndex(ExtractionStoreIndex):
+    """Normalized invoice id -> completed invoices, normalized file name -> extractions."""
+
+    index_name = "duplicates"
+    log_tag = "DUPLICATES"
+
+    def __init__(self):
+        super().__init__()
+        self._by_invoice_id: Dict[str, Set[str]] = {}
+        self._invoice_ids: Dict[str, str] = {}
+        self._by_file_name: Dict[str, Set[str]] = {}
+        self._file_names: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._file_names)
+
+    def find_invoice(self, invoice_id: str, vendor: str = "",
+                     exclude_id: Optional[str] = None) -> Optional[str]:
+        """
+        First completed invoice (in store order) with the same invoice id and a matching vendor.
+
+        Args:
+            invoice_id: Invoice id / number of the new invoice
+            vendor: Vendor of the new invoice ("" = any vendor)
+            exclude_id: Extraction id to skip (the invoice being checked)
+
+        Returns:
+            Extraction id of the existing invoice, or None
+        """
+        key = normalize_invoice_id(invoice_id)
+        if not key:
+            return None
+        with self._lock:
+            store = self._store
+            candidates = self._in_store_order(self._by_invoice_id.get(key, ()))
+        for extraction_id in candidates:
+            extraction = store.get(extraction_id) if store is not None else None
+            if extraction_id == exclude_id or invoice_key(extraction) != key:
+                continue
+            if vendor_names_match(vendor, invoice_vendor(extraction)):
+                return extraction_id
+        return None
+
+    def find_file_name(self, file_name: str) -> Optional[str]:
+        """
+        First extraction (in store order) with the same file name, ignoring case and
+        surrounding whitespace.
+
+        Returns:
+            Extraction id, or None
+        """
+        key = normalize_file_name(file_name)
+        if not key:
+            return None
+        with self._lock:
+            store = self._store
+            candidates = self._in_store_order(self._by_file_name.get(key, ()))
+        for extraction_id in candidates:
+            extraction = store.get(extraction_id) if store is not None else None
+            if isinstance(extraction, dict) and normalize_file_name(extraction.get("file_name")) == key:
+                return extraction_id
+        return None
+
+    def _index(self, extraction_id: str, extraction: Dict[str, Any]):
+        key = invoice_key(extraction)
+        if key:
+            self._invoice_ids[extraction_id] = key
+            self._by_invoice_id.setdefault(key, set()).add(extraction_id)
+        name = normalize_file_name(extraction.get("file_name"))
+        if name:
+            self._file_names[extraction_id] = name
+            self._by_file_name.setdefault(name, set()).add(extraction_id)
+
+    def _unindex(self, extraction_id: str):
+        for keys, postings in ((self._invoice_ids, self._by_invoice_id), (self._file_names, self._by_file_name)):
+            key = keys.pop(extraction_id, None)
+            if key is None:
+                continue
+            posting = postings.get(key)
+            if posting is not None:
+                posting.discard(extraction_id)
+                if not posting:
+                    del postings[key]
+
+    def _clear(self):
+        self._by_invoice_id.clear()
+        self._invoice_ids.clear()
+        self._by_file_name.clear()
+        self._file_names.clear()
@@ -5,6 +5,7 @@ Creates and updates an Excel file with extracted contract data.
 
 import os
 import re
+import threading
 import pandas as pd
 from pathlib import Path
 from typing import Dict, Any, Optional
@@ -358,6 +359,10 @@ class ExcelExporter:
         return os.path.abspath(self.excel_file_path)
 
 
+# The workbook is read, modified and rewritten; extraction workers call this from threads
+_excel_write_lock = threading.Lock()
+
+
 def update_contract_excel(extracted_data: Dict[str, Any], file_name: str, excel_file_path: str = "contract_extractions.xlsx") -> bool:
     """
     Convenience function to update Excel file with extracted contract data.
@@ -371,18 +376,19 @@ def update_contract_excel(extracted_data: Dict[str, Any], file_name: str, excel_
     Returns:
         True if successful, False otherwise
     """
-    exporter = ExcelExporter(excel_file_path)
-    success = exporter.create_or_update_excel(extracted_data, file_name)
-    
-    # Also save to GCS if enabled
-    if success:
-        try:
-            from cache_manager import get_cache_manager
-            cache_manager = get_cache_manager()
-            if cache_manager.use_gcs:
-                cache_manager.save_excel_to_gcs(excel_file_path, os.path.basename(excel_file_path))
-        except Exception as e:
-            print(f"[EXCEL] Note: GCS upload skipped or failed: {e}")
+    with _excel_write_lock:
+        exporter = ExcelExporter(excel_file_path)
+        success = exporter.create_or_update_excel(extracted_data, file_name)
+        
+        # Also save to GCS if enabled
+        if success:
+            try:
+                from cache_manager import get_cache_manager
+                cache_manager = get_cache_manager()
+                if cache_manager.use_gcs:
+                    cache_manager.save_excel_to_gcs(excel_file_path, os.path.basename(excel_file_path))
+            except Exception as e:
+                print(f"[EXCEL] Note: GCS upload skipped or failed: {e}")
     
     return success
 
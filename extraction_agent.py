@@ -6,6 +6,8 @@ Replaces traditional orchestrator with a stateful, graph-based agent workflow.
 import os
 import re
 import json
+import asyncio
+import threading
 from typing import Dict, Any, Optional, Literal, Annotated, TypedDict, List
 from pathlib import Path
 from datetime import datetime
@@ -15,10 +17,56 @@ from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_core.tools import tool
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool, tool
 
 # Local imports
 from document_parser import DocumentParser
+from llm_cache import cached_ainvoke, cached_invoke
+
+# LLM used by every extraction node (also part of the extraction cache key)
+EXTRACTION_MODEL = "gpt-4o-mini"
+
+# Process-wide LLM clients and tool lists, one per API key. Each ChatOpenAI owns an
+# OpenAI/httpx client whose connection pool keeps TLS connections alive between requests,
+# so documents after the first skip client construction and the TLS handshake.
+_llm_instances: Dict[str, ChatOpenAI] = {}
+_tool_instances: Dict[str, list] = {}
+_llm_lock = threading.Lock()
+
+
+def get_llm(api_key: Optional[str] = None) -> ChatOpenAI:
+    """
+    Get or create the shared extraction LLM client (EXTRACTION_MODEL, temperature 0.1).
+    
+    Args:
+        api_key: OpenAI API key (uses env var if not provided)
+        
+    Returns:
+        ChatOpenAI instance shared by all documents and threads
+    """
+    api_key = api_key or os.getenv('OPENAI_API_KEY') or ""
+    llm = _llm_instances.get(api_key)
+    if llm is None:
+        with _llm_lock:
+            llm = _llm_instances.get(api_key)
+            if llm is None:
+                llm = ChatOpenAI(model=EXTRACTION_MODEL, temperature=0.1, api_key=api_key or None)
+                _llm_instances[api_key] = llm
+    return llm
+
+
+def get_extraction_tools(api_key: Optional[str] = None) -> list:
+    """Get or create the shared extraction tools (see create_extraction_tools) for an API key."""
+    api_key = api_key or os.getenv('OPENAI_API_KEY') or ""
+    tools = _tool_instances.get(api_key)
+    if tools is None:
+        with _llm_lock:
+            tools = _tool_instances.get(api_key)
+            if tools is None:
+                tools = create_extraction_tools(api_key)
+                _tool_instances[api_key] = tools
+    return tools
 
 
 # ============== State Definition ==============
@@ -32,6 +80,7 @@ class ExtractionState(TypedDict):
     use_ocr: bool
     use_gcs_vision: bool
     extraction_id: Optional[str]  # For status tracking
+    single_pass: bool  # Classify and extract invoices in one LLM call
     
     # Processing state
     document_type: Optional[str]
@@ -51,38 +100,13 @@ class ExtractionState(TypedDict):
 
 # ============== Agent Tools ==============
 
-def create_extraction_tools(api_key: str):
-    """Create tools for the extraction agent."""
-    
-    @tool
-    def classify_document(document_text: str) -> Dict[str, Any]:
-        """
-        Classify the document type (LEASE, NDA, or CONTRACT).
-        
-        Args:
-            document_text: The text content of the document
-            
-        Returns:
-            Dictionary with document_type, confidence, and reasoning
-        """
-        from langchain_openai import ChatOpenAI
-        
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, api_key=api_key)
-        
-        # Truncate text if too long
-        text_sample = document_text[:3000] if len(document_text) > 3000 else document_text
-        
-        prompt = f"""Analyze the following document and classify it as one of these five types:
-1. PURCHASE_ORDER - A purchase order document (PO) requesting goods/services from a vendor
+_DOCUMENT_TYPES_TEXT = """1. PURCHASE_ORDER - A purchase order document (PO) requesting goods/services from a vendor
 2. INVOICE - A bill or invoice for goods/services (includes purchase invoices, sales invoices, tax invoices, proforma invoices, etc.)
 3. LEASE - A lease agreement for property, equipment, or assets
 4. NDA - A Non-Disclosure Agreement (also known as Confidentiality Agreement)
-5. CONTRACT - A general contract or agreement (service agreement, employment contract, etc.)
+5. CONTRACT - A general contract or agreement (service agreement, employment contract, etc.)"""
 
-DOCUMENT TEXT (sample):
-{text_sample}
-
-CLASSIFICATION GUIDELINES:
+_CLASSIFICATION_GUIDELINES_TEXT = """CLASSIFICATION GUIDELINES:
 - If the document contains "Purchase Order", "PO", "P.O.", "Order Number" with items to be ordered/purchased → classify as PURCHASE_ORDER
 - If the document contains invoice number, bill number, itemized charges, tax details, GST/VAT, or payment due information → classify as INVOICE
 - If the document discusses rental/lease terms, lessor/lessee, rental payments → classify as LEASE
@@ -91,7 +115,21 @@ CLASSIFICATION GUIDELINES:
 
 IMPORTANT: Distinguish between PURCHASE_ORDER and INVOICE:
 - PURCHASE_ORDER: Document from buyer to vendor requesting goods/services (before delivery)
-- INVOICE: Document from vendor to buyer billing for goods/services (after delivery)
+- INVOICE: Document from vendor to buyer billing for goods/services (after delivery)"""
+
+
+def _classification_messages(document_text: str) -> list:
+    """Messages for the document classification LLM call."""
+    # Truncate text if too long
+    text_sample = document_text[:3000] if len(document_text) > 3000 else document_text
+    
+    prompt = f"""Analyze the following document and classify it as one of these five types:
+{_DOCUMENT_TYPES_TEXT}
+
+DOCUMENT TEXT (sample):
+{text_sample}
+
+{_CLASSIFICATION_GUIDELINES_TEXT}
 
 Return your response in JSON format:
 {{
@@ -99,139 +137,149 @@ Return your response in JSON format:
     "confidence": "HIGH" | "MEDIUM" | "LOW",
     "reasoning": "Brief explanation of why this classification was chosen"
 }}"""
-        
-        response = llm.invoke([
-            SystemMessage(content="You are a document classification expert. Return only valid JSON."),
-            HumanMessage(content=prompt)
-        ])
-        
-        try:
-            # Try to parse JSON from response
-            content = response.content
-            # Handle markdown code blocks
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-            
-            result = json.loads(content.strip())
-            doc_type = result.get("document_type", "CONTRACT").upper()
-            if doc_type not in ["PURCHASE_ORDER", "INVOICE", "LEASE", "NDA", "CONTRACT"]:
-                doc_type = "CONTRACT"
-            
-            return {
-                "document_type": doc_type,
-                "confidence": result.get("confidence", "MEDIUM"),
-                "reasoning": result.get("reasoning", "Document analyzed and classified")
-            }
-        except json.JSONDecodeError:
-            # Fallback to keyword-based classification
-            text_lower = document_text.lower()
-            # Check for invoice keywords first
-            if any(kw in text_lower for kw in ["invoice", "bill to", "invoice number", "inv no", "bill no", "tax invoice", "proforma", "gst", "vat", "subtotal", "total due", "amount due", "payment due"]):
-                return {"document_type": "INVOICE", "confidence": "MEDIUM", "reasoning": "Invoice keywords detected"}
-            elif any(kw in text_lower for kw in ["non-disclosure", "nondisclosure", "confidentiality agreement"]):
-                return {"document_type": "NDA", "confidence": "MEDIUM", "reasoning": "NDA keywords detected"}
-            elif any(kw in text_lower for kw in ["lease agreement", "lessor", "lessee", "rental"]):
-                return {"document_type": "LEASE", "confidence": "MEDIUM", "reasoning": "Lease keywords detected"}
-            else:
-                return {"document_type": "CONTRACT", "confidence": "LOW", "reasoning": "Default classification"}
     
-    @tool
-    def extract_lease_data(document_text: str) -> Dict[str, Any]:
-        """
-        Extract data from a LEASE document.
-        
-        Args:
-            document_text: The text content of the lease document
-            
-        Returns:
-            Dictionary with extracted lease data
-        """
-        from langchain_openai import ChatOpenAI
-        
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, api_key=api_key)
-        
-        prompt = _create_extraction_prompt("LEASE", document_text)
+    return [
+        SystemMessage(content="You are a document classification expert. Return only valid JSON."),
+        HumanMessage(content=prompt)
+    ]
+
+
+def _parse_classification(content: str, document_text: str) -> Dict[str, Any]:
+    """Classification result from the LLM response (keyword fallback if it is not JSON)."""
+    try:
+        # Try to parse JSON from response
+        # Handle markdown code blocks
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0]
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0]
         
-        response = llm.invoke([
-            SystemMessage(content=_get_extraction_system_prompt()),
-            HumanMessage(content=prompt)
-        ])
+        result = json.loads(content.strip())
+        doc_type = result.get("document_type", "CONTRACT").upper()
+        if doc_type not in ["PURCHASE_ORDER", "INVOICE", "LEASE", "NDA", "CONTRACT"]:
+            doc_type = "CONTRACT"
         
-        return _parse_extraction_response(response.content)
+        return {
+            "document_type": doc_type,
+            "confidence": result.get("confidence", "MEDIUM"),
+            "reasoning": result.get("reasoning", "Document analyzed and classified")
+        }
+    except json.JSONDecodeError:
+        # Fallback to keyword-based classification
+        text_lower = document_text.lower()
+        # Check for invoice keywords first
+        if any(kw in text_lower for kw in ["invoice", "bill to", "invoice number", "inv no", "bill no", "tax invoice", "proforma", "gst", "vat", "subtotal", "total due", "amount due", "payment due"]):
+            return {"document_type": "INVOICE", "confidence": "MEDIUM", "reasoning": "Invoice keywords detected"}
+        elif any(kw in text_lower for kw in ["non-disclosure", "nondisclosure", "confidentiality agreement"]):
+            return {"document_type": "NDA", "confidence": "MEDIUM", "reasoning": "NDA keywords detected"}
+        elif any(kw in text_lower for kw in ["lease agreement", "lessor", "lessee", "rental"]):
+            return {"document_type": "LEASE", "confidence": "MEDIUM", "reasoning": "Lease keywords detected"}
+        else:
+            return {"document_type": "CONTRACT", "confidence": "LOW", "reasoning": "Default classification"}
+
+
+def _extraction_messages(doc_type: str, document_text: str) -> list:
+    """Messages for the type-specific extraction LLM call."""
+    if doc_type == "INVOICE":
+        return [
+            SystemMessage(content=_get_invoice_extraction_system_prompt()),
+            HumanMessage(content=_create_invoice_extraction_prompt(document_text))
+        ]
+    return [
+        SystemMessage(content=_get_extraction_system_prompt()),
+        HumanMessage(content=_create_extraction_prompt(doc_type, document_text))
+    ]
+
+
+# Classification confidence levels, lowest first
+CONFIDENCE_LEVELS = ("LOW", "MEDIUM", "HIGH")
+# Single-pass results below this confidence are re-done with the two-step path
+SINGLE_PASS_MIN_CONFIDENCE = os.environ.get("EXTRACTION_SINGLE_PASS_MIN_CONFIDENCE", "HIGH").strip().upper()
+
+
+def _single_pass_messages(document_text: str) -> list:
+    """Messages for the single-pass LLM call: classification plus, for invoices, the invoice fields."""
+    heading = f"""Classify the following document as one of these five types and, if it is an INVOICE, extract ALL relevant invoice information:
+{_DOCUMENT_TYPES_TEXT}
+
+{_CLASSIFICATION_GUIDELINES_TEXT}"""
     
-    @tool
-    def extract_nda_data(document_text: str) -> Dict[str, Any]:
-        """
-        Extract data from an NDA document.
-        
-        Args:
-            document_text: The text content of the NDA document
-            
-        Returns:
-            Dictionary with extracted NDA data
-        """
-        from langchain_openai import ChatOpenAI
-        
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, api_key=api_key)
-        
-        prompt = _create_extraction_prompt("NDA", document_text)
-        
-        response = llm.invoke([
-            SystemMessage(content=_get_extraction_system_prompt()),
-            HumanMessage(content=prompt)
-        ])
-        
-        return _parse_extraction_response(response.content)
+    prompt = _create_invoice_extraction_prompt(document_text, heading=heading) + """
+
+RESPONSE FORMAT (wraps the invoice format above):
+{
+    "document_type": "PURCHASE_ORDER" | "INVOICE" | "LEASE" | "NDA" | "CONTRACT",
+    "confidence": "HIGH" | "MEDIUM" | "LOW",
+    "reasoning": "Brief explanation of why this classification was chosen",
+    "invoice_data": the invoice JSON in the REQUIRED OUTPUT FORMAT above if document_type is INVOICE, otherwise null
+}"""
     
-    @tool
-    def extract_contract_data(document_text: str) -> Dict[str, Any]:
-        """
-        Extract data from a CONTRACT document.
-        
-        Args:
-            document_text: The text content of the contract document
-            
-        Returns:
-            Dictionary with extracted contract data
-        """
-        from langchain_openai import ChatOpenAI
-        
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, api_key=api_key)
-        
-        prompt = _create_extraction_prompt("CONTRACT", document_text)
-        
-        response = llm.invoke([
-            SystemMessage(content=_get_extraction_system_prompt()),
-            HumanMessage(content=prompt)
-        ])
-        
-        return _parse_extraction_response(response.content)
+    return [
+        SystemMessage(content=_get_invoice_extraction_system_prompt()
+                      + "\n10. Classify the document first; fill invoice_data only for invoices."),
+        HumanMessage(content=prompt)
+    ]
+
+
+def _parse_single_pass(content: str, document_text: str) -> Dict[str, Any]:
+    """Classification (see _parse_classification) plus "extracted_data": the invoice fields, or None."""
+    result = _parse_classification(content, document_text)
+    response = _parse_extraction_response(content)
+    invoice_data = response.get("invoice_data") if isinstance(response, dict) else None
+    result["extracted_data"] = invoice_data if isinstance(invoice_data, dict) and invoice_data else None
+    return result
+
+
+def _confidence_at_least(confidence: Any, minimum: str) -> bool:
+    """True if a classification confidence (HIGH / MEDIUM / LOW) reaches the minimum level."""
+    confidence = str(confidence or "").strip().upper()
+    if minimum not in CONFIDENCE_LEVELS:
+        minimum = "HIGH"
+    return confidence in CONFIDENCE_LEVELS and CONFIDENCE_LEVELS.index(confidence) >= CONFIDENCE_LEVELS.index(minimum)
+
+
+def create_extraction_tools(api_key: str):
+    """
+    Create tools for the extraction agent. The LLM tools have a sync and an async
+    implementation (tool.invoke / await tool.ainvoke) over the shared client from get_llm().
+    """
     
-    @tool
-    def extract_invoice_data(document_text: str) -> Dict[str, Any]:
-        """
-        Extract data from an INVOICE document (any type of invoice).
+    def llm_tool(name: str, description: str, build_messages, parse_response):
+        def run(document_text: str) -> Dict[str, Any]:
+            response = cached_invoke(get_llm(api_key), build_messages(document_text))
+            return parse_response(response.content, document_text)
         
-        Args:
-            document_text: The text content of the invoice document
-            
-        Returns:
-            Dictionary with extracted invoice data
-        """
-        from langchain_openai import ChatOpenAI
-        
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, api_key=api_key)
-        
-        prompt = _create_invoice_extraction_prompt(document_text)
-        
-        response = llm.invoke([
-            SystemMessage(content=_get_invoice_extraction_system_prompt()),
-            HumanMessage(content=prompt)
-        ])
+        async def arun(document_text: str) -> Dict[str, Any]:
+            response = await cached_ainvoke(get_llm(api_key), build_messages(document_text))
+            return parse_response(response.content, document_text)
         
-        return _parse_extraction_response(response.content)
+        return StructuredTool.from_function(func=run, coroutine=arun, name=name, description=description)
+    
+    def extraction_tool(name: str, doc_type: str, description: str):
+        return llm_tool(
+            name, description,
+            lambda document_text: _extraction_messages(doc_type, document_text),
+            lambda content, _document_text: _parse_extraction_response(content)
+        )
+    
+    classify_document = llm_tool(
+        "classify_document",
+        "Classify the document type (PURCHASE_ORDER, INVOICE, LEASE, NDA or CONTRACT). "
+        "Returns document_type, confidence and reasoning.",
+        _classification_messages, _parse_classification
+    )
+    extract_lease_data = extraction_tool("extract_lease_data", "LEASE", "Extract data from a LEASE document.")
+    extract_nda_data = extraction_tool("extract_nda_data", "NDA", "Extract data from an NDA document.")
+    extract_contract_data = extraction_tool("extract_contract_data", "CONTRACT", "Extract data from a CONTRACT document.")
+    extract_invoice_data = extraction_tool(
+        "extract_invoice_data", "INVOICE", "Extract data from an INVOICE document (any type of invoice)."
+    )
+    classify_and_extract_document = llm_tool(
+        "classify_and_extract_document",
+        "Classify the document and, if it is an INVOICE, extract its data in the same call. "
+        "Returns document_type, confidence, reasoning and extracted_data (None unless INVOICE).",
+        _single_pass_messages, _parse_single_pass
+    )
     
     @tool
     def calculate_risk_score(extracted_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -386,7 +434,8 @@ Return your response in JSON format:
             "risk_factors": risk_factors
         }
     
-    return [classify_document, extract_lease_data, extract_nda_data, extract_contract_data, extract_invoice_data, calculate_risk_score]
+    return [classify_document, extract_lease_data, extract_nda_data, extract_contract_data, extract_invoice_data,
+            calculate_risk_score, classify_and_extract_document]
 
 
 # ============== Helper Functions ==============
@@ -476,9 +525,12 @@ EXTRACTION INSTRUCTIONS:
 Return ONLY valid JSON."""
 
 
-def _create_invoice_extraction_prompt(document_text: str) -> str:
+def _create_invoice_extraction_prompt(
+    document_text: str,
+    heading: str = "Analyze the following INVOICE document and extract ALL relevant information:"
+) -> str:
     """Create extraction prompt specifically for invoices."""
-    return f"""Analyze the following INVOICE document and extract ALL relevant information:
+    return f"""{heading}
 
 DOCUMENT TEXT:
 {document_text}
@@ -879,7 +931,14 @@ def parse_document_node(state: ExtractionState) -> ExtractionState:
         use_gcs = state.get("use_gcs_vision", False)
         parser = DocumentParser(use_gcs_vision=use_gcs)
         
-        if state.get("file_path"):
+        if state.get("document_text"):
+            # Text parsed by the caller (e.g. for the near-duplicate check): don't parse twice
+            state["page_map"] = state.get("page_map") or {}
+            state["status"] = "parsing_complete"
+            state["messages"] = [
+                AIMessage(content="Using provided document text directly.")
+            ]
+        elif state.get("file_path"):
             # Let the parser auto-detect if OCR is needed based on:
             # - Scanned PDF detection
             # - Text density (chars per page)
@@ -896,12 +955,6 @@ def parse_document_node(state: ExtractionState) -> ExtractionState:
             state["messages"] = [
                 AIMessage(content=f"Document parsed successfully. Extracted {len(document_text)} characters from {len(page_map)} pages.")
             ]
-        elif state.get("document_text"):
-            state["page_map"] = {}
-            state["status"] = "parsing_complete"
-            state["messages"] = [
-                AIMessage(content="Using provided document text directly.")
-            ]
         else:
             raise ValueError("No file path or document text provided")
             
@@ -913,179 +966,284 @@ def parse_document_node(state: ExtractionState) -> ExtractionState:
     return state
 
 
-def classify_document_node(state: ExtractionState) -> ExtractionState:
-    """Node: Classify the document type."""
-    print("\n[AGENT NODE] Classifying document type...")
-    
-    # Update status for tracking
+def _update_node_status(state: ExtractionState, step: str, description: str, percent: int):
+    """Report a node's progress for the extraction being tracked (if any)."""
     extraction_id = state.get("extraction_id")
     if extraction_id:
         try:
             import extraction_status_manager
             extraction_status_manager.update_status(extraction_id, {
-                "current_step": "classify_document",
-                "step_description": "Classify Document - Classifying document type",
-                "progress_percent": 40,
+                "current_step": step,
+                "step_description": description,
+                "progress_percent": percent,
                 "skip_progress": False,
                 "is_complete": False
             })
         except Exception as e:
             print(f"   [WARNING] Could not update status: {e}")
+
+
+async def aparse_document_node(state: ExtractionState) -> ExtractionState:
+    """Async node: parsing (PDF text, Vision OCR) uses sync SDKs, so it runs on a worker thread."""
+    return await asyncio.to_thread(parse_document_node, state)
+
+
+def _start_classify(state: ExtractionState) -> bool:
+    """Classify node prologue; False if an earlier step failed."""
+    print("\n[AGENT NODE] Classifying document type...")
+    _update_node_status(state, "classify_document", "Classify Document - Classifying document type", 40)
+    return not state.get("error")
+
+
+def _apply_classification(state: ExtractionState, result: Dict[str, Any]):
+    state["document_type"] = result["document_type"]
+    state["classification_confidence"] = result["confidence"]
+    state["classification_reasoning"] = result["reasoning"]
+    state["status"] = "classified"
     
-    if state.get("error"):
+    state["messages"] = [
+        AIMessage(content=f"Document classified as {result['document_type']} with {result['confidence']} confidence. Reason: {result['reasoning']}")
+    ]
+    
+    print(f"    → Document Type: {result['document_type']} (Confidence: {result['confidence']})")
+
+
+def _apply_single_pass(state: ExtractionState, result: Dict[str, Any]) -> bool:
+    """
+    Use a single-pass result: the classification and, for an INVOICE, the extracted fields
+    (the extract node is then skipped). False if the confidence is below
+    SINGLE_PASS_MIN_CONFIDENCE; the caller then runs the two-step path.
+    """
+    if not _confidence_at_least(result.get("confidence"), SINGLE_PASS_MIN_CONFIDENCE):
+        print(f"    → Single pass: {result['document_type']} with {result['confidence']} confidence, "
+              f"using two-step classification")
+        return False
+    _apply_classification(state, result)
+    if result["document_type"] == "INVOICE" and result.get("extracted_data"):
+        _apply_extraction(state, result["extracted_data"], "INVOICE")
+        print("    → Single pass: invoice data extracted with the classification")
+    return True
+
+
+def _classification_failed(state: ExtractionState, e: Exception):
+    state["error"] = str(e)
+    state["status"] = "failed"
+    state["messages"] = [AIMessage(content=f"Error classifying document: {str(e)}")]
+
+
+def classify_document_node(state: ExtractionState) -> ExtractionState:
+    """Node: Classify the document type."""
+    if not _start_classify(state):
         return state
     
     try:
-        api_key = os.getenv('OPENAI_API_KEY')
-        tools = create_extraction_tools(api_key)
+        tools = get_extraction_tools(os.getenv('OPENAI_API_KEY'))
+        if state.get("single_pass"):
+            # classify_and_extract_document tool
+            if _apply_single_pass(state, tools[6].invoke({"document_text": state["document_text"]})):
+                return state
         classify_tool = tools[0]  # classify_document tool
         
         result = classify_tool.invoke({"document_text": state["document_text"]})
+        _apply_classification(state, result)
         
-        state["document_type"] = result["document_type"]
-        state["classification_confidence"] = result["confidence"]
-        state["classification_reasoning"] = result["reasoning"]
-        state["status"] = "classified"
-        
-        state["messages"] = [
-            AIMessage(content=f"Document classified as {result['document_type']} with {result['confidence']} confidence. Reason: {result['reasoning']}")
-        ]
-        
-        print(f"    → Document Type: {result['document_type']} (Confidence: {result['confidence']})")
+    except Exception as e:
+        _classification_failed(state, e)
+    
+    return state
+
+
+async def aclassify_document_node(state: ExtractionState) -> ExtractionState:
+    """Async node: Classify the document type (awaits the LLM call)."""
+    if not _start_classify(state):
+        return state
+    
+    try:
+        tools = get_extraction_tools(os.getenv('OPENAI_API_KEY'))
+        if state.get("single_pass"):
+            if _apply_single_pass(state, await tools[6].ainvoke({"document_text": state["document_text"]})):
+                return state
+        result = await tools[0].ainvoke({"document_text": state["document_text"]})
+        _apply_classification(state, result)
         
     except Exception as e:
-        state["error"] = str(e)
-        state["status"] = "failed"
-        state["messages"] = [AIMessage(content=f"Error classifying document: {str(e)}")]
+        _classification_failed(state, e)
     
     return state
 
 
-def extract_data_node(state: ExtractionState) -> ExtractionState:
-    """Node: Extract data based on document type."""
+def _start_extract(state: ExtractionState) -> bool:
+    """Extract node prologue; False if an earlier step failed."""
     print(f"\n[AGENT NODE] Extracting data using {state.get('document_type', 'CONTRACT')} extractor...")
+    _update_node_status(state, "extract_data", "Extract Data - Extracting using document extractor", 55)
+    return not state.get("error")
+
+
+def _select_extract_tool(tools: list, doc_type: str):
+    """Extraction tool for a document type; None for purchase orders (dedicated PO extractor)."""
+    # Tools order: [classify_document, extract_lease_data, extract_nda_data, extract_contract_data, extract_invoice_data, calculate_risk_score, classify_and_extract_document]
+    if doc_type == "LEASE":
+        return tools[1]  # extract_lease_data
+    elif doc_type == "NDA":
+        return tools[2]  # extract_nda_data
+    elif doc_type == "INVOICE":
+        return tools[4]  # extract_invoice_data
+    elif doc_type == "PURCHASE_ORDER":
+        return None
+    return tools[3]  # extract_contract_data
+
+
+def _apply_extraction(state: ExtractionState, result: Dict[str, Any], doc_type: str):
+    state["extracted_data"] = result
+    state["status"] = "extracted"
     
-    # Update status for tracking
-    extraction_id = state.get("extraction_id")
-    if extraction_id:
-        try:
-            import extraction_status_manager
-            extraction_status_manager.update_status(extraction_id, {
-                "current_step": "extract_data",
-                "step_description": "Extract Data - Extracting using document extractor",
-                "progress_percent": 55,
-                "skip_progress": False,
-                "is_complete": False
-            })
-        except Exception as e:
-            print(f"   [WARNING] Could not update status: {e}")
+    # Count extracted fields
+    non_empty = sum(1 for k, v in result.items() if v and v != "null" and v != {})
     
-    if state.get("error"):
+    if doc_type == "PURCHASE_ORDER":
+        state["messages"] = [AIMessage(content=f"Extracted {non_empty} fields from PURCHASE_ORDER document.")]
+        print(f"    → Extracted {non_empty} fields (PO)")
+        return
+    
+    state["messages"] = [
+        AIMessage(content=f"Extracted {non_empty} fields from {doc_type} document.")
+    ]
+    
+    print(f"    → Extracted {non_empty} fields")
+
+
+def _extraction_failed(state: ExtractionState, e: Exception):
+    state["error"] = str(e)
+    state["status"] = "failed"
+    state["messages"] = [AIMessage(content=f"Error extracting data: {str(e)}")]
+
+
+def extract_data_node(state: ExtractionState) -> ExtractionState:
+    """Node: Extract data based on document type."""
+    if not _start_extract(state):
         return state
     
     try:
         api_key = os.getenv('OPENAI_API_KEY')
-        tools = create_extraction_tools(api_key)
-        
         doc_type = state.get("document_type", "CONTRACT")
+        extract_tool = _select_extract_tool(get_extraction_tools(api_key), doc_type)
         
-        # Select the appropriate extraction tool
-        # Tools order: [classify_document, extract_lease_data, extract_nda_data, extract_contract_data, extract_invoice_data, calculate_risk_score]
-        if doc_type == "LEASE":
-            extract_tool = tools[1]  # extract_lease_data
-        elif doc_type == "NDA":
-            extract_tool = tools[2]  # extract_nda_data
-        elif doc_type == "INVOICE":
-            extract_tool = tools[4]  # extract_invoice_data
-        elif doc_type == "PURCHASE_ORDER":
+        if extract_tool is None:
             # Use dedicated PO extractor
             from po_extractor import extract_po_data
             result = extract_po_data(state["document_text"], api_key)
-            state["extracted_data"] = result
-            state["status"] = "extracted"
-            non_empty = sum(1 for k, v in result.items() if v and v != "null" and v != {})
-            state["messages"] = [AIMessage(content=f"Extracted {non_empty} fields from PURCHASE_ORDER document.")]
-            print(f"    → Extracted {non_empty} fields (PO)")
-            return state
         else:
-            extract_tool = tools[3]  # extract_contract_data
-        
-        result = extract_tool.invoke({"document_text": state["document_text"]})
-        
-        state["extracted_data"] = result
-        state["status"] = "extracted"
-        
-        # Count extracted fields
-        non_empty = sum(1 for k, v in result.items() if v and v != "null" and v != {})
+            result = extract_tool.invoke({"document_text": state["document_text"]})
+        _apply_extraction(state, result, doc_type)
         
-        state["messages"] = [
-            AIMessage(content=f"Extracted {non_empty} fields from {doc_type} document.")
-        ]
+    except Exception as e:
+        _extraction_failed(state, e)
+    
+    return state
+
+
+async def aextract_data_node(state: ExtractionState) -> ExtractionState:
+    """Async node: Extract data based on document type (awaits the LLM call)."""
+    if not _start_extract(state):
+        return state
+    
+    try:
+        api_key = os.getenv('OPENAI_API_KEY')
+        doc_type = state.get("document_type", "CONTRACT")
+        extract_tool = _select_extract_tool(get_extraction_tools(api_key), doc_type)
         
-        print(f"    → Extracted {non_empty} fields")
+        if extract_tool is None:
+            # The PO extractor is synchronous: keep it off the event loop
+            from po_extractor import extract_po_data
+            result = await asyncio.to_thread(extract_po_data, state["document_text"], api_key)
+        else:
+            result = await extract_tool.ainvoke({"document_text": state["document_text"]})
+        _apply_extraction(state, result, doc_type)
         
     except Exception as e:
-        state["error"] = str(e)
-        state["status"] = "failed"
-        state["messages"] = [AIMessage(content=f"Error extracting data: {str(e)}")]
+        _extraction_failed(state, e)
     
     return state
 
 
-def enhance_data_node(state: ExtractionState) -> ExtractionState:
-    """Node: Enhance extracted data with additional processing."""
-    
-    # Update status for tracking
-    extraction_id = state.get("extraction_id")
-    if extraction_id:
-        try:
-            import extraction_status_manager
-            extraction_status_manager.update_status(extraction_id, {
-                "current_step": "enhance_data",
-                "step_description": "Enhance Data - Enhancing extracted data",
-                "progress_percent": 70,
-                "skip_progress": False,
-                "is_complete": False
-            })
-        except Exception as e:
-            print(f"   [WARNING] Could not update status: {e}")
+def _start_enhance(state: ExtractionState) -> bool:
+    """Enhance node prologue; False if an earlier step failed."""
+    _update_node_status(state, "enhance_data", "Enhance Data - Enhancing extracted data", 70)
     print("\n[AGENT NODE] Enhancing extracted data...")
+    return not state.get("error")
+
+
+def _prepare_enhanced_data(state: ExtractionState) -> Dict[str, Any]:
+    """Enhancement steps before the account head: invoice flattening, currencies, period amount."""
+    extracted_data = state.get("extracted_data", {})
+    doc_type = state.get("document_type", "CONTRACT")
     
-    if state.get("error"):
+    # For invoices, flatten the nested structure for compatibility
+    if doc_type == "INVOICE":
+        extracted_data = _normalize_invoice_data(extracted_data)
+    
+    # Extract and normalize currency
+    extracted_data = _extract_currency(extracted_data, state.get("document_text", ""))
+    
+    # Extract local/secondary currency for multi-currency invoices
+    extracted_data = _extract_local_currency(extracted_data, state.get("document_text", ""))
+    
+    # Calculate per-period amount
+    extracted_data = _calculate_period_amount(extracted_data)
+    return extracted_data
+
+
+def _apply_enhancement(state: ExtractionState, extracted_data: Dict[str, Any]):
+    state["extracted_data"] = extracted_data
+    state["status"] = "enhanced"
+    
+    state["messages"] = [
+        AIMessage(content="Data enhanced with currency normalization and period calculations.")
+    ]
+
+
+def _enhancement_failed(state: ExtractionState, e: Exception):
+    # Don't fail on enhancement errors, just log
+    print(f"    → Warning: Enhancement error: {str(e)}")
+    state["messages"] = [AIMessage(content=f"Enhancement warning: {str(e)}")]
+
+
+def enhance_data_node(state: ExtractionState) -> ExtractionState:
+    """Node: Enhance extracted data with additional processing."""
+    if not _start_enhance(state):
         return state
     
     try:
-        extracted_data = state.get("extracted_data", {})
-        doc_type = state.get("document_type", "CONTRACT")
-        
-        # For invoices, flatten the nested structure for compatibility
-        if doc_type == "INVOICE":
-            extracted_data = _normalize_invoice_data(extracted_data)
-        
-        # Extract and normalize currency
-        extracted_data = _extract_currency(extracted_data, state.get("document_text", ""))
-        
-        # Extract local/secondary currency for multi-currency invoices
-        extracted_data = _extract_local_currency(extracted_data, state.get("document_text", ""))
-        
-        # Calculate per-period amount
-        extracted_data = _calculate_period_amount(extracted_data)
+        extracted_data = _prepare_enhanced_data(state)
         
         # Assign account type based on content analysis
-        document_text = state.get("document_text", "")
-        extracted_data = _assign_account_type(extracted_data, doc_type, document_text)
+        extracted_data = _assign_account_type(
+            extracted_data, state.get("document_type", "CONTRACT"), state.get("document_text", "")
+        )
+        _apply_enhancement(state, extracted_data)
         
-        state["extracted_data"] = extracted_data
-        state["status"] = "enhanced"
+    except Exception as e:
+        _enhancement_failed(state, e)
+    
+    return state
+
+
+async def aenhance_data_node(state: ExtractionState) -> ExtractionState:
+    """Async node: Enhance extracted data (awaits the account-head LLM call)."""
+    if not _start_enhance(state):
+        return state
+    
+    try:
+        extracted_data = _prepare_enhanced_data(state)
         
-        state["messages"] = [
-            AIMessage(content="Data enhanced with currency normalization and period calculations.")
-        ]
+        # Assign account type based on content analysis
+        extracted_data = await _aassign_account_type(
+            extracted_data, state.get("document_type", "CONTRACT"), state.get("document_text", "")
+        )
+        _apply_enhancement(state, extracted_data)
         
     except Exception as e:
-        # Don't fail on enhancement errors, just log
-        print(f"    → Warning: Enhancement error: {str(e)}")
-        state["messages"] = [AIMessage(content=f"Enhancement warning: {str(e)}")]
+        _enhancement_failed(state, e)
     
     return state
 
@@ -1113,9 +1271,8 @@ def calculate_risk_node(state: ExtractionState) -> ExtractionState:
         return state
     
     try:
-        api_key = os.getenv('OPENAI_API_KEY')
-        tools = create_extraction_tools(api_key)
-        # Tools order: [classify_document, extract_lease_data, extract_nda_data, extract_contract_data, extract_invoice_data, calculate_risk_score]
+        tools = get_extraction_tools(os.getenv('OPENAI_API_KEY'))
+        # Tools order: [classify_document, extract_lease_data, extract_nda_data, extract_contract_data, extract_invoice_data, calculate_risk_score, classify_and_extract_document]
         risk_tool = tools[5]  # calculate_risk_score (was incorrectly set to 4, which was extract_invoice_data)
         
         result = risk_tool.invoke({"extracted_data": state.get("extracted_data", {})})
@@ -2039,46 +2196,36 @@ def _calculate_period_amount(extracted_data: Dict[str, Any]) -> Dict[str, Any]:
     return extracted_data
 
 
-def _classify_account_head(extracted_data: Dict[str, Any], document_text: str) -> str:
-    """
-    Classify account head based on document content analysis.
-    Uses AI to intelligently determine the appropriate account head.
-    """
-    try:
-        from langchain_openai import ChatOpenAI
-        from langchain_core.messages import SystemMessage, HumanMessage
-        from account_heads_taxonomy import get_account_head_list
-        
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            return "General Expense"
-        
-        # Prepare context for classification
-        doc_type = extracted_data.get("document_type", "")
-        invoice_type = extracted_data.get("invoice_type", "")
-        
-        # Get vendor/customer info
-        party_names = extracted_data.get("party_names", {})
-        vendor = party_names.get("vendor") or party_names.get("party_1", "")
-        
-        # Get line items
-        line_items = extracted_data.get("line_items", [])
-        line_items_text = ""
-        if line_items:
-            for item in line_items[:5]:  # Use first 5 items
-                if isinstance(item, dict):
-                    desc = item.get("description", "")
-                    if desc:
-                        line_items_text += f"  - {desc}\n"
-        
-        # Get notes/description
-        notes = extracted_data.get("notes", "")
-        
-        # Get document excerpt (first 500 chars for context)
-        doc_excerpt = document_text[:500] if document_text else ""
-        
-        # Create classification prompt
-        prompt = f"""Analyze this invoice/document and classify it into the MOST APPROPRIATE account head category.
+def _account_head_messages(extracted_data: Dict[str, Any], document_text: str) -> list:
+    """Messages for the account-head classification LLM call."""
+    from account_heads_taxonomy import get_account_head_list
+    
+    # Prepare context for classification
+    doc_type = extracted_data.get("document_type", "")
+    invoice_type = extracted_data.get("invoice_type", "")
+    
+    # Get vendor/customer info
+    party_names = extracted_data.get("party_names", {})
+    vendor = party_names.get("vendor") or party_names.get("party_1", "")
+    
+    # Get line items
+    line_items = extracted_data.get("line_items", [])
+    line_items_text = ""
+    if line_items:
+        for item in line_items[:5]:  # Use first 5 items
+            if isinstance(item, dict):
+                desc = item.get("description", "")
+                if desc:
+                    line_items_text += f"  - {desc}\n"
+    
+    # Get notes/description
+    notes = extracted_data.get("notes", "")
+    
+    # Get document excerpt (first 500 chars for context)
+    doc_excerpt = document_text[:500] if document_text else ""
+    
+    # Create classification prompt
+    prompt = f"""Analyze this invoice/document and classify it into the MOST APPROPRIATE account head category.
 
 DOCUMENT INFORMATION:
 - Document Type: {doc_type}
@@ -2108,43 +2255,77 @@ RETURN FORMAT:
 Return only the account head name (e.g., "IT & Technical Services" or "Construction Expense")
 NO explanation, NO extra text."""
 
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, api_key=api_key)
-        
-        response = llm.invoke([
-            SystemMessage(content="You are an accounting classification expert. Return only the account head name."),
-            HumanMessage(content=prompt)
-        ])
-        
-        # Extract account head from response
-        account_head = response.content.strip()
-        
-        # Clean up response (remove quotes, extra whitespace)
-        account_head = account_head.replace('"', '').replace("'", "").strip()
-        
-        # Validate it's in our taxonomy
-        from account_heads_taxonomy import ALL_ACCOUNT_HEADS
-        if account_head in ALL_ACCOUNT_HEADS.values():
-            return account_head
+    return [
+        SystemMessage(content="You are an accounting classification expert. Return only the account head name."),
+        HumanMessage(content=prompt)
+    ]
+
+
+def _parse_account_head(content: str) -> str:
+    """Account head from the LLM response, validated against the taxonomy."""
+    # Extract account head from response
+    account_head = content.strip()
+    
+    # Clean up response (remove quotes, extra whitespace)
+    account_head = account_head.replace('"', '').replace("'", "").strip()
+    
+    # Validate it's in our taxonomy
+    from account_heads_taxonomy import ALL_ACCOUNT_HEADS
+    if account_head in ALL_ACCOUNT_HEADS.values():
+        return account_head
+    
+    # If not exact match, try to find partial match
+    for key, name in ALL_ACCOUNT_HEADS.items():
+        if name.lower() in account_head.lower() or account_head.lower() in name.lower():
+            return name
+    
+    # Default fallback
+    return "General Expense"
+
+
+def _classify_account_head(extracted_data: Dict[str, Any], document_text: str) -> str:
+    """
+    Classify account head based on document content analysis.
+    Uses AI to intelligently determine the appropriate account head.
+    """
+    try:
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            return "General Expense"
         
-        # If not exact match, try to find partial match
-        for key, name in ALL_ACCOUNT_HEADS.items():
-            if name.lower() in account_head.lower() or account_head.lower() in name.lower():
-                return name
+        response = cached_invoke(get_llm(api_key), _account_head_messages(extracted_data, document_text))
+        return _parse_account_head(response.content)
         
-        # Default fallback
+    except Exception as e:
+        print(f"    → Warning: Account head classification error: {str(e)}")
         return "General Expense"
+
+
+async def _aclassify_account_head(extracted_data: Dict[str, Any], document_text: str) -> str:
+    """Async _classify_account_head (awaits the LLM call)."""
+    try:
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            return "General Expense"
+        
+        response = await cached_ainvoke(get_llm(api_key), _account_head_messages(extracted_data, document_text))
+        return _parse_account_head(response.content)
         
     except Exception as e:
         print(f"    → Warning: Account head classification error: {str(e)}")
         return "General Expense"
 
 
+def _has_account_type(extracted_data: Dict[str, Any]) -> bool:
+    """Account type is already set and looks valid (not empty, null or a generic default)."""
+    account_type = extracted_data.get("account_type")
+    return bool(account_type and account_type.strip() != "" and account_type.lower() not in ["null", "accounts payable", "general expense"])
+
+
 def _assign_account_type(extracted_data: Dict[str, Any], document_type: str, document_text: str = "") -> Dict[str, Any]:
     """Assign account type based on content analysis."""
-    account_type = extracted_data.get("account_type")
-    
     # If account type is already set and looks valid, keep it
-    if account_type and account_type.strip() != "" and account_type.lower() not in ["null", "accounts payable", "general expense"]:
+    if _has_account_type(extracted_data):
         return extracted_data
     
     # For invoices and contracts, use AI-based classification
@@ -2164,6 +2345,17 @@ def _assign_account_type(extracted_data: Dict[str, Any], document_type: str, doc
     return extracted_data
 
 
+async def _aassign_account_type(extracted_data: Dict[str, Any], document_type: str, document_text: str = "") -> Dict[str, Any]:
+    """Async _assign_account_type (awaits the account-head LLM call)."""
+    if _has_account_type(extracted_data) or document_type.upper() not in ["INVOICE", "CONTRACT", "LEASE"]:
+        return _assign_account_type(extracted_data, document_type, document_text)
+    print(f"    → Classifying account head based on document content...")
+    classified_account = await _aclassify_account_head(extracted_data, document_text)
+    extracted_data["account_type"] = classified_account
+    print(f"    → Account Head: {classified_account}")
+    return extracted_data
+
+
 def _normalize_invoice_data(extracted_data: Dict[str, Any]) -> Dict[str, Any]:
     """Normalize invoice data to ensure compatibility with the standard format."""
     
@@ -2339,6 +2531,104 @@ def should_continue(state: ExtractionState) -> Literal["continue", "error"]:
     return "continue"
 
 
+def after_classify(state: ExtractionState) -> Literal["extract", "extracted", "error"]:
+    """Route after classification: the single-pass call may already have extracted the data."""
+    if state.get("error"):
+        return "error"
+    if state.get("status") == "extracted":
+        return "extracted"
+    return "extract"
+
+
+# ============== Workflow Graph ==============
+
+def _build_graph() -> StateGraph:
+    """
+    Build the extraction workflow graph (nodes are stateless; all data travels in the state).
+    Nodes that wait on I/O have an async twin, used when the graph runs with ainvoke().
+    """
+    
+    # Create the graph
+    workflow = StateGraph(ExtractionState)
+    
+    # Add nodes
+    workflow.add_node("parse", RunnableLambda(parse_document_node, afunc=aparse_document_node, name="parse"))
+    workflow.add_node("classify", RunnableLambda(classify_document_node, afunc=aclassify_document_node, name="classify"))
+    workflow.add_node("extract", RunnableLambda(extract_data_node, afunc=aextract_data_node, name="extract"))
+    workflow.add_node("enhance", RunnableLambda(enhance_data_node, afunc=aenhance_data_node, name="enhance"))
+    workflow.add_node("risk", calculate_risk_node)
+    workflow.add_node("finalize", finalize_node)
+    
+    # Add edges
+    workflow.set_entry_point("parse")
+    
+    # Parse → Classify (with error check)
+    workflow.add_conditional_edges(
+        "parse",
+        should_continue,
+        {
+            "continue": "classify",
+            "error": "finalize"
+        }
+    )
+    
+    # Classify → Extract (with error check); single pass → Enhance when already extracted
+    workflow.add_conditional_edges(
+        "classify",
+        after_classify,
+        {
+            "extract": "extract",
+            "extracted": "enhance",
+            "error": "finalize"
+        }
+    )
+    
+    # Extract → Enhance (with error check)
+    workflow.add_conditional_edges(
+        "extract",
+        should_continue,
+        {
+            "continue": "enhance",
+            "error": "finalize"
+        }
+    )
+    
+    # Enhance → Risk (always continue)
+    workflow.add_edge("enhance", "risk")
+    
+    # Risk → Finalize
+    workflow.add_edge("risk", "finalize")
+    
+    # Finalize → END
+    workflow.add_edge("finalize", END)
+    
+    return workflow
+
+
+
+# The compiled graph holds no per-document data (each invoke gets its own state and there is
+# no checkpointer), so one instance serves every agent and concurrent invoke() / ainvoke() calls.
+_extraction_graph: Optional[StateGraph] = None
+_compiled_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_compiled_graph():
+    """
+    Get or build the process-wide compiled extraction graph.
+    
+    Returns:
+        Compiled LangGraph app (safe for concurrent invoke / ainvoke)
+    """
+    global _extraction_graph, _compiled_graph
+    if _compiled_graph is None:
+        with _graph_lock:
+            if _compiled_graph is None:
+                _extraction_graph = _build_graph()
+                _compiled_graph = _extraction_graph.compile()
+    return _compiled_graph
+
+
 # ============== Main Agent Class ==============
 
 class ExtractionAgent:
@@ -2348,18 +2638,27 @@ class ExtractionAgent:
     This agent uses a graph-based workflow to:
     1. Parse documents (PDF, DOCX, TXT)
     2. Classify document type (LEASE, NDA, CONTRACT)
-    3. Extract relevant data using type-specific prompts
+    3. Extract relevant data using type-specific prompts (single_pass: invoices are
+       classified and extracted in one LLM call)
     4. Enhance data with currency/period calculations
     5. Calculate risk scores
     """
     
+    model_name = EXTRACTION_MODEL
+    
+    @staticmethod
+    def default_single_pass() -> bool:
+        """Single-pass setting of agents built without an explicit one (env EXTRACTION_SINGLE_PASS=1)."""
+        return os.environ.get("EXTRACTION_SINGLE_PASS", "0").strip() == "1"
+    
     def __init__(
         self,
         api_key: Optional[str] = None,
         use_gcs_vision: bool = True,  # Default to True - Vision API enabled for OCR
         service_account_file: Optional[str] = None,
         use_semantic_search: bool = True,  # Kept for backwards compatibility
-        document_id: Optional[str] = None   # Kept for backwards compatibility
+        document_id: Optional[str] = None,  # Kept for backwards compatibility
+        single_pass: Optional[bool] = None
     ):
         """
         Initialize the extraction agent.
@@ -2370,105 +2669,45 @@ class ExtractionAgent:
             service_account_file: Path to GCP service account JSON
             use_semantic_search: Kept for backwards compatibility (agent has built-in semantic capabilities)
             document_id: Kept for backwards compatibility
+            single_pass: Classify and extract invoices in one LLM call, falling back to the
+                two-step path below EXTRACTION_SINGLE_PASS_MIN_CONFIDENCE (default: env
+                EXTRACTION_SINGLE_PASS=1)
         """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         self.use_gcs_vision = use_gcs_vision
         self.service_account_file = service_account_file
         self.use_semantic_search = use_semantic_search  # Stored but agent uses LLM-based extraction
         self.document_id = document_id
+        if single_pass is None:
+            single_pass = self.default_single_pass()
+        self.single_pass = single_pass
         
-        # Build the graph
-        self.graph = self._build_graph()
-        self.app = self.graph.compile()
-    
-    def _build_graph(self) -> StateGraph:
-        """Build the extraction workflow graph."""
-        
-        # Create the graph
-        workflow = StateGraph(ExtractionState)
-        
-        # Add nodes
-        workflow.add_node("parse", parse_document_node)
-        workflow.add_node("classify", classify_document_node)
-        workflow.add_node("extract", extract_data_node)
-        workflow.add_node("enhance", enhance_data_node)
-        workflow.add_node("risk", calculate_risk_node)
-        workflow.add_node("finalize", finalize_node)
-        
-        # Add edges
-        workflow.set_entry_point("parse")
-        
-        # Parse → Classify (with error check)
-        workflow.add_conditional_edges(
-            "parse",
-            should_continue,
-            {
-                "continue": "classify",
-                "error": "finalize"
-            }
-        )
-        
-        # Classify → Extract (with error check)
-        workflow.add_conditional_edges(
-            "classify",
-            should_continue,
-            {
-                "continue": "extract",
-                "error": "finalize"
-            }
-        )
-        
-        # Extract → Enhance (with error check)
-        workflow.add_conditional_edges(
-            "extract",
-            should_continue,
-            {
-                "continue": "enhance",
-                "error": "finalize"
-            }
-        )
-        
-        # Enhance → Risk (always continue)
-        workflow.add_edge("enhance", "risk")
-        
-        # Risk → Finalize
-        workflow.add_edge("risk", "finalize")
-        
-        # Finalize → END
-        workflow.add_edge("finalize", END)
-        
-        return workflow
+        # Shared compiled graph (built on first use)
+        self.app = get_compiled_graph()
+        self.graph = _extraction_graph
     
-    def extract_from_file(
+    def _file_state(
         self,
         file_path: str,
-        use_ocr: bool = False,
-        extraction_id: Optional[str] = None
-    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
-        """
-        Extract data from a file.
-        
-        Args:
-            file_path: Path to the document file
-            use_ocr: Whether to use OCR for scanned PDFs
-            extraction_id: Optional extraction ID for status tracking
-            
-        Returns:
-            Tuple of (extracted_data, metadata)
-        """
+        use_ocr: bool,
+        extraction_id: Optional[str],
+        document_text: Optional[str],
+        page_map: Optional[Dict[int, str]]
+    ) -> ExtractionState:
+        """Initial graph state for extract_from_file / aextract_from_file."""
         print("\n" + "=" * 60)
         print("[LANGGRAPH AGENT] Starting extraction workflow")
         print("=" * 60)
         print(f"  File: {Path(file_path).name}")
         
-        # Initialize state
-        initial_state: ExtractionState = {
+        return {
             "file_path": file_path,
-            "document_text": None,
-            "page_map": {},
+            "document_text": document_text or None,
+            "page_map": page_map or {},
             "use_ocr": use_ocr,
             "use_gcs_vision": self.use_gcs_vision,
             "extraction_id": extraction_id,
+            "single_pass": self.single_pass,
             "document_type": None,
             "classification_confidence": None,
             "classification_reasoning": None,
@@ -2477,58 +2716,20 @@ class ExtractionAgent:
             "status": "pending",
             "messages": []
         }
-        
-        # Run the graph
-        final_state = self.app.invoke(initial_state)
-        
-        # Extract results
-        extracted_data = final_state.get("extracted_data", {})
-        
-        metadata = {
-            "document_type": final_state.get("document_type", "CONTRACT"),
-            "classification_confidence": final_state.get("classification_confidence", "UNKNOWN"),
-            "classification_reasoning": final_state.get("classification_reasoning", ""),
-            "file_path": file_path,
-            "file_name": Path(file_path).name,
-            "extraction_method": "langgraph_agent",
-            "document_text": final_state.get("document_text", ""),  # Store for chatbot reuse
-            "page_map": final_state.get("page_map", {}),
-            "status": final_state.get("status", "unknown"),
-            "error": final_state.get("error")
-        }
-        
-        print("\n" + "=" * 60)
-        print(f"[LANGGRAPH AGENT] Extraction completed: {final_state.get('status', 'unknown')}")
-        print("=" * 60 + "\n")
-        
-        return extracted_data, metadata
     
-    def extract_from_text(
-        self,
-        document_text: str,
-        page_map: Optional[Dict[int, str]] = None
-    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
-        """
-        Extract data from raw text.
-        
-        Args:
-            document_text: Raw text from document
-            page_map: Optional page mapping
-            
-        Returns:
-            Tuple of (extracted_data, metadata)
-        """
+    def _text_state(self, document_text: str, page_map: Optional[Dict[int, str]]) -> ExtractionState:
+        """Initial graph state for extract_from_text / aextract_from_text."""
         print("\n" + "=" * 60)
         print("[LANGGRAPH AGENT] Starting extraction workflow (from text)")
         print("=" * 60)
         
-        # Initialize state
-        initial_state: ExtractionState = {
+        return {
             "file_path": None,
             "document_text": document_text,
             "page_map": page_map or {},
             "use_ocr": False,
             "use_gcs_vision": self.use_gcs_vision,
+            "single_pass": self.single_pass,
             "document_type": None,
             "classification_confidence": None,
             "classification_reasoning": None,
@@ -2537,29 +2738,97 @@ class ExtractionAgent:
             "status": "pending",
             "messages": []
         }
-        
-        # Run the graph
-        final_state = self.app.invoke(initial_state)
-        
-        # Extract results
+    
+    @staticmethod
+    def _results(final_state: ExtractionState, file_path: Optional[str] = None) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """(extracted_data, metadata) from the final graph state."""
         extracted_data = final_state.get("extracted_data", {})
         
         metadata = {
             "document_type": final_state.get("document_type", "CONTRACT"),
             "classification_confidence": final_state.get("classification_confidence", "UNKNOWN"),
             "classification_reasoning": final_state.get("classification_reasoning", ""),
+        }
+        if file_path:
+            metadata["file_path"] = file_path
+            metadata["file_name"] = Path(file_path).name
+        metadata.update({
             "extraction_method": "langgraph_agent",
             "document_text": final_state.get("document_text", ""),  # Store for chatbot reuse
             "page_map": final_state.get("page_map", {}),
             "status": final_state.get("status", "unknown"),
             "error": final_state.get("error")
-        }
+        })
         
         print("\n" + "=" * 60)
         print(f"[LANGGRAPH AGENT] Extraction completed: {final_state.get('status', 'unknown')}")
         print("=" * 60 + "\n")
         
         return extracted_data, metadata
+    
+    def extract_from_file(
+        self,
+        file_path: str,
+        use_ocr: bool = False,
+        extraction_id: Optional[str] = None,
+        document_text: Optional[str] = None,
+        page_map: Optional[Dict[int, str]] = None
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Extract data from a file.
+        
+        Args:
+            file_path: Path to the document file
+            use_ocr: Whether to use OCR for scanned PDFs
+            extraction_id: Optional extraction ID for status tracking
+            document_text: Text already parsed from the file (skips the parse step)
+            page_map: Page mapping of document_text
+            
+        Returns:
+            Tuple of (extracted_data, metadata)
+        """
+        initial_state = self._file_state(file_path, use_ocr, extraction_id, document_text, page_map)
+        return self._results(self.app.invoke(initial_state), file_path)
+    
+    async def aextract_from_file(
+        self,
+        file_path: str,
+        use_ocr: bool = False,
+        extraction_id: Optional[str] = None,
+        document_text: Optional[str] = None,
+        page_map: Optional[Dict[int, str]] = None
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Async extract_from_file: runs the graph with ainvoke, so LLM calls are awaited on the
+        event loop instead of holding a thread each (document parsing still uses a worker thread).
+        """
+        initial_state = self._file_state(file_path, use_ocr, extraction_id, document_text, page_map)
+        return self._results(await self.app.ainvoke(initial_state), file_path)
+    
+    def extract_from_text(
+        self,
+        document_text: str,
+        page_map: Optional[Dict[int, str]] = None
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Extract data from raw text.
+        
+        Args:
+            document_text: Raw text from document
+            page_map: Optional page mapping
+            
+        Returns:
+            Tuple of (extracted_data, metadata)
+        """
+        return self._results(self.app.invoke(self._text_state(document_text, page_map)))
+    
+    async def aextract_from_text(
+        self,
+        document_text: str,
+        page_map: Optional[Dict[int, str]] = None
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """Async extract_from_text (graph run with ainvoke)."""
+        return self._results(await self.app.ainvoke(self._text_state(document_text, page_map)))
 
 
 # ============== Backwards Compatibility ==============
@@ -2567,6 +2836,45 @@ class ExtractionAgent:
 # Alias for backwards compatibility with existing code
 ExtractionOrchestrator = ExtractionAgent
 
+# Agent instances by (api_key, use_gcs_vision); all of them share the compiled graph
+_agent_instances: Dict[tuple, ExtractionAgent] = {}
+_agent_lock = threading.Lock()
+
+
+def get_orchestrator(
+    api_key: Optional[str] = None,
+    use_gcs_vision: bool = True,
+    service_account_file: Optional[str] = None,
+    use_semantic_search: bool = True
+) -> ExtractionAgent:
+    """
+    Get or create a shared ExtractionAgent (same interface as
+    extraction_orchestrator.get_orchestrator), so requests don't build a new agent.
+    
+    Args:
+        api_key: OpenAI API key (optional, will use env var if not provided)
+        use_gcs_vision: Enable Google Cloud Vision API for scanned PDFs
+        service_account_file: Path to GCP service account JSON
+        use_semantic_search: Kept for backwards compatibility
+        
+    Returns:
+        ExtractionAgent instance
+    """
+    key = (api_key or os.getenv('OPENAI_API_KEY') or "", bool(use_gcs_vision))
+    agent = _agent_instances.get(key)
+    if agent is None:
+        with _agent_lock:
+            agent = _agent_instances.get(key)
+            if agent is None:
+                agent = ExtractionAgent(
+                    api_key=api_key,
+                    use_gcs_vision=use_gcs_vision,
+                    service_account_file=service_account_file,
+                    use_semantic_search=use_semantic_search
+                )
+                _agent_instances[key] = agent
+    return agent
+
 
 if __name__ == "__main__":
     # Test the agent
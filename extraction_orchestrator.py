@@ -5,6 +5,7 @@ Works seamlessly with vision_gcp.py for OCR processing.
 """
 
 import os
+import asyncio
 from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
@@ -248,6 +249,27 @@ class ExtractionOrchestrator:
         
         return extracted_data, metadata
     
+    async def aextract_from_file(
+        self,
+        file_path: str,
+        use_ocr: bool = False,
+        **_agent_kwargs
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Async interface of ExtractionAgent.aextract_from_file: runs extract_from_file on a
+        worker thread (this orchestrator's clients are synchronous). Agent-only arguments
+        (extraction_id, document_text, page_map) are ignored.
+        """
+        return await asyncio.to_thread(self.extract_from_file, file_path, use_ocr)
+    
+    async def aextract_from_text(
+        self,
+        document_text: str,
+        page_map: Optional[Dict[int, str]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Async interface of ExtractionAgent.aextract_from_text (worker thread)."""
+        return await asyncio.to_thread(self.extract_from_text, document_text, page_map)
+    
     def _classify_document(self, document_text: str) -> Dict[str, Any]:
         """Classify the document type."""
         if classify_document_type:
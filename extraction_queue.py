@@ -0,0 +1,213 @@
+"""
+Bounded job queue for extraction work (LLM, OCR, DOCX conversion).
+
+/api/extract and the documents-repo sync submit their pipeline as a job instead of running
+it inline, so a burst of uploads cannot start unbounded concurrent extractions:
+- EXTRACTION_WORKERS jobs run at a time (default 4); the rest wait in a priority queue.
+- At most EXTRACTION_QUEUE_SIZE jobs wait (default 32). submit() raises QueueFullError
+  beyond that and the API answers 429.
+- Lower priority values run first: interactive uploads (PRIORITY_INTERACTIVE) ahead of
+  batch items (PRIORITY_BATCH) ahead of folder sync (PRIORITY_BACKGROUND); equal priorities
+  run in submission order.
+- cancel() drops a waiting job or cancels a running one.
+
+Waiting and cancelled jobs are reported through extraction_status_manager (current_step
+"queued" with the queue position, or "cancelled"); running jobs report their own progress.
+Workers are asyncio tasks on the server's event loop, started with the first job.
+"""
+
+import asyncio
+import itertools
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import extraction_status_manager
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 5
+PRIORITY_BACKGROUND = 10
+
+
+class QueueFullError(Exception):
+    """The extraction queue is at capacity; retry later."""
+
+
+class ExtractionJob:
+    """One queued or running unit of work; future resolves to run()'s result."""
+
+    def __init__(self, job_id: str, run: Callable[[], Awaitable[Any]], priority: int, seq: int,
+                 track_status: bool):
+        self.job_id = job_id
+        self.run = run
+        self.priority = priority
+        self.seq = seq
+        self.track_status = track_status
+        self.state = "queued"  # queued | running | done | cancelled
+        self.cancel_requested = False
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.task: Optional[asyncio.Task] = None
+
+    def __lt__(self, other: "ExtractionJob") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ExtractionQueue:
+    """Priority queue of extraction jobs with a fixed pool of asyncio workers."""
+
+    def __init__(self, workers: Optional[int] = None, max_queued: Optional[int] = None):
+        self.workers = max(1, workers or int(os.environ.get("EXTRACTION_WORKERS", "4")))
+        self.max_queued = max(0, max_queued if max_queued is not None
+                              else int(os.environ.get("EXTRACTION_QUEUE_SIZE", "32")))
+        self._seq = itertools.count()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._worker_tasks = []
+        # job_id -> job, waiting and running
+        self._queued: Dict[str, ExtractionJob] = {}
+        self._running: Dict[str, ExtractionJob] = {}
+
+    def stats(self) -> Dict[str, int]:
+        """Current load: queued and running jobs, worker count and queue capacity."""
+        return {
+            "queued": len(self._queued),
+            "running": len(self._running),
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+        }
+
+    def get(self, job_id: str) -> Optional[ExtractionJob]:
+        """Waiting or running job with this id, or None."""
+        return self._queued.get(job_id) or self._running.get(job_id)
+
+    def submit(self, job_id: str, run: Callable[[], Awaitable[Any]],
+               priority: int = PRIORITY_INTERACTIVE, track_status: bool = True) -> ExtractionJob:
+        """
+        Queue a job, or return the job already queued / running under the same id.
+
+        Args:
+            job_id: Job id (the extraction id for extraction jobs)
+            run: Coroutine function doing the work
+            priority: Lower runs first (PRIORITY_INTERACTIVE, PRIORITY_BATCH, PRIORITY_BACKGROUND)
+            track_status: Report queue position / cancellation under job_id in
+                extraction_status_manager
+
+        Returns:
+            The job; await job.future for the result
+
+        Raises:
+            QueueFullError: EXTRACTION_QUEUE_SIZE jobs are already waiting
+        """
+        existing = self.get(job_id)
+        if existing is not None:
+            return existing
+        # Idle workers take jobs right away, so they add to the waiting capacity
+        if len(self._queued) >= self.max_queued + max(0, self.workers - len(self._running)):
+            raise QueueFullError(
+                f"Extraction queue is full ({len(self._queued)} waiting, {len(self._running)} running)"
+            )
+        self._start_workers()
+        job = ExtractionJob(job_id, run, priority, next(self._seq), track_status)
+        self._queued[job_id] = job
+        self._queue.put_nowait(job)
+        self._publish_positions()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a waiting or running job. Its future is cancelled.
+
+        Returns:
+            False if no such job is waiting or running
+        """
+        job = self._queued.pop(job_id, None)
+        if job is not None:
+            # Left in the heap; the worker that pops it skips it
+            self._finish_cancelled(job)
+            self._publish_positions()
+            return True
+        job = self._running.get(job_id)
+        if job is not None and job.task is not None:
+            job.cancel_requested = True
+            job.task.cancel()
+            return True
+        return False
+
+    def _start_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        if not self._worker_tasks:
+            print(f"[QUEUE] Starting {self.workers} extraction worker(s), queue capacity {self.max_queued}")
+            self._worker_tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if self._queued.get(job.job_id) is not job:
+                continue  # cancelled while waiting
+            del self._queued[job.job_id]
+            self._running[job.job_id] = job
+            job.state = "running"
+            if job.track_status:
+                extraction_status_manager.update_status(job.job_id, {
+                    "current_step": "starting",
+                    "step_description": "Starting extraction...",
+                    "progress_percent": 10,
+                    "skip_progress": False,
+                    "is_complete": False,
+                })
+            self._publish_positions()
+            job.task = asyncio.ensure_future(job.run())
+            try:
+                result = await job.task
+                job.state = "done"
+                if not job.future.done():
+                    job.future.set_result(result)
+            except asyncio.CancelledError:
+                self._finish_cancelled(job)
+                if not job.cancel_requested:
+                    raise  # the worker itself is being cancelled (shutdown)
+            except Exception as e:
+                job.state = "done"
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self._running.pop(job.job_id, None)
+
+    def _finish_cancelled(self, job: ExtractionJob):
+        job.state = "cancelled"
+        if not job.future.done():
+            job.future.cancel()
+        if job.track_status:
+            extraction_status_manager.update_status(job.job_id, {
+                "current_step": "cancelled",
+                "step_description": "Extraction cancelled",
+                "progress_percent": 100,
+                "skip_progress": True,
+                "is_complete": True,
+                "is_cancelled": True,
+            })
+        print(f"[QUEUE] Cancelled job {job.job_id}")
+
+    def _publish_positions(self):
+        """Report each waiting job's position (1 = next to start)."""
+        for position, job in enumerate(sorted(self._queued.values()), start=1):
+            if job.track_status:
+                extraction_status_manager.update_status(job.job_id, {
+                    "current_step": "queued",
+                    "step_description": f"Waiting for an extraction slot (position {position} in queue)",
+                    "progress_percent": 5,
+                    "skip_progress": False,
+                    "is_complete": False,
+                    "queue_position": position,
+                })
+
+
+_extraction_queue: Optional[ExtractionQueue] = None
+
+
+def get_extraction_queue() -> ExtractionQueue:
+    """Get or create the process-wide extraction queue."""
+    global _extraction_queue
+    if _extraction_queue is None:
+        _extraction_queue = ExtractionQueue()
+    return _extraction_queue
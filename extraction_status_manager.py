@@ -1,10 +1,32 @@
 """
 Shared extraction status manager module.
 This module is imported by both app.py and extraction_agent.py to share extraction status.
+
+Every status write (update_status or extraction_status[id] = ...) is also pushed to the
+subscribers of that extraction (subscribe()), which feed the progress event stream
+(/api/extraction-status/{id}/stream). Writes may come from worker threads; each subscriber
+receives them on its own event loop.
 """
 
+import asyncio
+import threading
+from typing import Dict, List, Tuple
+
+
+class StatusDict(dict):
+    """Dict of extraction_id -> status that notifies subscribers on every assignment."""
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        _notify(key, value)
+
+
 # Global extraction status dictionary
-extraction_status = {}
+extraction_status = StatusDict()
+
+# extraction_id -> (event loop, queue) of each subscriber
+_subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+_subscribers_lock = threading.Lock()
 
 def update_status(extraction_id: str, status_data: dict):
     """Update extraction status for a given extraction_id"""
@@ -22,3 +44,33 @@ def remove_status(extraction_id: str):
 def clear_all():
     """Clear all extraction statuses"""
     extraction_status.clear()
+
+def subscribe(extraction_id: str) -> asyncio.Queue:
+    """
+    Receive every status update of an extraction (call from the event loop).
+
+    Returns:
+        Queue of status dicts (copies); pass it to unsubscribe() when done
+    """
+    queue = asyncio.Queue()
+    with _subscribers_lock:
+        _subscribers.setdefault(extraction_id, []).append((asyncio.get_running_loop(), queue))
+    return queue
+
+def unsubscribe(extraction_id: str, queue: asyncio.Queue):
+    """Stop delivering updates to a queue returned by subscribe()"""
+    with _subscribers_lock:
+        remaining = [sub for sub in _subscribers.get(extraction_id, []) if sub[1] is not queue]
+        if remaining:
+            _subscribers[extraction_id] = remaining
+        else:
+            _subscribers.pop(extraction_id, None)
+
+def _notify(extraction_id: str, status_data: dict):
+    with _subscribers_lock:
+        subscribers = list(_subscribers.get(extraction_id, ()))
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, dict(status_data or {}))
+        except RuntimeError:
+            pass  # subscriber's loop is closed
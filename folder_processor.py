@@ -31,16 +31,18 @@ def scan_and_process_documents(
     process_grn: bool = True,
     extractions_store_ref: Optional[Dict[str, Any]] = None,
     extraction_status_ref: Optional[Dict[str, Any]] = None,
-    save_extractions_cb: Optional[Callable[[], None]] = None,
+    save_extractions_cb: Optional[Callable[..., None]] = None,
 ) -> Dict[str, Any]:
     """
     Scan documents_repo/PO, Invoice, GRN and process any new files.
-    If extractions_store_ref/save_extractions_cb are provided, invoice processing will update store and save.
-    Returns summary: { processed: int, po: n, invoice: n, grn: n, errors: [] }.
+    If extractions_store_ref/save_extractions_cb are provided, invoice processing will update store and save
+    (save_extractions_cb is called with the new extraction_id).
+    Returns summary: { processed: int, po: n, invoice: n, grn: n, errors: [], references: [] }.
+    references lists {kind, po_number, vendor} of each new PO / GRN (re-match triggers for parked invoices).
     """
     from cache_manager import get_cache_manager
 
-    result = {"processed": 0, "po": 0, "invoice": 0, "grn": 0, "errors": []}
+    result = {"processed": 0, "po": 0, "invoice": 0, "grn": 0, "errors": [], "references": []}
     store = extractions_store_ref if extractions_store_ref is not None else {}
     po_dir, invoice_dir, grn_dir = _get_repo_paths()
     cache_manager = get_cache_manager()
@@ -68,8 +70,9 @@ def scan_and_process_documents(
                 if file_hash in existing_po_hashes:
                     continue
                 # Process this PO
-                ok = _process_po_file(str(file_path), content, file_path.name, file_hash, cache_manager)
-                if ok:
+                extracted_data = _process_po_file(str(file_path), content, file_path.name, file_hash, cache_manager)
+                if extracted_data is not None:
+                    result["references"].append(reference_document("po", extracted_data))
                     result["po"] += 1
                     result["processed"] += 1
                     existing_po_hashes.add(file_hash)
@@ -87,8 +90,9 @@ def scan_and_process_documents(
                 file_hash = cache_manager.compute_content_hash(content)
                 if file_hash in existing_grn_hashes:
                     continue
-                ok = _process_grn_file(str(file_path), content, file_path.name, file_hash, cache_manager)
-                if ok:
+                extracted_data = _process_grn_file(str(file_path), content, file_path.name, file_hash, cache_manager)
+                if extracted_data is not None:
+                    result["references"].append(reference_document("grn", extracted_data))
                     result["grn"] += 1
                     result["processed"] += 1
                     existing_grn_hashes.add(file_hash)
@@ -120,14 +124,25 @@ def scan_and_process_documents(
     return result
 
 
+def reference_document(kind: str, extracted_data: Dict[str, Any]) -> Dict[str, str]:
+    """Re-match trigger for a saved PO / GRN: {kind, po_number, vendor} (vendor used for POs)."""
+    doc_ids = extracted_data.get("document_ids") or {}
+    party_names = extracted_data.get("party_names") or {}
+    return {
+        "kind": kind,
+        "po_number": doc_ids.get("po_number", "") or doc_ids.get("order_number", "") or "",
+        "vendor": party_names.get("vendor", "") or party_names.get("party_1", "") or "",
+    }
+
+
 def _process_po_file(
     file_path: str, content: bytes, filename: str, file_hash: str, cache_manager
-) -> bool:
-    """Extract PO and save to index. Returns True on success."""
+) -> Optional[Dict[str, Any]]:
+    """Extract PO and save to index. Returns the extracted data on success, else None."""
     from po_extractor import get_po_extractor
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        return False
+        return None
     with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp:
         tmp.write(content)
         tmp_path = tmp.name
@@ -137,7 +152,7 @@ def _process_po_file(
         document_text = (metadata or {}).get("document_text", "")
         cache_manager.save_po_cache(file_hash, extracted_data, metadata or {}, document_text, filename)
         cache_manager.save_all_purchase_orders_json(cache_manager.get_all_pos_full())
-        return True
+        return extracted_data or {}
     finally:
         try:
             os.unlink(tmp_path)
@@ -147,12 +162,12 @@ def _process_po_file(
 
 def _process_grn_file(
     file_path: str, content: bytes, filename: str, file_hash: str, cache_manager
-) -> bool:
-    """Extract GRN (PO-like schema) and save to GRN index. Returns True on success."""
+) -> Optional[Dict[str, Any]]:
+    """Extract GRN (PO-like schema) and save to GRN index. Returns the extracted data on success, else None."""
     from grn_extractor import extract_grn_from_file
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        return False
+        return None
     with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp:
         tmp.write(content)
         tmp_path = tmp.name
@@ -161,7 +176,7 @@ def _process_grn_file(
         document_text = (metadata or {}).get("document_text", "")
         cache_manager.save_grn(file_hash, extracted_data, metadata or {}, document_text, filename)
         cache_manager.save_all_grns_json(cache_manager.get_all_grns_full())
-        return True
+        return extracted_data or {}
     finally:
         try:
             os.unlink(tmp_path)
@@ -177,10 +192,10 @@ def _process_invoice_file(
     cache_manager,
     extractions_store_ref: Dict[str, Any],
     extraction_status_ref: Optional[Dict[str, Any]] = None,
-    save_extractions_cb: Optional[Callable[[], None]] = None,
+    save_extractions_cb: Optional[Callable[..., None]] = None,
 ) -> bool:
     """Extract invoice and add to extractions_store. Returns True on success."""
-    from extraction_agent import ExtractionAgent
+    from extraction_agent import get_orchestrator
     from datetime import datetime
 
     api_key = os.getenv("OPENAI_API_KEY")
@@ -190,7 +205,7 @@ def _process_invoice_file(
         tmp.write(content)
         tmp_path = tmp.name
     try:
-        agent = ExtractionAgent(api_key=api_key)
+        agent = get_orchestrator(api_key=api_key)
         extraction_id = str(uuid.uuid4())
         if extraction_status_ref is not None:
             extraction_status_ref[extraction_id] = {
@@ -204,7 +219,7 @@ def _process_invoice_file(
         status = "completed"
         try:
             from po_matcher import match_invoice
-            matched, _po, _msg = match_invoice(extracted_data)
+            matched, _po, _msg, _notifications = match_invoice(extracted_data)
             if not matched:
                 status = "po_not_found"
         except Exception:
@@ -222,7 +237,7 @@ def _process_invoice_file(
             "from_folder": True,
         }
         if save_extractions_cb:
-            save_extractions_cb()
+            save_extractions_cb(extraction_id)
         return True
     finally:
         try:
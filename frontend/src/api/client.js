@@ -61,6 +61,47 @@ export async function getExtractionStatus(extractionId) {
   return handleResponse(res)
 }
 
+// Progress pushed by the server (SSE). If the stream fails (unknown id, proxy buffering,
+// server restart) it falls back to polling getExtractionStatus until is_complete.
+// Returns a handle; call close() to stop either mode.
+export function subscribeExtractionStatus(extractionId, onStatus, pollIntervalMs = 500) {
+  let closed = false
+  let timer = null
+  const source = new EventSource(`${API_BASE}/api/extraction-status/${extractionId}/stream`)
+
+  const poll = async () => {
+    if (closed) return
+    try {
+      const statusData = await getExtractionStatus(extractionId)
+      if (closed) return
+      onStatus(statusData)
+      if (statusData.is_complete) {
+        closed = true
+        return
+      }
+    } catch (e) {
+      console.error(e)
+    }
+    if (!closed) timer = setTimeout(poll, pollIntervalMs)
+  }
+
+  source.addEventListener('status', (e) => onStatus(JSON.parse(e.data)))
+  source.addEventListener('end', () => source.close())
+  source.addEventListener('error', () => {
+    // Stop EventSource's own reconnect loop and poll instead
+    source.close()
+    if (!closed && timer === null) poll()
+  })
+
+  return {
+    close() {
+      closed = true
+      source.close()
+      if (timer !== null) clearTimeout(timer)
+    }
+  }
+}
+
 export async function getExtraction(extractionId) {
   const res = await fetch(`${API_BASE}/api/extraction/${extractionId}`)
   return handleResponse(res)
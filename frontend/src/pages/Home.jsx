@@ -5,7 +5,7 @@ import FileManagerModal from '../components/FileManagerModal'
 import {
   uploadFile,
   extract,
-  getExtractionStatus,
+  subscribeExtractionStatus,
   getExtraction,
   getExtractionsList,
   getDashboard
@@ -40,7 +40,7 @@ export default function Home() {
   const [poNotFoundDetails, setPoNotFoundDetails] = useState(null)
   const [poNotFoundNotifications, setPoNotFoundNotifications] = useState([])
   const [duplicateInvoiceDetails, setDuplicateInvoiceDetails] = useState(null)
-  const pollRef = useRef(null)
+  const progressRef = useRef(null)
   const fileInputRef = useRef(null)
 
   const showStatus = useCallback((msg, type = 'info') => {
@@ -104,38 +104,41 @@ export default function Home() {
     setCurrentExtractionId(selectedId || null)
   }, [selectedId, loadExtraction, setCurrentExtractionId])
 
-  const startPolling = useCallback((extractionId) => {
+  // Close the progress stream (or its polling fallback) when leaving the page
+  useEffect(() => () => {
+    if (progressRef.current) {
+      progressRef.current.close()
+      progressRef.current = null
+    }
+  }, [])
+
+  const startProgressStream = useCallback((extractionId) => {
     let progressShown = false
-    const interval = setInterval(async () => {
-      try {
-        const statusData = await getExtractionStatus(extractionId)
-        if (statusData.status === 'not_found') return
-        if (statusData.skip_progress) {
-          clearInterval(interval)
-          pollRef.current = null
-          if (statusData.from_cache) showStatus('Data retrieved from cache', 'success')
-          return
-        }
-        if (!progressShown) {
-          setShowProgress(true)
-          progressShown = true
-        }
-        const step = STEP_MAP[statusData.current_step] || {
-          text: statusData.step_description || 'Processing...',
-          percent: statusData.progress_percent || 0
-        }
-        setProgress({ text: step.text, percent: step.percent })
-        if (statusData.is_complete) {
-          clearInterval(interval)
-          pollRef.current = null
-          setTimeout(() => setShowProgress(false), 2000)
-        }
-      } catch (e) {
-        console.error(e)
+    const stream = subscribeExtractionStatus(extractionId, (statusData) => {
+      if (statusData.status === 'not_found') return
+      if (statusData.skip_progress) {
+        stream.close()
+        progressRef.current = null
+        if (statusData.from_cache) showStatus('Data retrieved from cache', 'success')
+        return
+      }
+      if (!progressShown) {
+        setShowProgress(true)
+        progressShown = true
+      }
+      const step = STEP_MAP[statusData.current_step] || {
+        text: statusData.step_description || 'Processing...',
+        percent: statusData.progress_percent || 0
+      }
+      setProgress({ text: step.text, percent: step.percent })
+      if (statusData.is_complete) {
+        stream.close()
+        progressRef.current = null
+        setTimeout(() => setShowProgress(false), 2000)
       }
-    }, 500)
-    pollRef.current = interval
-    return interval
+    })
+    progressRef.current = stream
+    return stream
   }, [showStatus])
 
   const handleExtract = async () => {
@@ -149,12 +152,12 @@ export default function Home() {
       const uploadData = await uploadFile(file)
       const extractionId = uploadData.extraction_id
       if (!extractionId) throw new Error('No extraction ID')
-      startPolling(extractionId)
+      startProgressStream(extractionId)
       setStatusMsg('Extracting...')
       const extractData = await extract(extractionId)
-      if (pollRef.current) {
-        clearInterval(pollRef.current)
-        pollRef.current = null
+      if (progressRef.current) {
+        progressRef.current.close()
+        progressRef.current = null
       }
       setShowProgress(false)
       if (extractData.status === 'duplicate_invoice' && extractData.warning) {
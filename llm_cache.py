@@ -0,0 +1,264 @@
+"""
+On-disk cache of LLM responses keyed by prompt fingerprint.
+
+The classify / extract / account-head / PO-extraction prompts are fixed functions of the
+document text at temperature 0.1, so re-processing the same text (retries, re-matches,
+folder re-scans) would pay for the same completion again. Responses are stored as
+llm_cache/<sha256>.json, where the hash covers the model, temperature, request options
+(response_format, model_kwargs and other bound parameters, ...) and every message (role and content). Any prompt edit therefore
+changes the key; stale entries simply age out.
+
+- LLM_CACHE=0 disables the cache.
+- LLM_CACHE_MAX_MB caps the directory size (default 256); least recently used entries are
+  evicted first (a hit refreshes the entry).
+- get_llm_cache().stats() reports hits, misses, saves, evictions and size.
+
+Wrap LLM calls with cached_invoke / cached_ainvoke (LangChain chat models) or
+cached_chat_completion (OpenAI client). Only non-empty text responses are stored; errors
+propagate uncached.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from langchain_core.messages import AIMessage
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_AVAILABLE = False
+
+
+def _message_parts(message: Any) -> List[str]:
+    """(role, content) of a LangChain message, OpenAI message dict or (role, content) tuple."""
+    if isinstance(message, dict):
+        return [str(message.get("role", "")), json.dumps(message.get("content"), sort_keys=True, default=str)]
+    if isinstance(message, (tuple, list)) and len(message) == 2:
+        return [str(message[0]), json.dumps(message[1], sort_keys=True, default=str)]
+    return [str(getattr(message, "type", type(message).__name__)),
+            json.dumps(getattr(message, "content", str(message)), sort_keys=True, default=str)]
+
+
+def prompt_fingerprint(model: str, temperature: Optional[float], messages: List[Any],
+                       options: Optional[Dict[str, Any]] = None) -> str:
+    """SHA256 over (model, temperature, options, messages): the LLM cache key."""
+    payload = {
+        "model": model or "",
+        "temperature": temperature,
+        "options": options or {},
+        "messages": [_message_parts(message) for message in messages],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Size-bounded LRU directory of prompt fingerprint -> response text."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.enabled = os.environ.get("LLM_CACHE", "1").strip() != "0"
+        self.cache_dir = Path(cache_dir or os.environ.get("LLM_CACHE_DIR") or Path(__file__).parent / "llm_cache")
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            float(os.environ.get("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024)
+        self._lock = threading.Lock()
+        # file name -> size, least recently used first (loaded from the directory on first use)
+        self._entries: Optional["OrderedDict[str, int]"] = None
+        self._stats = {"hits": 0, "misses": 0, "saves": 0, "evictions": 0, "errors": 0}
+
+    def _load_entries(self):
+        """Index existing cache files by mtime (caller holds _lock)."""
+        if self._entries is not None:
+            return
+        found = []
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, path.name, stat.st_size))
+        self._entries = OrderedDict((name, size) for _mtime, name, size in sorted(found))
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response text for a prompt fingerprint, or None."""
+        if not self.enabled:
+            return None
+        name = f"{key}.json"
+        path = self.cache_dir / name
+        with self._lock:
+            self._load_entries()
+            if name not in self._entries:
+                self._stats["misses"] += 1
+                return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = json.load(f)["content"]
+            os.utime(path)
+        except Exception:
+            with self._lock:
+                self._entries.pop(name, None)
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+            self._stats["hits"] += 1
+        return content
+
+    def put(self, key: str, content: Any, model: str = ""):
+        """Store a response text, then evict least recently used entries beyond max_bytes."""
+        if not self.enabled or not isinstance(content, str) or not content.strip():
+            return
+        name = f"{key}.json"
+        payload = json.dumps({"model": model, "cached_at": datetime.now().isoformat(),
+                              "content": content}).encode("utf-8")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_dir / f"{name}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.cache_dir / name)
+        except OSError as e:
+            print(f"[LLM-CACHE] Could not write {name}: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            return
+        with self._lock:
+            self._load_entries()
+            self._entries[name] = len(payload)
+            self._entries.move_to_end(name)
+            self._stats["saves"] += 1
+            total = sum(self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                old_name, size = self._entries.popitem(last=False)
+                total -= size
+                try:
+                    (self.cache_dir / old_name).unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"[LLM-CACHE] Could not evict {old_name}: {e}")
+                self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, entry count and size of the cache."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries) if self._entries is not None else None,
+                "bytes": sum(self._entries.values()) if self._entries is not None else None,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else None,
+                **self._stats,
+            }
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get or create the process-wide LLM response cache."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache()
+    return _llm_cache
+
+
+# Request parameters of a LangChain chat model that change its output (besides model/temperature)
+_CHAT_MODEL_PARAMS = ("max_tokens", "top_p", "seed", "frequency_penalty", "presence_penalty", "n", "stop",
+                      "reasoning_effort")
+
+
+def _chat_model_request(llm: Any) -> Tuple[str, Optional[float], Dict[str, Any]]:
+    """
+    (model, temperature, options) a LangChain chat model sends: its sampling parameters,
+    model_kwargs (e.g. response_format) and, for llm.bind(...) wrappers, the bound kwargs.
+    """
+    bound = getattr(llm, "bound", None)
+    bound_kwargs = getattr(llm, "kwargs", None)
+    if bound is not None and isinstance(bound_kwargs, dict):
+        model, temperature, options = _chat_model_request(bound)
+        return model, temperature, {**options, **bound_kwargs}
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", "") or ""
+    options = {name: getattr(llm, name) for name in _CHAT_MODEL_PARAMS
+               if getattr(llm, name, None) is not None}
+    model_kwargs = getattr(llm, "model_kwargs", None)
+    if isinstance(model_kwargs, dict):
+        options.update(model_kwargs)
+    return str(model), getattr(llm, "temperature", None), options
+
+
+def _chat_model_key(llm: Any, messages: List[Any]) -> str:
+    model, temperature, options = _chat_model_request(llm)
+    return prompt_fingerprint(model, temperature, messages, options)
+
+
+def _cached_message(content: str) -> Any:
+    return AIMessage(content=content) if LANGCHAIN_AVAILABLE else type("CachedMessage", (), {"content": content})()
+
+
+def cached_invoke(llm: Any, messages: List[Any]) -> Any:
+    """
+    llm.invoke(messages) through the LLM cache (LangChain chat model).
+
+    Returns:
+        The model's response, or an AIMessage with the cached content
+    """
+    cache = get_llm_cache()
+    key = _chat_model_key(llm, messages)
+    content = cache.get(key)
+    if content is not None:
+        return _cached_message(content)
+    response = llm.invoke(messages)
+    cache.put(key, getattr(response, "content", None), model=getattr(llm, "model_name", "") or "")
+    return response
+
+
+async def cached_ainvoke(llm: Any, messages: List[Any]) -> Any:
+    """Async cached_invoke (awaits llm.ainvoke on a miss)."""
+    cache = get_llm_cache()
+    key = _chat_model_key(llm, messages)
+    content = cache.get(key)
+    if content is not None:
+        return _cached_message(content)
+    response = await llm.ainvoke(messages)
+    cache.put(key, getattr(response, "content", None), model=getattr(llm, "model_name", "") or "")
+    return response
+
+
+def cached_chat_completion(client: Any, model: str, messages: List[Dict[str, Any]],
+                           temperature: Optional[float] = None, **options) -> str:
+    """
+    client.chat.completions.create(...) through the LLM cache (OpenAI client).
+
+    Args:
+        client: openai.OpenAI instance
+        model, messages, temperature, **options: Passed to chat.completions.create
+
+    Returns:
+        Text of the first choice
+    """
+    cache = get_llm_cache()
+    key = prompt_fingerprint(model, temperature, messages, options)
+    content = cache.get(key)
+    if content is not None:
+        return content
+    request = dict(options, model=model, messages=messages)
+    if temperature is not None:
+        request["temperature"] = temperature
+    content = client.chat.completions.create(**request).choices[0].message.content
+    if (options.get("response_format") or {}).get("type") == "json_object":
+        try:
+            json.loads(content or "")
+        except ValueError:
+            return content  # let the caller report it; a retry should ask the model again
+    cache.put(key, content, model=model)
+    return content
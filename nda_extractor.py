@@ -7,6 +7,8 @@ import json
 from typing import Dict, Any, Optional
 from openai import OpenAI
 
+from llm_cache import cached_chat_completion
+
 
 class NDAExtractor:
     """Extracts NDA-specific details from Non-Disclosure Agreement documents."""
@@ -39,7 +41,8 @@ class NDAExtractor:
         
         # Call OpenAI API
         try:
-            response = self.client.chat.completions.create(
+            response_content = cached_chat_completion(
+                self.client,
                 model=self.model,
                 messages=[
                     {
@@ -59,7 +62,6 @@ class NDAExtractor:
         
         # Parse the JSON response
         try:
-            response_content = response.choices[0].message.content
             extracted_data = json.loads(response_content)
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse JSON response: {str(e)}")
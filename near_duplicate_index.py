@@ -0,0 +1,189 @@
+"""
+Near-duplicate invoice detection over document text (MinHash / LSH).
+
+The invoice id check misses re-scans and re-exports of an invoice whose id came out
+differently (OCR noise, a reformatted number). Two such documents still share almost all of
+their text, so each invoice gets a MinHash signature over word 3-shingles of its parsed text
+(metadata.document_text, lowercased, punctuation dropped). The share of equal signature
+values estimates the Jaccard similarity of the two shingle sets.
+
+Signatures are cut into bands; documents that agree on every value of at least one band
+share a bucket. A lookup only compares the new signature with the invoices in its buckets
+(expected O(1) instead of a walk over the store) and reports the most similar one at or
+above NEAR_DUPLICATE_THRESHOLD (default 0.8; 0 disables the check). With 32 bands of 4
+rows a pair at similarity 0.8 shares a bucket with probability > 0.999; pairs below about
+0.4 rarely do, and every candidate is verified against the threshold.
+
+The signature is computed once per extraction (stored on the record as "text_minhash");
+records saved before that are hashed from their stored document text when indexed.
+Uploads are checked right after parsing, before any LLM call. A near-identical match (at
+or above NEAR_DUPLICATE_REJECT_THRESHOLD, default 0.97) is stopped there; a weaker one only
+flags the extracted invoice for review, because recurring invoices on one vendor template
+can be this similar, so rejection stays with the vendor-scoped invoice id check.
+"""
+
+import os
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from po_join_index import JOINABLE_STATUSES
+from store_index import ExtractionStoreIndex
+
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+# Text beyond this many characters is not hashed (invoices fit well within it)
+MAX_TEXT_CHARS = 50000
+# Fewer shingles than this give too coarse an estimate to block an upload on
+MIN_SHINGLES = 20
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = 0xFFFFFFFF
+# Fixed seed: stored signatures must stay comparable across restarts
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def text_shingles(text: str) -> List[str]:
+    """Distinct word 3-shingles of a document's normalized text."""
+    tokens = _TOKEN_RE.findall((text or "")[:MAX_TEXT_CHARS].lower())
+    if len(tokens) < SHINGLE_WORDS:
+        return [" ".join(tokens)] if tokens else []
+    return list({" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)})
+
+
+def minhash_signature(text: str) -> Optional[List[int]]:
+    """
+    MinHash signature of a document text.
+
+    Args:
+        text: Parsed document text
+
+    Returns:
+        NUM_PERM hash values, or None if the text is too short to compare
+    """
+    shingles = text_shingles(text)
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64, count=len(shingles),
+    )
+    # (a * h + b) mod p stays below 2**64 for 32-bit a, b and h
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32).tolist()
+
+
+def signature_similarity(signature_a, signature_b) -> float:
+    """Estimated Jaccard similarity of two signatures (share of equal values)."""
+    return float(np.mean(np.asarray(signature_a, dtype=np.uint32) == np.asarray(signature_b, dtype=np.uint32)))
+
+
+def _valid_signature(signature: Any) -> bool:
+    return isinstance(signature, (list, tuple)) and len(signature) == NUM_PERM
+
+
+def extraction_signature(extraction: Optional[Dict[str, Any]]) -> Optional[List[int]]:
+    """
+    Signature of a stored invoice (status completed / po_not_found, document type INVOICE):
+    the stored "text_minhash", else one computed from metadata.document_text. None otherwise.
+    """
+    if not isinstance(extraction, dict) or extraction.get("status") not in JOINABLE_STATUSES:
+        return None
+    extracted_data = extraction.get("extracted_data") or {}
+    if (extracted_data.get("document_type") or "").upper() != "INVOICE":
+        return None
+    signature = extraction.get("text_minhash")
+    if _valid_signature(signature):
+        return list(signature)
+    return minhash_signature((extraction.get("metadata") or {}).get("document_text", ""))
+
+
+class NearDuplicateIndex(ExtractionStoreIndex):
+    """LSH buckets of invoice text signatures, kept in step with one extractions store."""
+
+    index_name = "near_duplicates"
+    log_tag = "NEAR-DUPLICATES"
+
+    def __init__(self):
+        super().__init__()
+        self.threshold = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+        # At or above this similarity an upload is stopped before extraction; below it only flagged
+        self.reject_threshold = float(os.environ.get("NEAR_DUPLICATE_REJECT_THRESHOLD", "0.97"))
+        self._signatures: Dict[str, np.ndarray] = {}
+        # One bucket table per band: band values (bytes) -> extraction ids
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(BANDS)]
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def find(self, signature: Optional[List[int]],
+             exclude_id: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """
+        Most similar indexed invoice at or above the threshold (earliest in store order on
+        ties). Call sync() first.
+
+        Args:
+            signature: minhash_signature() of the new document
+            exclude_id: Extraction id to skip (the document being checked)
+
+        Returns:
+            (extraction_id, estimated similarity), or None
+        """
+        if not self.enabled or not _valid_signature(signature):
+            return None
+        query = np.asarray(signature, dtype=np.uint32)
+        with self._lock:
+            candidates = set()
+            for band, buckets in zip(self._band_keys(query), self._buckets):
+                candidates.update(buckets.get(band, ()))
+            candidates.discard(exclude_id)
+            if not candidates:
+                return None
+            ordered = self._in_store_order(candidates)
+            similarities = (np.stack([self._signatures[extraction_id] for extraction_id in ordered]) == query).mean(axis=1)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return ordered[best], float(similarities[best])
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray) -> List[bytes]:
+        return [signature[i * ROWS:(i + 1) * ROWS].tobytes() for i in range(BANDS)]
+
+    def _index(self, extraction_id: str, extraction: Dict[str, Any]):
+        signature = extraction_signature(extraction)
+        if signature is None:
+            return
+        signature = np.asarray(signature, dtype=np.uint32)
+        self._signatures[extraction_id] = signature
+        for band, buckets in zip(self._band_keys(signature), self._buckets):
+            buckets.setdefault(band, set()).add(extraction_id)
+
+    def _unindex(self, extraction_id: str):
+        signature = self._signatures.pop(extraction_id, None)
+        if signature is None:
+            return
+        for band, buckets in zip(self._band_keys(signature), self._buckets):
+            bucket = buckets.get(band)
+            if bucket is not None:
+                bucket.discard(extraction_id)
+                if not bucket:
+                    del buckets[band]
+
+    def _clear(self):
+        self._signatures.clear()
+        for buckets in self._buckets:
+            buckets.clear()
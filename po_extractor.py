@@ -259,12 +259,13 @@ def extract_po_data(document_text: str, api_key: str = None) -> Dict[str, Any]:
     try:
         from langchain_openai import ChatOpenAI
         from langchain_core.messages import SystemMessage, HumanMessage
+        from llm_cache import cached_invoke
         
         llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, api_key=api_key)
         
         prompt = create_po_extraction_prompt(document_text)
         
-        response = llm.invoke([
+        response = cached_invoke(llm, [
             SystemMessage(content=get_po_extraction_system_prompt()),
             HumanMessage(content=prompt)
         ])
@@ -274,10 +275,12 @@ def extract_po_data(document_text: str, api_key: str = None) -> Dict[str, Any]:
     except ImportError:
         # Fallback to direct OpenAI API
         from openai import OpenAI
+        from llm_cache import cached_chat_completion
         
         client = OpenAI(api_key=api_key)
         
-        response = client.chat.completions.create(
+        content = cached_chat_completion(
+            client,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": get_po_extraction_system_prompt()},
@@ -287,7 +290,7 @@ def extract_po_data(document_text: str, api_key: str = None) -> Dict[str, Any]:
             response_format={"type": "json_object"}
         )
         
-        return _parse_po_extraction_response(response.choices[0].message.content, document_text)
+        return _parse_po_extraction_response(content, document_text)
 
 
 def _parse_po_extraction_response(content: str, document_text: str = "") -> Dict[str, Any]:
@@ -0,0 +1,180 @@
+"""
+Invoice side of the PO -> GRN / invoice join used by the three-way match status.
+
+/api/match-status pairs every PO with an invoice whose PO reference (document_ids.po_number
+or order_number) equals, contains or is contained in the PO number. Instead of scanning
+extractions_store once per PO, InvoicePOIndex keeps the PO references of joinable invoices
+(status completed / po_not_found, document type INVOICE) in a SubstringIndex, so a PO
+number resolves with substring and trigram lookups.
+
+It also answers the reverse question for the re-match stage: which parked invoices (status
+po_not_found) can a newly saved PO or GRN with a given PO number affect. Those are keyed by
+the invoice's own PO reference and the PO number it was last matched to (a GRN is looked up
+by the matched PO's number), using the alphanumeric cores and scoring rule of
+find_po_by_number; invoices without any PO number are listed separately (they are matched
+by vendor/customer/amount).
+
+The index follows the store incrementally (store_index.ExtractionStoreIndex). The PO and
+GRN side comes from CacheManager.get_po_grn_join().
+"""
+
+from typing import Any, Dict, List, Optional, Set
+
+from po_number_index import SubstringIndex, normalize_po_number, po_core, score_po_number
+from store_index import ExtractionStoreIndex
+
+
+JOINABLE_STATUSES = ("completed", "po_not_found")
+
+
+def invoice_po_number(extraction: Optional[Dict[str, Any]]) -> str:
+    """Normalized PO reference of an invoice extraction, "" if it cannot join a PO."""
+    if not isinstance(extraction, dict) or extraction.get("status") not in JOINABLE_STATUSES:
+        return ""
+    extracted_data = extraction.get("extracted_data") or {}
+    if (extracted_data.get("document_type") or "").upper() != "INVOICE":
+        return ""
+    doc_ids = extracted_data.get("document_ids") or {}
+    return normalize_po_number(doc_ids.get("po_number") or doc_ids.get("order_number"))
+
+
+def pending_po_numbers(extraction: Optional[Dict[str, Any]]) -> Optional[Set[str]]:
+    """
+    Normalized PO numbers a parked invoice can be re-matched on: its own PO reference and the
+    PO it was last matched to. None if the extraction is not a parked invoice.
+    """
+    if not isinstance(extraction, dict) or extraction.get("status") != "po_not_found":
+        return None
+    extracted_data = extraction.get("extracted_data") or {}
+    if (extracted_data.get("document_type") or "").upper() != "INVOICE":
+        return None
+    doc_ids = extracted_data.get("document_ids") or {}
+    po_match = extracted_data.get("_po_match") or {}
+    numbers = {normalize_po_number(doc_ids.get("po_number") or doc_ids.get("order_number")),
+               normalize_po_number(po_match.get("po_number"))}
+    numbers.discard("")
+    return numbers
+
+
+def po_references_match(po_number: str, invoice_po: str) -> bool:
+    """Invoice PO reference equals, contains or is contained in the (normalized) PO number."""
+    return bool(po_number and invoice_po) and (po_number in invoice_po or invoice_po in po_number)
+
+
+class InvoicePOIndex(ExtractionStoreIndex):
+    """
+    Invoice PO references -> extraction ids (joinable invoices), and PO numbers -> parked
+    invoices, kept in step with one extractions store.
+    """
+
+    index_name = "invoice_po"
+    log_tag = "JOIN"
+
+    def __init__(self):
+        super().__init__()
+        self._po_refs = SubstringIndex()
+        # extraction_id -> normalized PO reference (joinable invoices only)
+        self._po_by_id: Dict[str, str] = {}
+        # Parked invoices: extraction_id -> normalized PO numbers, alphanumeric cores -> ids,
+        # ids with a PO number but no core, ids without any PO number
+        self._pending: Dict[str, Set[str]] = {}
+        self._pending_cores = SubstringIndex()
+        self._pending_coreless: Set[str] = set()
+        self._pending_without_po: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._po_by_id)
+
+    def find_invoice(self, po_number: str) -> Optional[Dict[str, Any]]:
+        """
+        First invoice (in store order) whose PO reference matches the PO number.
+
+        Args:
+            po_number: PO number from the PO index
+
+        Returns:
+            The extraction record, or None
+        """
+        normalized = normalize_po_number(po_number)
+        if not normalized:
+            return None
+        with self._lock:
+            store = self._store
+            refs = self._po_refs.within(normalized) | self._po_refs.containing(normalized)
+            candidates = sorted(
+                (self._positions[extraction_id], extraction_id)
+                for ref in refs for extraction_id in self._po_refs.hashes(ref)
+            )
+        for _position, extraction_id in candidates:
+            # Re-check the live record: in-place edits are only seen once they are saved
+            extraction = store.get(extraction_id) if store is not None else None
+            if po_references_match(normalized, invoice_po_number(extraction)):
+                return extraction
+        return None
+
+    def pending_invoices(self, po_number: str) -> List[str]:
+        """
+        Parked invoices a PO or GRN with this PO number can affect: one of their PO numbers
+        matches it under the find_po_by_number rules (exact, cores or raw strings contained in
+        one another). Call sync() first.
+
+        Returns:
+            Extraction ids in store order
+        """
+        normalized = normalize_po_number(po_number)
+        if not normalized:
+            return []
+        query_core = po_core(normalized)
+        with self._lock:
+            if query_core:
+                candidates = set(self._pending_coreless)
+                for core in self._pending_cores.within(query_core) | self._pending_cores.containing(query_core):
+                    candidates.update(self._pending_cores.hashes(core))
+            else:
+                candidates = set(self._pending)
+            found = [
+                extraction_id for extraction_id in candidates
+                if any(score_po_number(normalized, query_core, number, po_core(number))
+                       for number in self._pending.get(extraction_id, ()))
+            ]
+            return self._in_store_order(found)
+
+    def pending_without_po(self) -> List[str]:
+        """Parked invoices without any PO number, in store order. Call sync() first."""
+        with self._lock:
+            return self._in_store_order(self._pending_without_po)
+
+    def _unindex(self, extraction_id: str):
+        po_ref = self._po_by_id.pop(extraction_id, None)
+        if po_ref is not None:
+            self._po_refs.remove(po_ref, extraction_id)
+        for number in self._pending.pop(extraction_id, ()):
+            if po_core(number):
+                self._pending_cores.remove(po_core(number), extraction_id)
+        self._pending_coreless.discard(extraction_id)
+        self._pending_without_po.discard(extraction_id)
+
+    def _index(self, extraction_id: str, extraction: Dict[str, Any]):
+        po_ref = invoice_po_number(extraction)
+        if po_ref:
+            self._po_by_id[extraction_id] = po_ref
+            self._po_refs.add(po_ref, extraction_id)
+        numbers = pending_po_numbers(extraction)
+        if numbers is None:
+            return
+        self._pending[extraction_id] = numbers
+        if not numbers:
+            self._pending_without_po.add(extraction_id)
+        for number in numbers:
+            if po_core(number):
+                self._pending_cores.add(po_core(number), extraction_id)
+            else:
+                self._pending_coreless.add(extraction_id)
+
+    def _clear(self):
+        self._po_refs.clear()
+        self._po_by_id.clear()
+        self._pending.clear()
+        self._pending_cores.clear()
+        self._pending_coreless.clear()
+        self._pending_without_po.clear()
@@ -8,9 +8,24 @@ Matching hierarchy:
   4. Vendor/supplier on the invoice must match the vendor on the PO.
 """
 
+import bisect
+import math
 import re
+from collections import Counter
 from typing import Dict, Any, Optional, Tuple, List
+
+import numpy as np
+
 from cache_manager import get_cache_manager
+from vendor_index import vendor_names_match
+
+# Optional: optimal (Hungarian) line-item assignment; greedy by score without it
+SCIPY_AVAILABLE = False
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    pass
 
 
 def _normalize(text: str) -> str:
@@ -29,33 +44,111 @@ def _parse_qty(val) -> float:
         return 0.0
 
 
-def _vendor_match(invoice_vendor: str, po_vendor: str) -> bool:
-    """Check whether vendor/supplier names are a reasonable match."""
-    a = _normalize(invoice_vendor)
-    b = _normalize(po_vendor)
-    if not a or not b:
-        return True  # if one side is blank we can't verify – allow
-    if a == b:
-        return True
-    if a in b or b in a:
-        return True
-    a_tokens = set(a.split())
-    b_tokens = set(b.split())
-    noise = {'pvt', 'ltd', 'llp', 'inc', 'llc', 'co', 'corp', 'company', 'limited', 'private', 'services', 'solutions', 'india', 'technologies', 'technology', 'the'}
-    a_clean = a_tokens - noise
-    b_clean = b_tokens - noise
-    if a_clean and b_clean:
-        overlap = len(a_clean & b_clean)
-        max_len = max(len(a_clean), len(b_clean))
-        if overlap / max_len >= 0.5:
-            return True
-    return False
+def _containment_pairs(needles: List[str], haystacks: List[str]) -> List[Tuple[int, int]]:
+    """
+    (i, j) for every needles[i] that is a substring of haystacks[j].
+    One str.find scan per needle over all haystacks joined, instead of a pairwise loop.
+    """
+    joined = "\x00".join(haystacks)
+    starts = []
+    offset = 0
+    for text in haystacks:
+        starts.append(offset)
+        offset += len(text) + 1
+    pairs = set()
+    for i, needle in enumerate(needles):
+        pos = joined.find(needle)
+        while pos != -1:
+            j = bisect.bisect_right(starts, pos) - 1
+            if pos + len(needle) <= starts[j] + len(haystacks[j]):
+                pairs.add((i, j))
+            pos = joined.find(needle, pos + 1)
+    return list(pairs)
+
+
+def _line_item_scores(inv_descs: List[str], ref_descs: List[str]) -> "np.ndarray":
+    """
+    Similarity matrix (invoice items x reference items); 0 = not a match.
+
+    A pair matches when one description contains the other, or when they share at least
+    half of the shorter description's words (the rules of the previous greedy matcher).
+    Matches are ranked containment (2) > word overlap (1), plus the cosine similarity of
+    IDF-weighted word vectors to separate candidates of the same kind.
+    """
+    inv_tokens = [set(desc.split()) for desc in inv_descs]
+    ref_tokens = [set(desc.split()) for desc in ref_descs]
+    doc_freq = Counter(token for tokens in inv_tokens + ref_tokens for token in tokens)
+    total = len(inv_descs) + len(ref_descs) + 1
+    idf = {token: math.log(total / (count + 1)) + 1.0 for token, count in doc_freq.items()}
+
+    ref_postings: Dict[str, List[int]] = {}
+    for column, tokens in enumerate(ref_tokens):
+        for token in tokens:
+            ref_postings.setdefault(token, []).append(column)
+
+    # Shared-word counts and IDF-weighted dot products, one row per invoice item, from
+    # the postings of its words (sparse: cost follows the number of word matches)
+    common = np.zeros((len(inv_descs), len(ref_descs)), dtype=np.float32)
+    dot = np.zeros_like(common)
+    for row, tokens in enumerate(inv_tokens):
+        columns: List[int] = []
+        column_weights: List[float] = []
+        for token in tokens:
+            posting = ref_postings.get(token)
+            if posting:
+                columns.extend(posting)
+                column_weights.extend([idf[token] ** 2] * len(posting))
+        if columns:
+            common[row] = np.bincount(columns, minlength=len(ref_descs))
+            dot[row] = np.bincount(columns, weights=column_weights, minlength=len(ref_descs))
+
+    def norms(token_sets):
+        return np.array([math.sqrt(sum(idf[token] ** 2 for token in tokens)) or 1.0
+                         for tokens in token_sets], dtype=np.float32)
+
+    inv_len = np.array([len(tokens) for tokens in inv_tokens], dtype=np.float32)[:, None]
+    ref_len = np.array([len(tokens) for tokens in ref_tokens], dtype=np.float32)[None, :]
+    overlap = common >= np.maximum(1.0, np.minimum(inv_len, ref_len) * 0.5)
+    cosine = dot / np.outer(norms(inv_tokens), norms(ref_tokens))
+
+    rank = np.where(overlap, 1.0, 0.0)
+    for i, j in _containment_pairs(ref_descs, inv_descs):
+        rank[j, i] = 2.0
+    for i, j in _containment_pairs(inv_descs, ref_descs):
+        rank[i, j] = 2.0
+    return np.where(rank > 0, rank + cosine, 0.0)
+
+
+def _assign_line_items(scores: "np.ndarray") -> Dict[int, int]:
+    """
+    One-to-one invoice item -> reference item assignment maximizing the total score
+    (Hungarian algorithm with scipy, otherwise greedy by descending score).
+    """
+    if scores.size == 0:
+        return {}
+    if SCIPY_AVAILABLE:
+        rows, cols = linear_sum_assignment(scores, maximize=True)
+        return {int(i): int(j) for i, j in zip(rows, cols) if scores[i, j] > 0}
+    assignment: Dict[int, int] = {}
+    taken = set()
+    flat = np.argsort(-scores, axis=None, kind="stable")
+    for i, j in zip(*np.unravel_index(flat, scores.shape)):
+        if scores[i, j] <= 0:
+            break
+        if i not in assignment and j not in taken:
+            assignment[int(i)] = int(j)
+            taken.add(int(j))
+    return assignment
 
 
 def _match_line_items(invoice_items: List[dict], reference_items: List[dict], ref_label: str) -> List[str]:
     """
     Compare invoice line items against reference (GRN or PO) line items.
     Returns a list of mismatch descriptions (empty = all matched).
+
+    Items are paired by a one-to-one assignment maximizing the total similarity, so the
+    result does not depend on line order. An invoice item left without a partner
+    (e.g. a line split across several invoice rows) falls back to its best match.
     """
     issues: List[str] = []
     if not invoice_items and not reference_items:
@@ -66,31 +159,37 @@ def _match_line_items(invoice_items: List[dict], reference_items: List[dict], re
         desc = _normalize(item.get("description", ""))
         if desc:
             ref_by_desc[desc] = item
+    ref_descs = list(ref_by_desc)
 
-    matched_refs = set()
+    inv_rows = []
     for inv_item in (invoice_items or []):
         inv_desc = _normalize(inv_item.get("description", ""))
-        inv_qty = _parse_qty(inv_item.get("quantity"))
-        if not inv_desc:
-            continue
-
-        best_key = None
-        for ref_key in ref_by_desc:
-            if ref_key == inv_desc or ref_key in inv_desc or inv_desc in ref_key:
-                best_key = ref_key
-                break
-        if not best_key:
-            inv_tokens = set(inv_desc.split())
-            for ref_key in ref_by_desc:
-                ref_tokens = set(ref_key.split())
-                common = inv_tokens & ref_tokens
-                if len(common) >= max(1, min(len(inv_tokens), len(ref_tokens)) * 0.5):
-                    best_key = ref_key
-                    break
-
-        if best_key:
-            matched_refs.add(best_key)
-            ref_item = ref_by_desc[best_key]
+        if inv_desc:
+            inv_rows.append((inv_item, inv_desc))
+
+    # Identical descriptions pair up directly; only the remaining items go through the
+    # similarity matrix (they may still fall back to an identically matched reference item)
+    ref_columns = {desc: column for column, desc in enumerate(ref_descs)}
+    best_ref: Dict[int, int] = {row: ref_columns[desc] for row, (_item, desc) in enumerate(inv_rows) if desc in ref_columns}
+    rest = [row for row in range(len(inv_rows)) if row not in best_ref]
+    if rest and ref_descs:
+        scores = _line_item_scores([inv_rows[row][1] for row in rest], ref_descs)
+        open_scores = scores.copy()
+        open_scores[:, sorted(set(best_ref.values()))] = 0.0
+        assignment = _assign_line_items(open_scores)
+        for index, row in enumerate(rest):
+            if index in assignment:
+                best_ref[row] = assignment[index]
+            elif scores[index].max() > 0:
+                best_ref[row] = int(scores[index].argmax())
+
+    matched_refs = set()
+    for row, (inv_item, inv_desc) in enumerate(inv_rows):
+        best = best_ref.get(row)
+        if best is not None:
+            matched_refs.add(best)
+            ref_item = ref_by_desc[ref_descs[best]]
+            inv_qty = _parse_qty(inv_item.get("quantity"))
             ref_qty = _parse_qty(ref_item.get("quantity"))
             if inv_qty > 0 and ref_qty > 0 and inv_qty > ref_qty:
                 issues.append(
@@ -101,8 +200,9 @@ def _match_line_items(invoice_items: List[dict], reference_items: List[dict], re
                 f"Item '{inv_item.get('description', inv_desc)}' not found in {ref_label}"
             )
 
-    for ref_key, ref_item in ref_by_desc.items():
-        if ref_key not in matched_refs:
+    for index, ref_key in enumerate(ref_descs):
+        if index not in matched_refs:
+            ref_item = ref_by_desc[ref_key]
             issues.append(
                 f"Item '{ref_item.get('description', ref_key)}' in {ref_label} but not in Invoice"
             )
@@ -185,7 +285,7 @@ class POMatcher:
         po_party = po_extracted.get("party_names", {})
         po_vendor = po_party.get("vendor", "") or po_party.get("party_1", "") or po_match.get("vendor", "")
 
-        if not _vendor_match(invoice_vendor, po_vendor):
+        if not vendor_names_match(invoice_vendor, po_vendor):
             msg = f"Vendor mismatch: Invoice vendor '{invoice_vendor}' does not match PO vendor '{po_vendor}'. Invoice cannot be processed."
             print(f"[PO_MATCHER] {msg}")
             notifications.append({
@@ -292,8 +392,7 @@ class POMatcher:
         return self.cache_manager.get_all_pos()
 
     def get_po_count(self) -> int:
-        po_index = self.cache_manager.get_all_pos()
-        return len(po_index)
+        return self.cache_manager.get_po_count()
 
 
 _po_matcher_instance: Optional[POMatcher] = None
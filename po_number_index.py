@@ -0,0 +1,312 @@
+"""
+In-memory inverted index over the PO numbers of the PO / GRN index.
+
+CacheManager.find_po_by_number scores every entry against the invoice's PO number:
+exact match (100), alphanumeric cores contained in one another (90), raw strings
+contained in one another (85). Instead of scanning all entries, candidates come from
+postings keyed by the alphanumeric core:
+
+- cores contained in the query core: every substring of the query core is looked up
+  in a core -> entries map
+- cores containing the query core: intersection of the trigram postings of the query
+  core, verified with a substring test
+
+Raw containment implies core containment, so the same candidates cover the 85 rule;
+entries or queries without any alphanumeric character are checked directly. Candidates
+are then scored with the original rules, so results are identical to the full scan.
+
+Entries are grouped by index shard. sync_shards() re-indexes only the shards whose data
+dict changed since the last call (CacheManager replaces a cached shard's dict on every
+write), so the index follows inserts and deletes without a full rebuild. Results come
+back in index order (index_order: the entry's index_seq, stamped when it was first
+written), i.e. the insertion order of the old single-file index, not shard order. The shard
+bookkeeping (ShardedEntryIndex) and the substring postings (SubstringIndex) are shared
+with the vendor/customer index in vendor_index.py.
+"""
+
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+GRAM_SIZE = 3
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]')
+
+
+def normalize_po_number(po_number: Any) -> str:
+    """PO number as compared by the matchers: stripped and lowercased."""
+    return str(po_number or "").strip().lower()
+
+
+def po_core(normalized_po: str) -> str:
+    """Alphanumeric core of a normalized PO number."""
+    return _NON_ALNUM.sub('', normalized_po)
+
+
+def score_po_number(normalized_po: str, query_core: str, entry_po: str, entry_core: str) -> int:
+    """Score of one entry against a query: 100 exact, 90 core containment, 85 raw containment, else 0."""
+    if entry_po == normalized_po:
+        return 100
+    if query_core and entry_core and (query_core in entry_core or entry_core in query_core):
+        return 90
+    if normalized_po in entry_po or entry_po in normalized_po:
+        return 85
+    return 0
+
+
+def index_order(file_hash: str, entry: Any) -> Tuple[int, str]:
+    """
+    Sort key of a PO/GRN index entry: its index_seq (stamped on first write and kept on
+    updates), else its indexed_at time for entries written before index_seq existed.
+    """
+    if not isinstance(entry, dict):
+        return 0, file_hash
+    seq = entry.get("index_seq")
+    if isinstance(seq, int):
+        return seq, file_hash
+    try:
+        return int(datetime.fromisoformat(entry.get("indexed_at") or "").timestamp() * 1_000_000_000), file_hash
+    except (TypeError, ValueError):
+        return 0, file_hash
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class SubstringIndex:
+    """
+    Strings -> ids (file hashes, extraction ids), answering "which indexed strings are contained in / contain this
+    query" without a scan: the first by looking up every substring of the query, the second
+    by intersecting trigram postings and verifying. Not thread-safe; owners lock around it.
+    """
+
+    def __init__(self):
+        self._hashes: Dict[str, Set[str]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        # Length -> number of indexed strings of that length (bounds the substrings tried)
+        self._lengths: Dict[int, int] = {}
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._hashes
+
+    def __iter__(self):
+        return iter(self._hashes)
+
+    def hashes(self, text: str) -> Set[str]:
+        """Ids indexed under exactly this string."""
+        return self._hashes.get(text, set())
+
+    def add(self, text: str, file_hash: str):
+        hashes = self._hashes.get(text)
+        if hashes is None:
+            hashes = self._hashes[text] = set()
+            self._lengths[len(text)] = self._lengths.get(len(text), 0) + 1
+            for gram in _grams(text):
+                self._grams.setdefault(gram, set()).add(text)
+        hashes.add(file_hash)
+
+    def remove(self, text: str, file_hash: str):
+        hashes = self._hashes.get(text)
+        if hashes is None:
+            return
+        hashes.discard(file_hash)
+        if hashes:
+            return
+        del self._hashes[text]
+        self._lengths[len(text)] -= 1
+        if not self._lengths[len(text)]:
+            del self._lengths[len(text)]
+        for gram in _grams(text):
+            posting = self._grams.get(gram)
+            if posting is not None:
+                posting.discard(text)
+                if not posting:
+                    del self._grams[gram]
+
+    def clear(self):
+        self._hashes.clear()
+        self._grams.clear()
+        self._lengths.clear()
+
+    def within(self, query: str) -> Set[str]:
+        """Indexed strings that are substrings of the query."""
+        found = set()
+        n = len(query)
+        for length in self._lengths:
+            for i in range(n - length + 1):
+                sub = query[i:i + length]
+                if sub in self._hashes:
+                    found.add(sub)
+        return found
+
+    def containing(self, query: str) -> Set[str]:
+        """Indexed strings that contain the query."""
+        if len(query) < GRAM_SIZE:
+            return {text for text in self._hashes if query in text}
+        postings = []
+        for gram in _grams(query):
+            posting = self._grams.get(gram)
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        return {text for text in postings[0] if all(text in p for p in postings[1:]) and query in text}
+
+
+class ShardedEntryIndex:
+    """
+    Base for in-memory indexes over CacheManager's cached PO/GRN index shards.
+
+    Subclasses derive a hashable key from each entry (_entry_key; None = not indexed) and
+    maintain their postings in _add_key/_remove_key. This class tracks which shard dicts
+    have been indexed and the index order (index_order) of every entry.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shard_data: Dict[str, Dict[str, Any]] = {}
+        # file_hash -> (key, index_order of the entry)
+        self._entries: Dict[str, Tuple[Any, Tuple[int, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Forget all entries (the next sync_shards rebuilds)."""
+        with self._lock:
+            self._shard_data.clear()
+            self._entries.clear()
+            self._clear_keys()
+
+    def sync_shards(self, shards: Dict[str, Dict[str, Any]]):
+        """
+        Bring the index in line with the given shards.
+
+        Args:
+            shards: {shard: {"data": {file_hash: entry}}} as cached by CacheManager
+        """
+        with self._lock:
+            for shard in list(self._shard_data):
+                if shard not in shards:
+                    self._replace_shard(shard, {})
+                    del self._shard_data[shard]
+            for shard, cached in shards.items():
+                data = cached["data"]
+                if self._shard_data.get(shard) is not data:
+                    self._replace_shard(shard, data)
+                    self._shard_data[shard] = data
+
+    def _replace_shard(self, shard: str, data: Dict[str, Any]):
+        """Re-index the entries of one shard that were added, removed or changed (caller holds the lock)."""
+        old = self._shard_data.get(shard) or {}
+        for file_hash in old.keys() - data.keys():
+            self._discard(file_hash)
+        for file_hash, entry in data.items():
+            if old.get(file_hash) is entry:
+                continue
+            key = self._entry_key(entry) if isinstance(entry, dict) else None
+            order = index_order(file_hash, entry)
+            current = self._entries.get(file_hash)
+            if current is not None and current == (key, order):
+                continue
+            self._discard(file_hash)
+            if key is not None:
+                self._entries[file_hash] = (key, order)
+                self._add_key(file_hash, key)
+
+    def _discard(self, file_hash: str):
+        current = self._entries.pop(file_hash, None)
+        if current is not None:
+            self._remove_key(file_hash, current[0])
+
+    def _entry_key(self, entry: Dict[str, Any]) -> Any:
+        raise NotImplementedError
+
+    def _add_key(self, file_hash: str, key: Any):
+        raise NotImplementedError
+
+    def _remove_key(self, file_hash: str, key: Any):
+        raise NotImplementedError
+
+    def _clear_keys(self):
+        raise NotImplementedError
+
+
+class PONumberIndex(ShardedEntryIndex):
+    """Inverted index from PO numbers to index entries (file hashes)."""
+
+    def __init__(self):
+        super().__init__()
+        self._by_po: Dict[str, Set[str]] = {}
+        self._cores = SubstringIndex()
+        self._coreless: Set[str] = set()
+
+    def match(self, po_number: str) -> List[Tuple[int, str]]:
+        """
+        Entries matching a PO number with a non-zero score.
+
+        Args:
+            po_number: PO number from the invoice
+
+        Returns:
+            [(score, file_hash)] in index order
+        """
+        normalized = normalize_po_number(po_number)
+        if not normalized:
+            return []
+        query_core = po_core(normalized)
+        with self._lock:
+            if query_core:
+                candidates = set(self._coreless)
+                candidates.update(self._by_po.get(normalized, ()))
+                for core in self._cores.within(query_core) | self._cores.containing(query_core):
+                    candidates.update(self._cores.hashes(core))
+            else:
+                candidates = set(self._entries)
+            scored = []
+            for file_hash in candidates:
+                (entry_po, entry_core), order = self._entries[file_hash]
+                score = score_po_number(normalized, query_core, entry_po, entry_core)
+                if score:
+                    scored.append((order, score, file_hash))
+        scored.sort()
+        return [(score, file_hash) for _order, score, file_hash in scored]
+
+    def exact(self, po_number: str) -> List[str]:
+        """File hashes whose normalized PO number equals the given one, in index order."""
+        normalized = normalize_po_number(po_number)
+        with self._lock:
+            hashes = self._by_po.get(normalized, ())
+            return sorted(hashes, key=lambda file_hash: self._entries[file_hash][1])
+
+    def _entry_key(self, entry: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        entry_po = normalize_po_number(entry.get("po_number"))
+        return (entry_po, po_core(entry_po)) if entry_po else None
+
+    def _add_key(self, file_hash: str, key: Tuple[str, str]):
+        entry_po, core = key
+        self._by_po.setdefault(entry_po, set()).add(file_hash)
+        if core:
+            self._cores.add(core, file_hash)
+        else:
+            self._coreless.add(file_hash)
+
+    def _remove_key(self, file_hash: str, key: Tuple[str, str]):
+        entry_po, core = key
+        hashes = self._by_po.get(entry_po)
+        if hashes is not None:
+            hashes.discard(file_hash)
+            if not hashes:
+                del self._by_po[entry_po]
+        if core:
+            self._cores.remove(core, file_hash)
+        else:
+            self._coreless.discard(file_hash)
+
+    def _clear_keys(self):
+        self._by_po.clear()
+        self._cores.clear()
+        self._coreless.clear()
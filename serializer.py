@@ -0,0 +1,163 @@
+"""
+Serializer for cache blobs (extraction records, PO/GRN index shards and records,
+manifest, data/*.json) written by CacheManager to local files and GCS.
+
+JSON is encoded with orjson when it is installed (stdlib json otherwise), compact by
+default, and optionally compressed with gzip or zstd. Decoding sniffs the gzip/zstd
+magic bytes, so blobs written under any setting - including the older indent=2 files -
+load transparently.
+
+Environment:
+    CACHE_JSON_STYLE: "compact" (default) or "pretty" (indent=2, the previous format)
+    CACHE_COMPRESSION: "none" (default), "gzip" or "zstd"
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Union
+
+# Optional fast JSON encoder
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
+# Optional zstd compression
+ZSTD_AVAILABLE = False
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    pass
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def content_encoding_of(payload: bytes) -> Optional[str]:
+    """HTTP Content-Encoding of a serialized payload ("gzip", "zstd" or None for plain JSON)."""
+    if payload[:2] == GZIP_MAGIC:
+        return "gzip"
+    if payload[:4] == ZSTD_MAGIC:
+        return "zstd"
+    return None
+
+
+def decompress(payload: bytes) -> bytes:
+    """Undo gzip/zstd compression if present; plain JSON is returned unchanged."""
+    encoding = content_encoding_of(payload)
+    if encoding == "gzip":
+        return gzip.decompress(payload)
+    if encoding == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstd-compressed cache blob found but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload, max_output_size=1 << 31)
+    return payload
+
+
+def loads(payload: Union[bytes, str]) -> Any:
+    """
+    Decode a cache blob written by any JsonSerializer setting (or plain json.dump).
+
+    Args:
+        payload: Raw bytes as stored (possibly compressed) or a JSON string
+
+    Returns:
+        The decoded JSON value
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    payload = decompress(payload)
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            # stdlib json accepts what older json.dump output may contain (NaN/Infinity, a UTF-8 BOM)
+            pass
+    return json.loads(payload.decode("utf-8-sig"))
+
+
+def load_file(path: Path) -> Any:
+    """Read and decode a cache file."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+class JsonSerializer:
+    """Encodes cache data as (optionally compressed) JSON bytes."""
+
+    def __init__(self, style: str = "compact", compression: str = "none"):
+        """
+        Initialize serializer.
+
+        Args:
+            style: "compact" or "pretty" (indent=2)
+            compression: "none", "gzip" or "zstd"
+        """
+        self.style = style if style in ("compact", "pretty") else "compact"
+        compression = compression if compression in ("none", "gzip", "zstd") else "none"
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            print("[SERIALIZER] zstandard not installed; falling back to gzip")
+            compression = "gzip"
+        self.compression = compression
+        self._orjson_options = 0
+        if ORJSON_AVAILABLE:
+            # Datetimes/dataclasses go through default=str, as with json.dumps(..., default=str)
+            self._orjson_options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                                    | orjson.OPT_PASSTHROUGH_DATACLASS)
+            if self.style == "pretty":
+                self._orjson_options |= orjson.OPT_INDENT_2
+
+    @property
+    def content_encoding(self) -> Optional[str]:
+        """Content-Encoding of the payloads this serializer writes."""
+        return None if self.compression == "none" else self.compression
+
+    def encode_json(self, data: Any) -> bytes:
+        """Uncompressed UTF-8 JSON."""
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.dumps(data, default=str, option=self._orjson_options)
+            except (orjson.JSONEncodeError, TypeError):
+                # e.g. integers beyond 64 bits; stdlib json handles them
+                pass
+        if self.style == "pretty":
+            text = json.dumps(data, indent=2, ensure_ascii=False, default=str)
+        else:
+            text = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+        return text.encode("utf-8")
+
+    def dumps(self, data: Any) -> bytes:
+        """Serialized (and compressed, if configured) payload, ready to write or upload."""
+        body = self.encode_json(data)
+        if self.compression == "gzip":
+            return gzip.compress(body, compresslevel=6, mtime=0)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(body)
+        return body
+
+    def dump_file(self, path: Path, data: Any) -> bytes:
+        """Write data to a local cache file. Returns the bytes written."""
+        payload = self.dumps(data)
+        with open(path, "wb") as f:
+            f.write(payload)
+        return payload
+
+
+_serializer_instance: Optional[JsonSerializer] = None
+
+
+def get_serializer() -> JsonSerializer:
+    """Get or create the serializer configured by CACHE_JSON_STYLE / CACHE_COMPRESSION."""
+    global _serializer_instance
+    if _serializer_instance is None:
+        _serializer_instance = JsonSerializer(
+            style=os.environ.get("CACHE_JSON_STYLE", "compact").strip().lower(),
+            compression=os.environ.get("CACHE_COMPRESSION", "none").strip().lower(),
+        )
+    return _serializer_instance
@@ -0,0 +1,405 @@
+"""
+SQLite Store for extraction records and the PO / GRN indexes.
+Used by CacheManager when CACHE_BACKEND=sqlite.
+
+The database runs in WAL mode so request threads can read while another thread writes.
+Lookup fields (status, document_type, invoice_id, po_number, vendor, file_hash) are stored
+as indexed columns next to the JSON payload, so point lookups do not deserialize whole blobs.
+PO-number containment lookups go through the po_core column and a trigram table
+(index_po_grams) instead of scanning every index entry.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    extraction_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT '',
+    document_type TEXT NOT NULL DEFAULT '',
+    invoice_id TEXT NOT NULL DEFAULT '',
+    po_number TEXT NOT NULL DEFAULT '',
+    vendor TEXT NOT NULL DEFAULT '',
+    file_hash TEXT NOT NULL DEFAULT '',
+    file_name TEXT NOT NULL DEFAULT '',
+    extracted_at TEXT NOT NULL DEFAULT '',
+    uploaded_at TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_extractions_status ON extractions(status);
+CREATE INDEX IF NOT EXISTS idx_extractions_document_type ON extractions(document_type);
+CREATE INDEX IF NOT EXISTS idx_extractions_invoice_id ON extractions(invoice_id);
+CREATE INDEX IF NOT EXISTS idx_extractions_po_number ON extractions(po_number);
+CREATE INDEX IF NOT EXISTS idx_extractions_vendor ON extractions(vendor);
+CREATE INDEX IF NOT EXISTS idx_extractions_file_hash ON extractions(file_hash);
+
+CREATE TABLE IF NOT EXISTS index_entries (
+    kind TEXT NOT NULL,
+    file_hash TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    po_number TEXT NOT NULL DEFAULT '',
+    po_core TEXT NOT NULL DEFAULT '',
+    vendor TEXT NOT NULL DEFAULT '',
+    entry TEXT NOT NULL,
+    PRIMARY KEY (kind, file_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_index_entries_seq ON index_entries(kind, seq);
+CREATE INDEX IF NOT EXISTS idx_index_entries_po_number ON index_entries(kind, po_number);
+CREATE INDEX IF NOT EXISTS idx_index_entries_po_core ON index_entries(kind, po_core);
+CREATE INDEX IF NOT EXISTS idx_index_entries_vendor ON index_entries(kind, vendor);
+
+-- Trigrams of index_entries.po_core, for "PO cores containing the query core"
+CREATE TABLE IF NOT EXISTS index_po_grams (
+    kind TEXT NOT NULL,
+    gram TEXT NOT NULL,
+    file_hash TEXT NOT NULL,
+    PRIMARY KEY (kind, gram, file_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_index_po_grams_file_hash ON index_po_grams(kind, file_hash);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_UPSERT_EXTRACTION = (
+    "INSERT OR REPLACE INTO extractions(extraction_id, status, document_type, invoice_id, po_number, "
+    "vendor, file_hash, file_name, extracted_at, uploaded_at, size, data) "
+    "VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Gram length of index_po_grams; bound variables per IN (...) chunk
+_GRAM_SIZE = 3
+_IN_CHUNK = 500
+
+_SUMMARY_COLUMNS = ("extraction_id", "file_name", "file_hash", "extracted_at", "uploaded_at",
+                    "status", "document_type", "size")
+
+
+def _lower(value: Any) -> str:
+    return str(value or "").strip().lower()
+
+
+def _po_core(po_number: str) -> str:
+    """Alphanumeric core of a normalized PO number (same rule as CacheManager.find_po_by_number)."""
+    return re.sub(r'[^a-z0-9]', '', po_number)
+
+
+def _po_grams(core: str) -> List[str]:
+    return sorted({core[i:i + _GRAM_SIZE] for i in range(len(core) - _GRAM_SIZE + 1)})
+
+
+def _chunks(values: List[str]) -> Iterator[List[str]]:
+    for i in range(0, len(values), _IN_CHUNK):
+        yield values[i:i + _IN_CHUNK]
+
+
+def _extraction_columns(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive the indexed columns of an extraction record."""
+    extracted = data.get("extracted_data") or {}
+    results = data.get("results") or {}
+    doc_ids = extracted.get("document_ids") or {} if isinstance(extracted, dict) else {}
+    party_names = extracted.get("party_names") or {} if isinstance(extracted, dict) else {}
+    if not isinstance(doc_ids, dict):
+        doc_ids = {}
+    if not isinstance(party_names, dict):
+        party_names = {}
+    document_type = (results.get("contract_type") if isinstance(results, dict) else None) \
+        or (extracted.get("document_type") if isinstance(extracted, dict) else None) or ""
+    return {
+        "status": str(data.get("status") or ""),
+        "document_type": str(document_type),
+        "invoice_id": _lower(doc_ids.get("invoice_id") or doc_ids.get("invoice_number")),
+        "po_number": _lower(doc_ids.get("po_number")),
+        "vendor": _lower(party_names.get("vendor")),
+        "file_hash": str(data.get("file_hash") or ""),
+        "file_name": str(data.get("file_name") or ""),
+        "extracted_at": str(data.get("extracted_at") or ""),
+        "uploaded_at": str(data.get("uploaded_at") or ""),
+    }
+
+
+class SQLiteStore:
+    """Thread-safe SQLite store (one connection per thread, WAL journal)."""
+
+    def __init__(self, db_path: Path):
+        """
+        Open (or create) the database.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        if not self.get_meta("po_grams"):
+            # Database created before index_po_grams existed
+            self._rebuild_po_grams()
+        print(f"[SQLITE] Store ready: {self.db_path.absolute()}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql: str, params: Tuple = ()) -> int:
+        with self._write_lock:
+            conn = self._conn()
+            cur = conn.execute(sql, params)
+            conn.commit()
+            return cur.rowcount
+
+    # ------------------------------------------------------------------
+    # Meta flags (e.g. "hydrated from GCS")
+    # ------------------------------------------------------------------
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self._write("INSERT INTO meta(key, value) VALUES(?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+
+    # ------------------------------------------------------------------
+    # Extraction records
+    # ------------------------------------------------------------------
+
+    def _extraction_row(self, extraction_id: str, data: Dict[str, Any]) -> Tuple:
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        cols = _extraction_columns(data)
+        return (extraction_id, cols["status"], cols["document_type"], cols["invoice_id"], cols["po_number"],
+                cols["vendor"], cols["file_hash"], cols["file_name"], cols["extracted_at"], cols["uploaded_at"],
+                len(payload.encode("utf-8")), payload)
+
+    def put_extraction(self, extraction_id: str, data: Dict[str, Any]):
+        """Insert or replace an extraction record."""
+        self._write(_UPSERT_EXTRACTION, self._extraction_row(extraction_id, data))
+
+    def put_extractions(self, records: List[Dict[str, Any]]):
+        """Bulk insert extraction records (each must carry extraction_id)."""
+        rows = [self._extraction_row(data["extraction_id"], data)
+                for data in records if data.get("extraction_id")]
+        with self._write_lock:
+            conn = self._conn()
+            conn.executemany(_UPSERT_EXTRACTION, rows)
+            conn.commit()
+
+    def get_extraction(self, extraction_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT data FROM extractions WHERE extraction_id = ?", (extraction_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete_extraction(self, extraction_id: str) -> bool:
+        return self._write("DELETE FROM extractions WHERE extraction_id = ?", (extraction_id,)) > 0
+
+    def clear_extractions(self) -> int:
+        return self._write("DELETE FROM extractions")
+
+    def all_extractions(self) -> List[Dict[str, Any]]:
+        """All extraction records, most recent first."""
+        rows = self._conn().execute(
+            "SELECT data FROM extractions "
+            "ORDER BY CASE WHEN extracted_at != '' THEN extracted_at ELSE uploaded_at END DESC").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def list_extraction_summaries(self) -> List[Dict[str, Any]]:
+        """Summary rows (no JSON payload), most recent first."""
+        rows = self._conn().execute(
+            f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM extractions "
+            "ORDER BY CASE WHEN extracted_at != '' THEN extracted_at ELSE uploaded_at END DESC").fetchall()
+        return [dict(zip(_SUMMARY_COLUMNS, row)) for row in rows]
+
+    def find_extractions(self, **filters: str) -> List[Dict[str, Any]]:
+        """
+        Extraction records matching all given column filters.
+
+        Args:
+            filters: Any of status, document_type, invoice_id, po_number, vendor, file_hash
+                     (invoice_id, po_number and vendor are compared lowercased)
+        """
+        allowed = {"status", "document_type", "invoice_id", "po_number", "vendor", "file_hash"}
+        clauses, params = [], []
+        for column, value in filters.items():
+            if column not in allowed:
+                raise ValueError(f"Unknown extraction filter: {column}")
+            if column in ("invoice_id", "po_number", "vendor"):
+                value = _lower(value)
+            clauses.append(f"{column} = ?")
+            params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn().execute(f"SELECT data FROM extractions{where}", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count_extractions(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # PO / GRN index entries (kind = "po" | "grn")
+    # ------------------------------------------------------------------
+
+    def _index_row(self, kind: str, file_hash: str, entry: Dict[str, Any], seq: int) -> Tuple:
+        po_number = _lower(entry.get("po_number"))
+        return (kind, file_hash, seq, po_number, _po_core(po_number), _lower(entry.get("vendor")),
+                json.dumps(entry, ensure_ascii=False, default=str))
+
+    @staticmethod
+    def _put_po_grams(conn: sqlite3.Connection, kind: str, file_hash: str, core: str):
+        conn.execute("DELETE FROM index_po_grams WHERE kind = ? AND file_hash = ?", (kind, file_hash))
+        conn.executemany("INSERT OR IGNORE INTO index_po_grams(kind, gram, file_hash) VALUES(?, ?, ?)",
+                         [(kind, gram, file_hash) for gram in _po_grams(core)])
+
+    def _rebuild_po_grams(self):
+        """Fill index_po_grams from the stored index entries."""
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("DELETE FROM index_po_grams")
+            for kind, file_hash, core in conn.execute(
+                    "SELECT kind, file_hash, po_core FROM index_entries WHERE po_core != ''").fetchall():
+                self._put_po_grams(conn, kind, file_hash, core)
+            conn.execute("INSERT INTO meta(key, value) VALUES('po_grams', '1') "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value")
+            conn.commit()
+
+    def put_index_entry(self, kind: str, file_hash: str, entry: Dict[str, Any]):
+        """Insert or update an index entry; an update keeps the entry's original position."""
+        with self._write_lock:
+            conn = self._conn()
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM index_entries WHERE kind = ?",
+                               (kind,)).fetchone()[0]
+            row = self._index_row(kind, file_hash, entry, seq)
+            conn.execute(
+                "INSERT INTO index_entries(kind, file_hash, seq, po_number, po_core, vendor, entry) "
+                "VALUES(?, ?, ?, ?, ?, ?, ?) ON CONFLICT(kind, file_hash) DO UPDATE SET "
+                "po_number = excluded.po_number, po_core = excluded.po_core, "
+                "vendor = excluded.vendor, entry = excluded.entry",
+                row)
+            self._put_po_grams(conn, kind, file_hash, row[4])
+            conn.commit()
+
+    def replace_index(self, kind: str, index: Dict[str, Any]):
+        """Replace all entries of one kind, keeping the dict order."""
+        rows = [self._index_row(kind, file_hash, entry, seq)
+                for seq, (file_hash, entry) in enumerate(index.items(), start=1)
+                if isinstance(entry, dict)]
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("DELETE FROM index_entries WHERE kind = ?", (kind,))
+            conn.execute("DELETE FROM index_po_grams WHERE kind = ?", (kind,))
+            conn.executemany(
+                "INSERT INTO index_entries(kind, file_hash, seq, po_number, po_core, vendor, entry) "
+                "VALUES(?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT OR IGNORE INTO index_po_grams(kind, gram, file_hash) VALUES(?, ?, ?)",
+                             [(kind, gram, row[1]) for row in rows for gram in _po_grams(row[4])])
+            conn.commit()
+
+    def get_index_entry(self, kind: str, file_hash: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT entry FROM index_entries WHERE kind = ? AND file_hash = ?",
+                                   (kind, file_hash)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete_index_entry(self, kind: str, file_hash: str) -> bool:
+        with self._write_lock:
+            conn = self._conn()
+            deleted = conn.execute("DELETE FROM index_entries WHERE kind = ? AND file_hash = ?",
+                                   (kind, file_hash)).rowcount
+            conn.execute("DELETE FROM index_po_grams WHERE kind = ? AND file_hash = ?", (kind, file_hash))
+            conn.commit()
+            return deleted > 0
+
+    def load_index(self, kind: str) -> Dict[str, Any]:
+        """All entries of one kind as {file_hash: entry}, in insertion order."""
+        rows = self._conn().execute("SELECT file_hash, entry FROM index_entries WHERE kind = ? ORDER BY seq",
+                                    (kind,)).fetchall()
+        return {file_hash: json.loads(entry) for file_hash, entry in rows}
+
+    def load_index_shard(self, kind: str, shard: str) -> Dict[str, Any]:
+        """
+        Entries of one kind whose file hash starts with the hex digit shard (either case),
+        as {file_hash: entry} in insertion order. Primary-key range scans, not a full read.
+        """
+        bounds = {(shard.lower(), chr(ord(shard.lower()) + 1)), (shard.upper(), chr(ord(shard.upper()) + 1))}
+        rows = []
+        for low, high in bounds:
+            rows.extend(self._conn().execute(
+                "SELECT seq, file_hash, entry FROM index_entries WHERE kind = ? AND file_hash >= ? AND file_hash < ?",
+                (kind, low, high)).fetchall())
+        rows.sort()
+        return {file_hash: json.loads(entry) for _seq, file_hash, entry in rows}
+
+    def count_index(self, kind: str) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM index_entries WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def iter_po_number_candidates(self, kind: str, normalized_po: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Entries whose PO number equals, contains or is contained in normalized_po
+        (raw or alphanumeric core), in insertion order. Entries without a PO number are skipped.
+
+        Candidates come from indexes, not a table scan: cores equal to a substring of the query
+        core (po_core index), cores containing the query core (trigram postings), and entries
+        whose PO number has no alphanumeric core. Raw containment implies core containment,
+        so these cover every match; each candidate is verified with the original conditions.
+        """
+        core = _po_core(normalized_po)
+        conn = self._conn()
+        match_sql = ("po_number != '' AND ("
+                     "instr(po_number, ?) > 0 OR instr(?, po_number) > 0 OR "
+                     "(? != '' AND po_core != '' AND (instr(po_core, ?) > 0 OR instr(?, po_core) > 0)))")
+        match_params = (normalized_po, normalized_po, core, core, core)
+        if not core:
+            # No alphanumeric character to index on: check every entry
+            rows = conn.execute(f"SELECT file_hash, entry FROM index_entries WHERE kind = ? AND {match_sql} "
+                                "ORDER BY seq", (kind, *match_params)).fetchall()
+            for file_hash, entry in rows:
+                yield file_hash, json.loads(entry)
+            return
+
+        candidates = set()
+        substrings = sorted({core[i:j] for i in range(len(core)) for j in range(i + 1, len(core) + 1)})
+        for chunk in _chunks(substrings):
+            candidates.update(row[0] for row in conn.execute(
+                f"SELECT file_hash FROM index_entries WHERE kind = ? AND po_core IN ({', '.join('?' * len(chunk))})",
+                (kind, *chunk)))
+        grams = _po_grams(core)
+        if grams:
+            # Intersect the trigram postings (primary key lookups), stopping once empty
+            containing = None
+            for gram in grams:
+                posting = {row[0] for row in conn.execute(
+                    "SELECT file_hash FROM index_po_grams WHERE kind = ? AND gram = ?", (kind, gram))}
+                containing = posting if containing is None else containing & posting
+                if not containing:
+                    break
+            candidates.update(containing or ())
+        else:
+            # Query core shorter than a trigram
+            candidates.update(row[0] for row in conn.execute(
+                "SELECT file_hash FROM index_entries WHERE kind = ? AND instr(po_core, ?) > 0", (kind, core)))
+        candidates.update(row[0] for row in conn.execute(
+            "SELECT file_hash FROM index_entries WHERE kind = ? AND po_core = '' AND po_number != ''", (kind,)))
+
+        rows = []
+        for chunk in _chunks(sorted(candidates)):
+            rows.extend(conn.execute(
+                f"SELECT seq, file_hash, entry FROM index_entries WHERE kind = ? "
+                f"AND file_hash IN ({', '.join('?' * len(chunk))}) AND {match_sql}",
+                (kind, *chunk, *match_params)).fetchall())
+        rows.sort()
+        for _seq, file_hash, entry in rows:
+            yield file_hash, json.loads(entry)
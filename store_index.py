@@ -0,0 +1,179 @@
+"""
+Base for in-memory indexes that follow app.extractions_store, and the store itself.
+
+DirtyTrackingStore records every added, replaced or removed extraction id (and the ids
+passed to save_extractions_to_file for nested edits) once per named index. sync() re-reads
+only those records, and rebuilds when the store object itself was replaced (loaded at
+startup). Subclasses keep their postings in _index/_unindex and answer queries under _lock.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+
+class DirtyTrackingStore(dict):
+    """
+    Dict of extraction_id -> extraction record that remembers which ids were
+    added, replaced or removed since the last save.
+
+    Every mutating dict method (item assignment and deletion, update, setdefault, pop,
+    popitem, clear, |=) marks the ids it touches. Nested edits (e.g.
+    extractions_store[id]["status"] = ...) are not seen here; pass those ids to
+    save_extractions_to_file() explicitly.
+
+    Changed ids are also tracked per in-memory index (take_index_dirty), so each index
+    (ExtractionStoreIndex) syncs independently of persistence, and each id's place in
+    dict order is exposed as position() so the indexes can rank matches the same way.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._dirty: set = set()
+        self._index_dirty: Dict[str, set] = {}
+        self._dirty_lock = threading.Lock()
+        # extraction_id -> insertion sequence; increases in dict order
+        self._positions: Dict[str, int] = {key: position for position, key in enumerate(self)}
+        self._next_position = len(self._positions)
+
+    def position(self, extraction_id: str) -> int:
+        """Place of an id in store order (a larger value means inserted later)."""
+        with self._dirty_lock:
+            return self._positions[extraction_id]
+
+    def mark_dirty(self, *extraction_ids: str):
+        with self._dirty_lock:
+            self._dirty.update(extraction_ids)
+            for pending in self._index_dirty.values():
+                pending.update(extraction_ids)
+
+    def take_dirty(self) -> set:
+        """Return and reset the set of changed extraction ids."""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def take_index_dirty(self, index_name: str) -> set:
+        """Return and reset the ids changed since the named index last synced (tracking starts on the first call)."""
+        with self._dirty_lock:
+            dirty = self._index_dirty.get(index_name, set())
+            self._index_dirty[index_name] = set()
+        return dirty
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            # New (or re-added) ids go to the end of dict order; replacements keep their place
+            with self._dirty_lock:
+                self._positions[key] = self._next_position
+                self._next_position += 1
+        super().__setitem__(key, value)
+        self.mark_dirty(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._forget_position(key)
+        self.mark_dirty(key)
+
+    def pop(self, key, *default):
+        if key in self:
+            self._forget_position(key)
+            self.mark_dirty(key)
+        return super().pop(key, *default)
+
+    def clear(self):
+        self.mark_dirty(*self.keys())
+        super().clear()
+        with self._dirty_lock:
+            self._positions.clear()
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._forget_position(key)
+        self.mark_dirty(key)
+        return key, value
+
+    def _forget_position(self, key):
+        with self._dirty_lock:
+            self._positions.pop(key, None)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return super().__getitem__(key)
+
+    def update(self, *args, **kwargs):
+        # Route through __setitem__ so every added or replaced id is marked
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+
+class ExtractionStoreIndex:
+    """Incrementally maintained index over one extractions store."""
+
+    # Name of this index's dirty-id channel in DirtyTrackingStore
+    index_name = ""
+    # Log tag and label for the rebuild message
+    log_tag = "INDEX"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._store = None
+        # extraction_id -> store position (every record, so one that becomes indexable
+        # later keeps its place)
+        self._positions: Dict[str, int] = {}
+
+    def sync(self, store):
+        """
+        Apply the changes recorded by the store since the last sync; rebuild when the store
+        object was replaced.
+
+        Args:
+            store: DirtyTrackingStore of extraction_id -> extraction record
+        """
+        with self._lock:
+            if store is not self._store:
+                store.take_index_dirty(self.index_name)
+                self._positions.clear()
+                self._clear()
+                self._store = store
+                for extraction_id, extraction in list(store.items()):
+                    self._update(extraction_id, extraction)
+                print(f"[{self.log_tag}] Indexed {len(self)} of {len(store)} extraction(s)")
+                return
+            for extraction_id in store.take_index_dirty(self.index_name):
+                self._update(extraction_id, store.get(extraction_id))
+
+    def _update(self, extraction_id: str, extraction: Optional[Dict[str, Any]]):
+        """Re-index one extraction (None = removed); caller holds the lock."""
+        self._unindex(extraction_id)
+        if extraction is None:
+            self._positions.pop(extraction_id, None)
+            return
+        # Taken from the store, so a batch of inserts or a pop + re-add between syncs
+        # still sorts the way the dict iterates
+        try:
+            self._positions[extraction_id] = self._store.position(extraction_id)
+        except KeyError:
+            # Removed since it was read; that removal is marked for the next sync
+            return
+        if isinstance(extraction, dict):
+            self._index(extraction_id, extraction)
+
+    def _in_store_order(self, extraction_ids) -> list:
+        """Sort ids by store order (caller holds the lock)."""
+        return sorted(extraction_ids, key=self._positions.__getitem__)
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def _index(self, extraction_id: str, extraction: Dict[str, Any]):
+        raise NotImplementedError
+
+    def _unindex(self, extraction_id: str):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
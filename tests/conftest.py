@@ -0,0 +1,46 @@
+"""Shared fixtures: CacheManager instances on a temporary directory, locally or on a fake GCS bucket."""
+
+from pathlib import Path
+
+import pytest
+
+import cache_manager
+from tests.fake_gcs import FakeGCSClient
+
+GCS_BUCKET = "gs://test-bucket/cache/"
+
+
+@pytest.fixture
+def local_env(monkeypatch):
+    """Environment for a local-storage CacheManager (JSON backend, no GCS)."""
+    for name in ("GCS_CACHE_BUCKET", "GCP_CREDENTIALS_JSON", "CACHE_BACKEND", "CACHE_COMPRESSION"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(cache_manager, "GCS_AVAILABLE", False)
+
+
+@pytest.fixture
+def fake_gcs(monkeypatch):
+    """Point CacheManager at an in-memory bucket (synchronous writes, index cache always revalidated)."""
+    client = FakeGCSClient()
+    monkeypatch.setattr(cache_manager, "get_gcs_client", lambda: client, raising=False)
+    monkeypatch.setattr(cache_manager, "GCS_AVAILABLE", True)
+    monkeypatch.setenv("GCS_CACHE_BUCKET", GCS_BUCKET)
+    monkeypatch.setenv("GCS_WRITE_BEHIND", "0")
+    monkeypatch.setenv("INDEX_CACHE_TTL_SECONDS", "0")
+    monkeypatch.delenv("CACHE_BACKEND", raising=False)
+    return client
+
+
+@pytest.fixture
+def new_manager(tmp_path):
+    """Factory of CacheManagers, each with its own local directory (one per simulated instance)."""
+    count = 0
+
+    def make() -> cache_manager.CacheManager:
+        nonlocal count
+        count += 1
+        base = Path(tmp_path) / f"instance{count}"
+        base.mkdir()
+        return cache_manager.CacheManager(base)
+
+    return make
@@ -0,0 +1,126 @@
+"""
+In-memory stand-in for the google-cloud-storage client (tests and benchmarks).
+
+Covers what CacheManager uses: bucket(), blob(), get_blob(), list_blobs(prefix=...),
+upload_from_string(..., if_generation_match=...), download_as_bytes(), exists(), delete(),
+and the generation / md5_hash / size / updated metadata. Every request can be given a
+fixed latency to stand in for the network round trip.
+"""
+
+import base64
+import hashlib
+import itertools
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+
+class PreconditionFailed(Exception):
+    """Raised like google.api_core.exceptions.PreconditionFailed when if_generation_match fails."""
+    code = 412
+
+
+class NotFound(Exception):
+    """Raised like google.api_core.exceptions.NotFound."""
+    code = 404
+
+
+class FakeGCSClient:
+    """Objects of all buckets, keyed by (bucket, name), with generations like GCS."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.objects: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._generations = itertools.count(1)
+
+    def bucket(self, name: str) -> "FakeBucket":
+        return FakeBucket(self, name)
+
+    def _request(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _put(self, key: Tuple[str, str], data: bytes, if_generation_match: Optional[int]) -> int:
+        self._request()
+        with self._lock:
+            current = self.objects.get(key)
+            if if_generation_match is not None and (current["generation"] if current else 0) != if_generation_match:
+                raise PreconditionFailed(f"{key[1]}: generation does not match {if_generation_match}")
+            generation = next(self._generations)
+            self.objects[key] = {
+                "data": data,
+                "generation": generation,
+                "md5_hash": base64.b64encode(hashlib.md5(data).digest()).decode("ascii"),
+                "updated": datetime.now(timezone.utc),
+            }
+            return generation
+
+
+class FakeBucket:
+    def __init__(self, client: FakeGCSClient, name: str):
+        self.client = client
+        self.name = name
+
+    def blob(self, name: str) -> "FakeBlob":
+        """Local handle without metadata, like Bucket.blob() (no request)."""
+        return FakeBlob(self, name)
+
+    def get_blob(self, name: str) -> Optional["FakeBlob"]:
+        self.client._request()
+        with self.client._lock:
+            stored = self.client.objects.get((self.name, name))
+            return FakeBlob(self, name, stored) if stored else None
+
+    def list_blobs(self, prefix: str = ""):
+        self.client._request()
+        with self.client._lock:
+            listed = [(name, stored) for (bucket, name), stored in self.client.objects.items()
+                      if bucket == self.name and name.startswith(prefix)]
+        return [FakeBlob(self, name, stored) for name, stored in sorted(listed, key=lambda item: item[0])]
+
+
+class FakeBlob:
+    def __init__(self, bucket: FakeBucket, name: str, stored: Optional[Dict[str, Any]] = None):
+        self.bucket = bucket
+        self.name = name
+        self.content_encoding = None
+        self._set_metadata(stored)
+
+    def _set_metadata(self, stored: Optional[Dict[str, Any]]):
+        self.generation = stored["generation"] if stored else None
+        self.md5_hash = stored["md5_hash"] if stored else None
+        self.updated = stored["updated"] if stored else None
+        self.size = len(stored["data"]) if stored else None
+
+    @property
+    def _key(self) -> Tuple[str, str]:
+        return self.bucket.name, self.name
+
+    def exists(self) -> bool:
+        self.bucket.client._request()
+        return self._key in self.bucket.client.objects
+
+    def upload_from_string(self, data, content_type: Optional[str] = None,
+                           if_generation_match: Optional[int] = None):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.bucket.client._put(self._key, data, if_generation_match)
+        self._set_metadata(self.bucket.client.objects[self._key])
+
+    def download_as_bytes(self, raw_download: bool = False) -> bytes:
+        self.bucket.client._request()
+        stored = self.bucket.client.objects.get(self._key)
+        if stored is None:
+            raise NotFound(self.name)
+        return stored["data"]
+
+    def delete(self):
+        self.bucket.client._request()
+        with self.bucket.client._lock:
+            if self.bucket.client.objects.pop(self._key, None) is None:
+                raise NotFound(self.name)
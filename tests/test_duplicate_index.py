@@ -0,0 +1,130 @@
+"""DuplicateIndex following a DirtyTrackingStore: inserts, nested edits, deletes and store replacement."""
+
+import random
+
+from duplicate_index import DuplicateIndex, invoice_key, normalize_file_name
+from store_index import DirtyTrackingStore
+from vendor_index import vendor_names_match
+
+
+def invoice(invoice_id: str, vendor: str = "Acme Corp", file_name: str = "inv.pdf", status: str = "completed"):
+    return {
+        "file_name": file_name,
+        "status": status,
+        "extracted_data": {
+            "document_type": "INVOICE",
+            "document_ids": {"invoice_id": invoice_id},
+            "party_names": {"vendor": vendor},
+        },
+    }
+
+
+def scan_invoice(store, invoice_id, vendor="", exclude_id=None):
+    """The check before the index: first completed invoice in the store with the same id and vendor."""
+    key = invoice_id.strip().lower()
+    for extraction_id, extraction in store.items():
+        if extraction_id == exclude_id or invoice_key(extraction) != key:
+            continue
+        if vendor_names_match(vendor, extraction["extracted_data"]["party_names"]["vendor"]):
+            return extraction_id
+    return None
+
+
+def scan_file_name(store, file_name):
+    key = normalize_file_name(file_name)
+    return next((extraction_id for extraction_id, extraction in store.items()
+                 if normalize_file_name(extraction.get("file_name")) == key), None)
+
+
+def test_insert_nested_edit_and_delete_are_picked_up():
+    store = DirtyTrackingStore({"a": invoice("INV-1", file_name="a.pdf")})
+    index = DuplicateIndex()
+    index.sync(store)
+    assert index.find_invoice(" inv-1 ") == "a"
+
+    store["b"] = invoice("INV-2", file_name="b.pdf")
+    index.sync(store)
+    assert index.find_invoice("INV-2") == "b"
+    assert index.find_file_name("B.PDF") == "b"
+
+    # Nested edit: invisible to the store until the id is marked (save_extractions_to_file does this)
+    store["b"]["extracted_data"]["document_ids"]["invoice_id"] = "INV-3"
+    store["b"]["file_name"] = "c.pdf"
+    store.mark_dirty("b")
+    index.sync(store)
+    assert index.find_invoice("INV-3") == "b"
+    assert index.find_invoice("INV-2") is None
+    assert index.find_file_name("b.pdf") is None
+    assert index.find_file_name("c.pdf") == "b"
+
+    del store["a"]
+    store.pop("b")
+    index.sync(store)
+    assert index.find_invoice("INV-1") is None
+    assert index.find_invoice("INV-3") is None
+    assert len(index) == 0
+
+
+def test_every_mutating_dict_method_marks_the_index():
+    store = DirtyTrackingStore()
+    index = DuplicateIndex()
+    index.sync(store)
+    store.update({"a": invoice("INV-1")}, b=invoice("INV-2", file_name="b.pdf"))
+    store.setdefault("c", invoice("INV-3", file_name="c.pdf"))
+    store |= {"d": invoice("INV-4", file_name="d.pdf")}
+    index.sync(store)
+    assert [index.find_invoice(f"INV-{n}") for n in range(1, 5)] == ["a", "b", "c", "d"]
+
+    store.popitem()
+    store.clear()
+    index.sync(store)
+    assert [index.find_invoice(f"INV-{n}") for n in range(1, 5)] == [None] * 4
+
+
+def test_invoice_becomes_indexed_when_it_completes_and_keeps_store_order():
+    store = DirtyTrackingStore({"a": invoice("INV-1", status="processing"), "b": invoice("INV-1")})
+    index = DuplicateIndex()
+    index.sync(store)
+    assert index.find_invoice("INV-1") == "b"
+    store["a"]["status"] = "completed"
+    store.mark_dirty("a")
+    index.sync(store)
+    assert index.find_invoice("INV-1") == "a"
+    assert index.find_invoice("INV-1", exclude_id="a") == "b"
+
+
+def test_replaced_store_is_reindexed():
+    index = DuplicateIndex()
+    index.sync(DirtyTrackingStore({"a": invoice("INV-1")}))
+    replacement = DirtyTrackingStore({"z": invoice("INV-9")})
+    index.sync(replacement)
+    assert index.find_invoice("INV-1") is None
+    assert index.find_invoice("INV-9") == "z"
+
+
+def test_lookups_match_a_scan_of_the_store():
+    rng = random.Random(16)
+    vendors = ["Acme Corp", "ACME Corporation", "Globex", "Initech", ""]
+    store = DirtyTrackingStore()
+    index = DuplicateIndex()
+    index.sync(store)
+    for step in range(2000):
+        extraction_id = f"x{rng.randrange(400)}"
+        roll = rng.random()
+        if roll < 0.6:
+            store[extraction_id] = invoice(f"INV-{rng.randrange(150)}", rng.choice(vendors),
+                                           f"file{rng.randrange(300)}.pdf", rng.choice(["completed", "failed"]))
+        elif roll < 0.8 and extraction_id in store:
+            store[extraction_id]["extracted_data"]["document_ids"]["invoice_id"] = f"inv-{rng.randrange(150)} "
+            store.mark_dirty(extraction_id)
+        else:
+            store.pop(extraction_id, None)
+        if step % 50 == 0:
+            index.sync(store)
+            for _ in range(20):
+                invoice_id, vendor = f"INV-{rng.randrange(150)}", rng.choice(vendors)
+                exclude_id = rng.choice([None, f"x{rng.randrange(400)}"])
+                assert (index.find_invoice(invoice_id, vendor=vendor, exclude_id=exclude_id)
+                        == scan_invoice(store, invoice_id, vendor, exclude_id))
+                file_name = f"FILE{rng.randrange(300)}.pdf "
+                assert index.find_file_name(file_name) == scan_file_name(store, file_name)
@@ -0,0 +1,98 @@
+"""Sharded PO/GRN index on a fake GCS bucket: conditional shard writes, 412 retries and index order."""
+
+import json
+import threading
+
+import pytest
+
+import cache_manager
+from sqlite_store import SQLiteStore
+from tests.fake_gcs import PreconditionFailed
+
+SHARD_A = "a" * 63
+
+
+def entry(po_number: str):
+    return {"po_number": po_number, "vendor": "Acme", "indexed_at": "2024-01-01T00:00:00"}
+
+
+def test_update_retries_after_another_instance_wrote_the_shard(fake_gcs, new_manager):
+    first, second = new_manager(), new_manager()
+    first._put_index_entry("po", SHARD_A + "1", entry("PO-1"))
+    second._put_index_entry("po", SHARD_A + "2", entry("PO-2"))
+
+    # first still holds the shard (and its generation) from before second's write:
+    # its optimistic upload gets a 412, and the retry re-reads the shard
+    first._put_index_entry("po", SHARD_A + "3", entry("PO-3"))
+
+    assert first.get_index_cache_stats()["po"]["write_conflicts"] == 1
+    stored = new_manager()._load_index_snapshot("po")
+    assert list(stored) == [SHARD_A + "1", SHARD_A + "2", SHARD_A + "3"]
+
+
+def test_concurrent_instances_keep_every_entry(fake_gcs, new_manager):
+    managers = [new_manager() for _ in range(4)]
+    for manager in managers:
+        manager._load_index_snapshot("po")
+
+    def save(number, manager):
+        for i in range(10):
+            # Few leading digits, so the instances keep writing the same shards
+            manager._put_index_entry("po", f"{i % 2}{number}{i:062x}", entry(f"PO-{number}-{i}"))
+
+    threads = [threading.Thread(target=save, args=(number, manager)) for number, manager in enumerate(managers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(new_manager()._load_index_snapshot("po")) == 40
+
+
+def test_update_gives_up_when_the_shard_keeps_changing(fake_gcs, new_manager, monkeypatch):
+    manager = new_manager()
+    manager._load_index_snapshot("po")
+    put = fake_gcs._put
+
+    def always_conflicting(key, data, if_generation_match):
+        if key[1].endswith("po_index/a.json"):
+            raise PreconditionFailed(key[1])
+        return put(key, data, if_generation_match)
+
+    monkeypatch.setattr(fake_gcs, "_put", always_conflicting)
+    monkeypatch.setattr(cache_manager.time, "sleep", lambda seconds: None)
+    with pytest.raises(RuntimeError):
+        manager._put_index_entry("po", SHARD_A + "1", entry("PO-1"))
+    assert manager.get_index_cache_stats()["po"]["write_conflicts"] == cache_manager.INDEX_WRITE_RETRIES
+
+
+def test_index_order_survives_a_restart(fake_gcs, new_manager):
+    manager = new_manager()
+    hashes = ["f" * 64, "0" * 64, "8" * 64, "1" * 64]
+    for number, file_hash in enumerate(hashes):
+        manager._put_index_entry("po", file_hash, entry(f"PO-{number}"))
+    # An update keeps the entry's place
+    manager._put_index_entry("po", "0" * 64, entry("PO-1b"))
+
+    assert list(manager._load_index_snapshot("po")) == hashes
+    assert list(new_manager()._load_index_snapshot("po")) == hashes
+
+
+def test_legacy_single_file_index_is_split_in_order(fake_gcs, new_manager):
+    legacy = {file_hash: entry(f"PO-{number}") for number, file_hash in enumerate(["c" * 64, "3" * 64, "a" * 64])}
+    bucket = fake_gcs.bucket("test-bucket")
+    bucket.blob("cache/po_cache/po_index.json").upload_from_string(json.dumps(legacy, indent=2))
+
+    assert list(new_manager()._load_index_snapshot("po")) == list(legacy)
+    assert {name for _, name in fake_gcs.objects if "/po_index/" in name} == {
+        f"cache/po_cache/po_index/{shard}.json" for shard in cache_manager.INDEX_SHARDS}
+
+
+def test_sqlite_shard_backup_reads_only_that_shard(tmp_path):
+    store = SQLiteStore(tmp_path / "cache.db")
+    index = {"a1" + "0" * 62: entry("PO-1"), "b1" + "0" * 62: entry("PO-2"),
+             "A2" + "0" * 62: entry("PO-3"), "a3" + "0" * 62: entry("PO-4")}
+    store.replace_index("po", index)
+    assert list(store.load_index_shard("po", "a")) == ["a1" + "0" * 62, "A2" + "0" * 62, "a3" + "0" * 62]
+    assert list(store.load_index_shard("po", "b")) == ["b1" + "0" * 62]
+    assert store.load_index_shard("po", "c") == {}
@@ -0,0 +1,140 @@
+"""_match_line_items (score-based assignment) checked against the greedy matcher it replaced."""
+
+import random
+from typing import Dict, List
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import po_matcher
+from po_matcher import _match_line_items, _normalize, _parse_qty
+
+
+def greedy_match_line_items(invoice_items: List[dict], reference_items: List[dict], ref_label: str) -> List[str]:
+    """The matcher before score-based assignment: first eligible reference item wins."""
+    issues: List[str] = []
+    if not invoice_items and not reference_items:
+        return issues
+
+    ref_by_desc: Dict[str, dict] = {}
+    for item in (reference_items or []):
+        desc = _normalize(item.get("description", ""))
+        if desc:
+            ref_by_desc[desc] = item
+
+    matched_refs = set()
+    for inv_item in (invoice_items or []):
+        inv_desc = _normalize(inv_item.get("description", ""))
+        inv_qty = _parse_qty(inv_item.get("quantity"))
+        if not inv_desc:
+            continue
+
+        best_key = None
+        for ref_key in ref_by_desc:
+            if ref_key == inv_desc or ref_key in inv_desc or inv_desc in ref_key:
+                best_key = ref_key
+                break
+        if not best_key:
+            inv_tokens = set(inv_desc.split())
+            for ref_key in ref_by_desc:
+                ref_tokens = set(ref_key.split())
+                common = inv_tokens & ref_tokens
+                if len(common) >= max(1, min(len(inv_tokens), len(ref_tokens)) * 0.5):
+                    best_key = ref_key
+                    break
+
+        if best_key:
+            matched_refs.add(best_key)
+            ref_item = ref_by_desc[best_key]
+            ref_qty = _parse_qty(ref_item.get("quantity"))
+            if inv_qty > 0 and ref_qty > 0 and inv_qty > ref_qty:
+                issues.append(
+                    f"Item '{inv_item.get('description', inv_desc)}': Invoice qty ({inv_qty}) exceeds {ref_label} qty ({ref_qty})"
+                )
+        else:
+            issues.append(
+                f"Item '{inv_item.get('description', inv_desc)}' not found in {ref_label}"
+            )
+
+    for ref_key, ref_item in ref_by_desc.items():
+        if ref_key not in matched_refs:
+            issues.append(
+                f"Item '{ref_item.get('description', ref_key)}' in {ref_label} but not in Invoice"
+            )
+    return issues
+
+
+WORDS = ["steel", "bolt", "washer", "copper", "cable", "pvc", "pipe", "valve", "brass", "gasket",
+         "motor", "pump", "filter", "bearing", "hose", "clamp", "nozzle", "sensor", "relay", "switch",
+         "panel", "fuse", "glove", "helmet", "paint", "primer", "brush", "tape", "drill", "screw"]
+
+
+def random_document(rng: random.Random):
+    """Reference items with distinct words, and an invoice that rewords, drops, adds and reorders them."""
+    words = rng.sample(WORDS, len(WORDS))
+    reference = []
+    for _ in range(rng.randint(1, 6)):
+        if len(words) < 3:
+            break
+        size = rng.randint(1, 3)
+        name, words = words[:size], words[size:]
+        reference.append({"description": " ".join(name).title(), "quantity": rng.randint(1, 50)})
+    invoice = []
+    for item in reference:
+        if rng.random() < 0.15:
+            continue
+        description = item["description"]
+        roll = rng.random()
+        if roll < 0.3:
+            description = description.upper() + "  "
+        elif roll < 0.6:
+            description = f"{description} - {rng.choice(['Grade A', 'Pack', 'Set'])}"
+        quantity = item["quantity"] + rng.choice([0, 0, 1, -1, 5])
+        invoice.append({"description": description, "quantity": rng.choice([quantity, str(quantity), ""])})
+    for _ in range(rng.randint(0, 2)):
+        if words:
+            invoice.append({"description": words.pop().title(), "quantity": rng.randint(1, 9)})
+    if rng.random() < 0.1:
+        invoice.append({"description": "", "quantity": 1})
+    rng.shuffle(invoice)
+    return invoice, reference
+
+
+@pytest.fixture(params=["hungarian", "greedy"])
+def assignment(request, monkeypatch):
+    if request.param == "hungarian" and not po_matcher.SCIPY_AVAILABLE:
+        pytest.skip("scipy not installed")
+    monkeypatch.setattr(po_matcher, "SCIPY_AVAILABLE", request.param == "hungarian")
+    return request.param
+
+
+def test_same_issues_as_the_greedy_matcher_on_random_documents(assignment):
+    rng = random.Random(13)
+    for _ in range(300):
+        invoice, reference = random_document(rng)
+        assert _match_line_items(invoice, reference, "GRN") == greedy_match_line_items(invoice, reference, "GRN")
+
+
+def test_generic_line_does_not_take_a_later_lines_reference(assignment):
+    reference = [{"description": "Steel bolt M8", "quantity": 10}, {"description": "Steel bolt M10", "quantity": 4}]
+    invoice = [{"description": "Steel bolt", "quantity": 4}, {"description": "Steel bolt M8", "quantity": 10}]
+    assert greedy_match_line_items(invoice, reference, "PO") == ["Item 'Steel bolt M10' in PO but not in Invoice"]
+    assert _match_line_items(invoice, reference, "PO") == []
+
+
+def test_split_invoice_line_falls_back_to_its_best_match(assignment):
+    reference = [{"description": "Copper cable 2.5mm", "quantity": 100}]
+    invoice = [{"description": "Copper cable 2.5mm", "quantity": 60},
+               {"description": "Copper cable 2.5mm roll 2", "quantity": 40}]
+    assert _match_line_items(invoice, reference, "PO") == []
+
+
+def test_quantity_and_missing_items_are_reported(assignment):
+    reference = [{"description": "PVC pipe", "quantity": 5}, {"description": "Brass valve", "quantity": 2}]
+    invoice = [{"description": "pvc pipe", "quantity": "7"}, {"description": "Rubber gasket", "quantity": 1}]
+    assert _match_line_items(invoice, reference, "GRN") == [
+        "Item 'pvc pipe': Invoice qty (7.0) exceeds GRN qty (5.0)",
+        "Item 'Rubber gasket' not found in GRN",
+        "Item 'Brass valve' in GRN but not in Invoice",
+    ]
@@ -0,0 +1,95 @@
+"""PO-number lookups through PONumberIndex / SQLite checked against the original scan over every entry."""
+
+import random
+import re
+
+import pytest
+
+GRN_HASH = "e" * 64
+
+
+def random_po_number(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.03:
+        return "--"
+    if roll < 0.06:
+        return ""
+    return (rng.choice(["PO-", "po/", "", "ORD ", "4500"]) + str(rng.randint(1, 9999))
+            + rng.choice(["", "-A", "/23", "b"]))
+
+
+def scan_matches(index, normalized_po):
+    """(score, file_hash) of every matching entry in index order, scored as before the index existed."""
+    core = re.sub(r'[^a-z0-9]', '', normalized_po)
+    matches = []
+    for file_hash, entry in index.items():
+        entry_po = (entry.get("po_number", "") or "").strip().lower()
+        if not entry_po:
+            continue
+        entry_core = re.sub(r'[^a-z0-9]', '', entry_po)
+        if entry_po == normalized_po:
+            matches.append((100, file_hash))
+        elif core and entry_core and (core in entry_core or entry_core in core):
+            matches.append((90, file_hash))
+        elif normalized_po in entry_po or entry_po in normalized_po:
+            matches.append((85, file_hash))
+    return matches
+
+
+def scan_find_po(index, po_number):
+    """The original find_po_by_number loop: first exact match, else the first entry with the best score."""
+    best = None
+    for score, file_hash in scan_matches(index, po_number.strip().lower()):
+        if score == 100:
+            return file_hash
+        if best is None or score > best[0]:
+            best = (score, file_hash)
+    return best[1] if best else None
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def manager(request, local_env, monkeypatch, new_manager):
+    monkeypatch.setenv("CACHE_BACKEND", request.param)
+    monkeypatch.delenv("CACHE_SQLITE_PATH", raising=False)
+    return new_manager()
+
+
+def test_lookups_match_a_full_scan(manager):
+    rng = random.Random(3)
+    index = {}
+    hashes = [f"{rng.getrandbits(256):064x}" for _ in range(600)]
+    for number, file_hash in enumerate(hashes):
+        index[file_hash] = {"po_number": random_po_number(rng), "file_hash": file_hash, "index_seq": number}
+        manager._put_index_entry("po", file_hash, dict(index[file_hash]))
+    # Updates keep their place, deletes drop out, and the in-memory index follows both
+    for file_hash in rng.sample(hashes, 40):
+        index[file_hash] = {**index[file_hash], "po_number": random_po_number(rng)}
+        manager._put_index_entry("po", file_hash, dict(index[file_hash]))
+    for file_hash in rng.sample(hashes, 40):
+        if file_hash in index:
+            del index[file_hash]
+            manager._delete_index_entry("po", file_hash)
+
+    stored = [entry["po_number"] for entry in index.values() if len(entry["po_number"]) > 4]
+    queries = ([random_po_number(rng) for _ in range(150)]
+               + [po_number[1:5] for po_number in rng.sample(stored, 50)]
+               + ["PO-12", "4500", "-", "a", " po-77 ", "PO--77"])
+    for query in queries:
+        normalized = query.strip().lower()
+        if not normalized:
+            # find_po_by_number / find_grn_by_po_number return early for blank PO numbers
+            continue
+        found = [(score, file_hash) for score, file_hash, _ in manager._match_po_number("po", normalized)]
+        assert found == scan_matches(index, normalized), query
+        result = manager.find_po_by_number(query)
+        assert (result or {}).get("file_hash") == scan_find_po(index, query), query
+
+
+def test_grn_lookup_by_po_number(manager):
+    manager._put_index_entry("grn", "1" * 64, {"po_number": "PO-100", "file_hash": "1" * 64})
+    manager._put_index_entry("grn", GRN_HASH, {"po_number": "PO-1001", "file_hash": GRN_HASH})
+    assert manager.find_grn_by_po_number("po-1001")["file_hash"] == "1" * 64
+    assert manager.find_grn_by_po_number("PO-1001-X")["file_hash"] == "1" * 64
+    manager._delete_index_entry("grn", "1" * 64)
+    assert manager.find_grn_by_po_number("po-1001")["file_hash"] == GRN_HASH
+    assert manager.find_grn_by_po_number("PO-2") is None
@@ -0,0 +1,91 @@
+"""SQLiteStore index lookups checked against brute-force scans of the same entries."""
+
+import random
+import re
+
+import pytest
+
+from sqlite_store import SQLiteStore, _lower
+
+
+def random_po_number(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.05:
+        return "--"
+    if roll < 0.1:
+        return ""
+    return (rng.choice(["PO-", "po/", "", "ORD ", "4500"]) + str(rng.randint(1, 99999))
+            + rng.choice(["", "-A", "/23", "b"]))
+
+
+def brute_force_candidates(index, normalized_po):
+    """The original filter: raw or alphanumeric-core containment either way, in index order."""
+    core = re.sub(r'[^a-z0-9]', '', normalized_po)
+    matches = []
+    for file_hash, entry in index.items():
+        po_number = _lower(entry.get("po_number"))
+        if not po_number:
+            continue
+        po_core = re.sub(r'[^a-z0-9]', '', po_number)
+        if (normalized_po in po_number or po_number in normalized_po
+                or (core and po_core and (core in po_core or po_core in core))):
+            matches.append(file_hash)
+    return matches
+
+
+def queries(rng: random.Random, index):
+    """Random PO numbers, pieces cut out of stored ones (query within entry), and edge cases."""
+    stored = [_lower(entry["po_number"]) for entry in index.values() if len(entry["po_number"]) > 4]
+    pieces = []
+    for po_number in rng.sample(stored, 100):
+        start = rng.randrange(len(po_number) - 3)
+        pieces.append(po_number[start:start + rng.randint(3, 5)])
+    return ([_lower(random_po_number(rng)) for _ in range(200)] + pieces
+            + ["po-4512", "45", "4", "-", "po-", "a", "", "4500123456"])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteStore(tmp_path / "cache.db")
+
+
+def test_po_number_candidates_match_brute_force(store):
+    rng = random.Random(7)
+    index = {f"{i:064x}": {"po_number": random_po_number(rng)} for i in range(3000)}
+    store.replace_index("po", index)
+    # Updates keep their position; inserts go last; deletes disappear
+    for i in rng.sample(range(3000), 200):
+        index[f"{i:064x}"] = {"po_number": random_po_number(rng)}
+        store.put_index_entry("po", f"{i:064x}", index[f"{i:064x}"])
+    for i in rng.sample(range(3000), 100):
+        del index[f"{i:064x}"]
+        store.delete_index_entry("po", f"{i:064x}")
+    index["f" * 64] = {"po_number": "PO-4512"}
+    store.put_index_entry("po", "f" * 64, index["f" * 64])
+
+    for query in queries(rng, index):
+        found = [file_hash for file_hash, _ in store.iter_po_number_candidates("po", query)]
+        assert found == brute_force_candidates(index, query), query
+
+
+def test_po_number_candidates_are_per_kind(store):
+    store.replace_index("po", {"a" * 64: {"po_number": "PO-1001"}})
+    store.replace_index("grn", {"b" * 64: {"po_number": "PO-1001"}})
+    assert [h for h, _ in store.iter_po_number_candidates("grn", "po-1001")] == ["b" * 64]
+
+
+def test_po_grams_backfilled_for_existing_database(tmp_path):
+    rng = random.Random(11)
+    index = {f"{i:064x}": {"po_number": random_po_number(rng)} for i in range(500)}
+    store = SQLiteStore(tmp_path / "cache.db")
+    store.replace_index("po", index)
+    # A database written before index_po_grams existed
+    conn = store._conn()
+    conn.execute("DELETE FROM index_po_grams")
+    conn.execute("DELETE FROM meta WHERE key = 'po_grams'")
+    conn.commit()
+
+    reopened = SQLiteStore(tmp_path / "cache.db")
+    for query in queries(rng, index):
+        found = [file_hash for file_hash, _ in reopened.iter_po_number_candidates("po", query)]
+        assert found == brute_force_candidates(index, query), query
@@ -0,0 +1,344 @@
+"""
+Vendor / customer name normalization and the in-memory name index used for PO fallback matching.
+
+CacheManager.find_po_by_details (invoice without a PO number) scores POs on vendor and
+customer names: one name containing the other, or a word-overlap ratio of at least 0.5.
+Instead of tokenizing every PO on every call, VendorIndex keeps per-entry token sets and
+blocking keys and returns only POs that can score on a name:
+
+- containment: SubstringIndex over the lowercased names (substring lookups + trigram postings)
+- word overlap: token -> names postings. A name with overlap >= t * max(|A|, |B|) must share
+  at least ceil(t * |A|) of the query's |A| tokens, so it shares at least one of the
+  |A| - ceil(t * |A|) + 1 rarest query tokens (prefix filter; rarity = document frequency,
+  i.e. IDF order). Only those postings are read, so common words like "pvt" or "ltd" do
+  not pull in every PO.
+
+Scores are still computed with the original rules on the candidates, so the best match is
+unchanged. Edit-distance scoring (e.g. rapidfuzz cdist) would change which POs match, so it
+is not used here.
+
+po_matcher uses vendor_names_match() for the invoice-vs-PO vendor check, with the same
+normalization and noise-word list.
+"""
+
+import math
+import re
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+from po_number_index import ShardedEntryIndex, SubstringIndex
+
+
+# Legal-form and generic words ignored when comparing vendor names token by token
+COMPANY_NOISE_WORDS = frozenset({
+    'pvt', 'ltd', 'llp', 'inc', 'llc', 'co', 'corp', 'company', 'limited', 'private',
+    'services', 'solutions', 'india', 'technologies', 'technology', 'the',
+})
+
+# Word-overlap ratio at which two names count as a fuzzy match
+FUZZY_THRESHOLD = 0.5
+
+_WHITESPACE = re.compile(r'\s+')
+_NON_AMOUNT = re.compile(r'[^\d.]')
+
+
+def normalize_party_name(text: Optional[str]) -> str:
+    """Lowercase, strip, collapse whitespace."""
+    return _WHITESPACE.sub(' ', (text or "").strip().lower())
+
+
+def name_tokens(text: Optional[str]) -> FrozenSet[str]:
+    """Lowercased whitespace-separated words of a name."""
+    return frozenset((text or "").lower().split())
+
+
+def word_overlap(words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+    """Shared words / words in the longer name (0.0 if either is empty)."""
+    if not words1 or not words2:
+        return 0.0
+    return len(words1 & words2) / max(len(words1), len(words2))
+
+
+def parse_amount(amount: Any) -> Optional[float]:
+    """Numeric value of an amount string ("INR 1,234.50" -> 1234.5), None if it has none."""
+    digits = _NON_AMOUNT.sub('', str(amount or ""))
+    if not digits:
+        return None
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+
+def vendor_names_match(invoice_vendor: str, po_vendor: str) -> bool:
+    """Check whether vendor/supplier names are a reasonable match."""
+    a = normalize_party_name(invoice_vendor)
+    b = normalize_party_name(po_vendor)
+    if not a or not b:
+        return True  # if one side is blank we can't verify – allow
+    if a == b or a in b or b in a:
+        return True
+    a_clean = frozenset(a.split()) - COMPANY_NOISE_WORDS
+    b_clean = frozenset(b.split()) - COMPANY_NOISE_WORDS
+    return word_overlap(a_clean, b_clean) >= 0.5
+
+
+class PartyFields(NamedTuple):
+    """Precomputed match fields of one PO index entry."""
+    vendor: str
+    vendor_words: FrozenSet[str]
+    customer: str
+    customer_words: FrozenSet[str]
+    amount: Optional[float]
+
+
+def party_fields(entry: Dict[str, Any]) -> PartyFields:
+    """Match fields of a PO index entry (names stripped and lowercased, amount parsed)."""
+    vendor = str(entry.get("vendor", "") or "").strip().lower()
+    customer = str(entry.get("customer", "") or "").strip().lower()
+    return PartyFields(vendor, name_tokens(vendor), customer, name_tokens(customer),
+                       parse_amount(str(entry.get("total_amount", "") or "").strip()))
+
+
+class PartyQuery:
+    """Invoice vendor/customer/amount prepared once per search."""
+
+    def __init__(self, vendor: str = "", customer: str = "", amount: str = ""):
+        self.has_vendor = bool(vendor)
+        self.has_customer = bool(customer)
+        self.vendor = vendor.strip().lower() if vendor else ""
+        self.customer = customer.strip().lower() if customer else ""
+        self.vendor_words = name_tokens(vendor)
+        self.customer_words = name_tokens(customer)
+        self.amount = parse_amount(amount) if amount else None
+
+
+def score_party_match(query: PartyQuery, fields: PartyFields) -> Tuple[int, List[str]]:
+    """
+    Score a PO against an invoice: vendor (50 contained / 40 fuzzy / 45 invoice customer in
+    PO vendor), customer (40 / 30 / 35 invoice vendor in PO customer), amount (30).
+
+    Returns:
+        (score, match_details)
+    """
+    score = 0
+    match_details = []
+
+    # Vendor matching (highest weight - 50 points)
+    if query.has_vendor and fields.vendor:
+        # Check if vendor names match (either contains the other)
+        if query.vendor in fields.vendor or fields.vendor in query.vendor:
+            score += 50
+            match_details.append("Vendor exact: +50")
+        elif word_overlap(query.vendor_words, fields.vendor_words) >= FUZZY_THRESHOLD:
+            score += 40
+            match_details.append("Vendor fuzzy: +40")
+        # Also check if invoice customer matches PO vendor (reversed roles)
+        elif query.has_customer and query.customer in fields.vendor:
+            score += 45
+            match_details.append("Customer matches PO Vendor: +45")
+
+    # Customer matching (40 points)
+    if query.has_customer and fields.customer:
+        if query.customer in fields.customer or fields.customer in query.customer:
+            score += 40
+            match_details.append("Customer exact: +40")
+        elif word_overlap(query.customer_words, fields.customer_words) >= FUZZY_THRESHOLD:
+            score += 30
+            match_details.append("Customer fuzzy: +30")
+        # Also check if invoice vendor matches PO customer (reversed roles)
+        elif query.has_vendor and query.vendor in fields.customer:
+            score += 35
+            match_details.append("Vendor matches PO Customer: +35")
+
+    # Amount matching (30 points - important confirmation)
+    if query.amount is not None and fields.amount is not None and abs(query.amount - fields.amount) < 0.01:
+        score += 30
+        match_details.append("Amount match: +30")
+
+    return score, match_details
+
+
+class _NameField:
+    """Postings for one name field (vendor or customer). Not thread-safe; VendorIndex locks."""
+
+    def __init__(self):
+        self.names = SubstringIndex()
+        self.tokens: Dict[str, Set[str]] = {}
+        self.words: Dict[str, FrozenSet[str]] = {}
+
+    def add(self, name: str, file_hash: str):
+        if name not in self.names:
+            self.words[name] = name_tokens(name)
+            for token in self.words[name]:
+                self.tokens.setdefault(token, set()).add(name)
+        self.names.add(name, file_hash)
+
+    def remove(self, name: str, file_hash: str):
+        self.names.remove(name, file_hash)
+        if name in self.names:
+            return
+        for token in self.words.pop(name, ()):
+            posting = self.tokens.get(token)
+            if posting is not None:
+                posting.discard(name)
+                if not posting:
+                    del self.tokens[token]
+
+    def clear(self):
+        self.names.clear()
+        self.tokens.clear()
+        self.words.clear()
+
+    def overlapping(self, words: FrozenSet[str], threshold: float) -> Set[str]:
+        """Names sharing >= threshold of the longer name's words with the query words."""
+        if not words:
+            return set()
+        required = max(1, math.ceil(threshold * len(words)))
+        prefix = sorted(words, key=lambda token: len(self.tokens.get(token, ())))[:len(words) - required + 1]
+        found = set()
+        for token in prefix:
+            found.update(self.tokens.get(token, ()))
+        return {name for name in found if word_overlap(words, self.words[name]) >= threshold}
+
+
+class VendorIndex(ShardedEntryIndex):
+    """Vendor/customer name index over the PO index shards."""
+
+    def __init__(self):
+        super().__init__()
+        self._vendors = _NameField()
+        self._customers = _NameField()
+        # Amount in cents -> entries
+        self._amounts: Dict[int, Set[str]] = {}
+
+    def search(self, vendor: str = "", customer: str = "",
+               amount: str = "") -> List[Tuple[int, str, List[str]]]:
+        """
+        Score the POs that can be the best match for an invoice's vendor/customer/amount.
+
+        Name scores need a vendor- or customer-name candidate; amount alone (30) is below the
+        match minimum. POs matching only on customer name score at most 40, so they are
+        considered only when no vendor-name or customer+amount candidate scores above that,
+        and then only the first of them in index order.
+
+        Returns:
+            [(score, file_hash, match_details)] in index order, scores > 0
+        """
+        query = PartyQuery(vendor, customer, amount)
+        with self._lock:
+            if (vendor and not query.vendor) or (customer and not query.customer):
+                # A blank-but-not-empty name is contained in every name: nothing to narrow
+                scored = self._score_entries(self._entries, query)
+                scored.sort(key=lambda item: item[0])
+                return [(score, file_hash, details) for _order, score, file_hash, details in scored]
+
+            customer_names = set()
+            if query.vendor:
+                customer_names |= self._customers.names.containing(query.vendor)
+            if query.customer:
+                customer_names |= self._customers.names.within(query.customer)
+                customer_names |= self._customers.names.containing(query.customer)
+                customer_names |= self._customers.overlapping(query.customer_words, FUZZY_THRESHOLD)
+
+            # Customer-name candidates that also match on amount
+            hashes = {file_hash for file_hash in self._amount_hashes(query.amount)
+                      if self._entries[file_hash][0].customer in customer_names}
+            scored = self._score_entries(hashes, query)
+
+            # Vendor names containing / contained in the invoice vendor (50), or containing the
+            # invoice customer (45); then word-overlap matches (40). A group whose vendor points
+            # plus the most customer and amount can add stays below the best score so far cannot
+            # win or tie, so it is skipped
+            rest_max = (40 if query.has_customer else 0) + (30 if query.amount is not None else 0)
+            vendor_names = set()
+            if query.vendor:
+                vendor_names |= self._vendors.names.within(query.vendor)
+                vendor_names |= self._vendors.names.containing(query.vendor)
+            if query.customer:
+                vendor_names |= self._vendors.names.containing(query.customer)
+            for fuzzy in (False, True):
+                best = max((item[1] for item in scored), default=0)
+                if fuzzy:
+                    if not query.vendor or 40 + rest_max < best:
+                        break
+                    vendor_names = self._vendors.overlapping(query.vendor_words, FUZZY_THRESHOLD) - vendor_names
+                groups: Dict[int, Set[str]] = {}
+                for name in vendor_names:
+                    points, _details = score_party_match(query, PartyFields(name, self._vendors.words[name], "", frozenset(), None))
+                    if points:
+                        groups.setdefault(points, set()).update(self._vendors.names.hashes(name))
+                for points in sorted(groups, reverse=True):
+                    if points + rest_max < max((item[1] for item in scored), default=0):
+                        break
+                    group = groups[points] - hashes
+                    if not rest_max and group:
+                        # Every entry of the group scores exactly its vendor points: the first one wins
+                        group = {min(group, key=lambda file_hash: self._entries[file_hash][1])}
+                    hashes |= group
+                    scored += self._score_entries(group, query)
+
+            if max((item[1] for item in scored), default=0) <= 40 and customer_names:
+                # The rest score on customer name alone, so the score is per name: add the
+                # earliest entry of the best-scoring names
+                name_scores: Dict[int, List[str]] = {}
+                for name in customer_names:
+                    points, _details = score_party_match(query, PartyFields("", frozenset(), name, self._customers.words[name], None))
+                    name_scores.setdefault(points, []).append(name)
+                top = max(name_scores)
+                rest = [(self._entries[file_hash][1], file_hash) for name in (name_scores[top] if top else [])
+                        for file_hash in self._customers.names.hashes(name) if file_hash not in hashes]
+                if rest:
+                    scored += self._score_entries([min(rest)[1]], query)
+
+        scored.sort(key=lambda item: item[0])
+        return [(score, file_hash, details) for _order, score, file_hash, details in scored]
+
+    def _score_entries(self, hashes, query: PartyQuery) -> List[Tuple[Tuple[int, int], int, str, List[str]]]:
+        """Score entries (caller holds the lock); returns [(order, score, file_hash, details)] for scores > 0."""
+        scored = []
+        for file_hash in hashes:
+            fields, order = self._entries[file_hash]
+            score, details = score_party_match(query, fields)
+            if score:
+                scored.append((order, score, file_hash, details))
+        return scored
+
+    def _amount_hashes(self, amount: Optional[float]) -> Set[str]:
+        """Entries whose amount is within 0.01 of the given amount."""
+        if amount is None:
+            return set()
+        cents = round(amount * 100)
+        found = set()
+        for key in (cents - 1, cents, cents + 1):
+            for file_hash in self._amounts.get(key, ()):
+                if abs(self._entries[file_hash][0].amount - amount) < 0.01:
+                    found.add(file_hash)
+        return found
+
+    def _entry_key(self, entry: Dict[str, Any]) -> PartyFields:
+        return party_fields(entry)
+
+    def _add_key(self, file_hash: str, key: PartyFields):
+        if key.amount is not None:
+            self._amounts.setdefault(round(key.amount * 100), set()).add(file_hash)
+        if key.vendor:
+            self._vendors.add(key.vendor, file_hash)
+        if key.customer:
+            self._customers.add(key.customer, file_hash)
+
+    def _remove_key(self, file_hash: str, key: PartyFields):
+        if key.amount is not None:
+            hashes = self._amounts.get(round(key.amount * 100))
+            if hashes is not None:
+                hashes.discard(file_hash)
+                if not hashes:
+                    del self._amounts[round(key.amount * 100)]
+        if key.vendor:
+            self._vendors.remove(key.vendor, file_hash)
+        if key.customer:
+            self._customers.remove(key.customer, file_hash)
+
+    def _clear_keys(self):
+        self._vendors.clear()
+        self._customers.clear()
+        self._amounts.clear()
@@ -0,0 +1,208 @@
+"""
+Write-behind queue for mirroring cache blobs to GCS.
+
+CacheManager persists locally first and enqueues the GCS upload here, so request
+latency no longer includes the GCS round trip. Repeated writes to the same object
+are coalesced (only the newest payload is uploaded), uploads run in batches on a
+background thread with exponential backoff on failure, and the queue is flushed on
+shutdown.
+
+Environment:
+    GCS_WRITE_BEHIND: "1" (default) to mirror in the background, "0" to upload synchronously
+    GCS_WRITE_BATCH_SIZE: uploads started per batch (default 16)
+    GCS_WRITE_MAX_RETRIES: attempts per payload before it is dropped (default 8)
+"""
+
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class WriteBehindQueue:
+    """Coalescing background uploader keyed by GCS URI."""
+
+    def __init__(self, upload_fn: Callable[[str, bytes], Any], batch_size: int = 16,
+                 max_retries: int = 8, base_backoff: float = 0.5, max_backoff: float = 30.0):
+        """
+        Initialize the queue and start its worker thread.
+
+        Args:
+            upload_fn: upload_fn(gcs_path, payload) uploads one blob; must raise (or return
+                a falsy value) on failure
+            batch_size: Maximum uploads started concurrently per batch
+            max_retries: Attempts per payload before it is dropped
+            base_backoff: First retry delay in seconds (doubles per attempt)
+            max_backoff: Upper bound for the retry delay in seconds
+        """
+        self._upload_fn = upload_fn
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max(1, max_retries)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        # gcs_path -> {payload, enqueued_at, attempts, not_before}; insertion order = upload order
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Dict[str, Any]] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.stats = {"enqueued": 0, "coalesced": 0, "uploaded": 0, "retries": 0, "failed": 0,
+                      "batches": 0, "last_error": "", "last_upload_at": ""}
+
+        self._pool = ThreadPoolExecutor(max_workers=self.batch_size, thread_name_prefix="gcs-write")
+        self._worker = threading.Thread(target=self._run, name="gcs-write-behind", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def enqueue(self, gcs_path: str, payload: bytes):
+        """Queue an upload; replaces any not-yet-uploaded payload for the same path."""
+        if self._stopped:
+            # Worker already shut down: upload inline rather than lose the write
+            self._upload(gcs_path, payload)
+            return
+        with self._cond:
+            entry = self._pending.get(gcs_path)
+            if entry is not None:
+                # Coalesce: newest payload wins, keep the original position and enqueue time for lag
+                entry.update(payload=payload, attempts=0, not_before=0.0)
+                self.stats["coalesced"] += 1
+            else:
+                self._pending[gcs_path] = {"payload": payload, "enqueued_at": time.time(),
+                                           "attempts": 0, "not_before": 0.0}
+            self.stats["enqueued"] += 1
+            self._cond.notify_all()
+
+    def get_pending(self, gcs_path: str) -> Optional[bytes]:
+        """Payload queued or being uploaded for a path (read-your-writes), else None."""
+        with self._cond:
+            entry = self._pending.get(gcs_path) or self._inflight.get(gcs_path)
+            return entry["payload"] if entry else None
+
+    def cancel(self, gcs_path: str):
+        """Drop a queued upload and wait for an in-flight one, e.g. before deleting the object."""
+        with self._cond:
+            self._pending.pop(gcs_path, None)
+            if gcs_path in self._inflight:
+                self._inflight[gcs_path]["cancelled"] = True
+            while gcs_path in self._inflight:
+                self._cond.wait()
+
+    def cancel_prefix(self, prefix: str):
+        """cancel() for every queued or in-flight path under a prefix."""
+        with self._cond:
+            for gcs_path in [p for p in self._pending if p.startswith(prefix)]:
+                del self._pending[gcs_path]
+            for gcs_path, entry in self._inflight.items():
+                if gcs_path.startswith(prefix):
+                    entry["cancelled"] = True
+            while any(p.startswith(prefix) for p in self._inflight):
+                self._cond.wait()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Upload everything queued now, including payloads waiting out a retry backoff.
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            for entry in self._pending.values():
+                entry["not_before"] = 0.0
+            self._cond.notify_all()
+            while self._pending or self._inflight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 30.0):
+        """Flush and stop the worker (called on shutdown)."""
+        if self._stopped:
+            return
+        drained = self.flush(timeout)
+        if not drained:
+            print(f"[WRITE_BEHIND] Shutdown with {self.depth()} GCS upload(s) still pending")
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._worker.join(timeout=5)
+        self._pool.shutdown(wait=False)
+
+    def depth(self) -> int:
+        """Number of paths waiting for or in upload."""
+        with self._cond:
+            return len(self._pending) + len(self._inflight)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, lag of the oldest unsynced write and upload counters."""
+        now = time.time()
+        with self._cond:
+            waiting = list(self._pending.values()) + list(self._inflight.values())
+            oldest = min((entry["enqueued_at"] for entry in waiting), default=None)
+            return {
+                "depth": len(self._pending),
+                "in_flight": len(self._inflight),
+                "lag_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+                **self.stats,
+            }
+
+    def _take_batch(self) -> Dict[str, Dict[str, Any]]:
+        """Wait for due entries and move up to batch_size of them to in-flight (called with the lock held)."""
+        while not self._stopped:
+            now = time.monotonic()
+            due = [p for p, entry in self._pending.items()
+                   if entry["not_before"] <= now and p not in self._inflight]
+            if due:
+                batch = {}
+                for gcs_path in due[:self.batch_size]:
+                    batch[gcs_path] = self._inflight[gcs_path] = self._pending.pop(gcs_path)
+                return batch
+            waits = [entry["not_before"] - now for entry in self._pending.values()]
+            self._cond.wait(max(min(waits), 0.01) if waits else None)
+        return {}
+
+    def _upload(self, gcs_path: str, payload: bytes) -> Optional[str]:
+        """Run one upload; returns an error message or None on success."""
+        try:
+            if self._upload_fn(gcs_path, payload):
+                return None
+            return "upload returned no result"
+        except Exception as e:
+            return str(e)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+                if not batch:
+                    return
+                self.stats["batches"] += 1
+            futures = {gcs_path: self._pool.submit(self._upload, gcs_path, entry["payload"])
+                       for gcs_path, entry in batch.items()}
+            errors = {gcs_path: future.result() for gcs_path, future in futures.items()}
+            with self._cond:
+                for gcs_path, entry in batch.items():
+                    del self._inflight[gcs_path]
+                    error = errors[gcs_path]
+                    if error is None:
+                        self.stats["uploaded"] += 1
+                        self.stats["last_upload_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+                        continue
+                    self.stats["last_error"] = f"{gcs_path}: {error}"
+                    if gcs_path in self._pending or entry.get("cancelled"):
+                        # Superseded by a newer payload, or the object is being deleted
+                        continue
+                    entry["attempts"] += 1
+                    if entry["attempts"] >= self.max_retries:
+                        self.stats["failed"] += 1
+                        print(f"[WRITE_BEHIND] Giving up on {gcs_path} after {entry['attempts']} attempts: {error}")
+                        continue
+                    self.stats["retries"] += 1
+                    delay = min(self.base_backoff * (2 ** (entry["attempts"] - 1)), self.max_backoff)
+                    entry["not_before"] = time.monotonic() + delay
+                    self._pending[gcs_path] = entry
+                self._cond.notify_all()